@@ -1,14 +1,40 @@
 import os
-import torch
-import whisper
+import re
+import sys
+import time
+import json
+import queue
+import threading
+import uuid
+import hashlib
+import shutil
+import tempfile
+import argparse
+import functools
+import bisect
+import struct
+import sqlite3
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import urllib.request
+import urllib.error
+import numpy as np
 import pysrt
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
+from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
 import subprocess
-from typing import Optional, Tuple, List
-from dataclasses import dataclass
+from typing import Optional, Tuple, List, Dict, Callable, Union, Iterator
+from dataclasses import dataclass, field, asdict, replace
+from contextlib import contextmanager
 import logging
 
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure du pic de mémoire
+    resource = None
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,19 +42,1932 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov")
+# Fréquence attendue par Whisper (audio mono float32)
+SAMPLE_RATE = 16000
+# Paramètres d'encodage des segments ; un changement invalide les rendus incrémentaux
+SEGMENT_ENCODER_SETTINGS = {"codec": "libx264", "preset": "slow", "crf": 18}
+# Mémoire approximative (Go) occupée par un processus portant chaque modèle
+MODEL_MEMORY_GB = {
+    "tiny": 1, "base": 1, "small": 2, "medium": 5,
+    "large": 10, "large-v1": 10, "large-v2": 10, "large-v3": 10, "turbo": 6
+}
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pikisubcreator", "transcriptions")
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_PROBE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pikisubcreator", "probes")
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pikisubcreator", "transcripts.sqlite")
+# Format des transcripts mot à mot (words.npz) ; un changement impose de les réindexer
+TRANSCRIPT_VERSION = 1
+TRANSCRIPT_FILE = "words.npz"
+# Modes de sortie des jobs sans interface : incrustation ou piste de sous-titres
+OUTPUT_MODES = ("burn", "softsub")
+# Police libre fournie avec le projet, jointe par défaut aux sous-titres non incrustés
+BUNDLED_FONT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Alatsi-Regular.ttf")
+# Aperçu rapide depuis l'éditeur : proxy basse résolution, encodage le plus rapide
+PREVIEW_SETTINGS = {"height": 360, "preset": "ultrafast", "crf": 30}
+# Marge (s) affichée avant et après le sous-titre prévisualisé
+PREVIEW_MARGIN = 2.0
+
 @dataclass
 class VideoMetadata:
     width: int
     height: int
     fps: float
 
+@dataclass
+class MediaInfo:
+    width: int
+    height: int
+    fps: float
+    duration: float
+    audio_streams: int
+    keyframes: Optional[List[float]] = None
+
+    def metadata(self) -> VideoMetadata:
+        return VideoMetadata(self.width, self.height, self.fps)
+
+@dataclass
+class BatchJobResult:
+    video_path: str
+    output_dir: str
+    success: bool
+    audio_duration: float = 0.0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    outputs: Dict[str, str] = field(default_factory=dict)
+
+@dataclass
+class InferenceConfig:
+    """Configuration d'inférence Whisper (modèle, périphérique, précision)"""
+    model_name: str = "large-v2"
+    device: str = "auto"        # auto | cpu | cuda
+    precision: str = "auto"     # auto | fp16 | fp32
+    quantize: bool = False      # quantification int8 dynamique des couches linéaires (CPU)
+    threads: Optional[int] = None
+    batch_size: int = 1         # > 1 : fenêtres de 30 s décodées par lots (BatchedTranscriber)
+    beam_size: Optional[int] = None  # recherche en faisceau (None : décodage glouton)
+
+    def resolve_device(self) -> str:
+        """Périphérique effectif : CUDA si disponible en mode auto"""
+        if self.device == "auto":
+            import torch
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        return self.device
+
+    def use_fp16(self) -> bool:
+        """fp16 uniquement sur GPU : sur CPU Whisper repasserait en fp32 avec un avertissement"""
+        if self.precision == "auto":
+            return self.resolve_device() == "cuda"
+        return self.precision == "fp16"
+
+    def describe(self) -> str:
+        parts = [self.model_name, self.resolve_device(), "fp16" if self.use_fp16() else "fp32"]
+        if self.quantize:
+            parts.append("int8")
+        if self.threads:
+            parts.append(f"{self.threads} threads")
+        if self.batch_size > 1:
+            parts.append(f"lots de {self.batch_size}")
+        if self.beam_size:
+            parts.append(f"faisceau {self.beam_size}")
+        return "/".join(parts)
+
+@dataclass
+class Rendition:
+    """Déclinaison de sortie (nom et dimensions), par exemple 720p=1280x720"""
+    name: str
+    width: int
+    height: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "Rendition":
+        """Lecture de NOM=LxH ou LxH (le nom est alors la taille)"""
+        name, _, size = spec.rpartition("=")
+        match = re.fullmatch(r"(\d+)x(\d+)", size)
+        if not match:
+            raise ValueError(f"Déclinaison invalide: {spec} (attendu NOM=LxH)")
+        width, height = int(match.group(1)), int(match.group(2))
+        return cls(name or size, width, height)
+
+    @property
+    def aspect(self) -> float:
+        return round(self.width / self.height, 3)
+
+@dataclass
+class VadConfig:
+    """Détection d'activité vocale par énergie et taux de passages par zéro"""
+    threshold_db: float = 12.0      # marge au-dessus du bruit de fond (10e centile de l'énergie)
+    loud_db: float = -35.0          # une trame plus forte est toujours retenue (audio sans silence)
+    padding: float = 0.3            # marge conservée autour de chaque zone de parole (s)
+    min_silence: float = 0.8        # les silences plus courts restent dans la zone de parole (s)
+    min_speech: float = 0.25        # les zones de parole plus courtes sont ignorées (s)
+    frame_ms: int = 20
+
+@dataclass
+class JobOptions:
+    """Options de traitement d'une vidéo sans interface (batch ou serveur)"""
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR   # None désactive le cache de transcription
+    chunk_workers: int = 1
+    ass_mode: str = "word"                          # word | karaoke
+    burn_segments: int = 1                          # > 1 : incrustation parallèle par segments
+    incremental: bool = False                       # réutilisation des segments du rendu précédent
+    renditions: List[Rendition] = field(default_factory=list)  # déclinaisons produites en un seul décodage
+    output_mode: str = "burn"                       # burn (incrustation) | softsub (piste séparée, sans réencodage)
+    soft_format: str = "mkv"                        # conteneur du mode softsub : mkv (ASS + police) | mp4 (mov_text)
+    font_file: Optional[str] = None                 # police des sous-titres (défaut : Arial, Alatsi en softsub)
+    stream_window: Optional[float] = None           # mémoire bornée : transcription par fenêtres de N secondes
+    vad: Optional[VadConfig] = None                 # transcription des seules zones de parole
+
+def load_whisper_model(config: Optional[InferenceConfig] = None):
+    """Chargement du modèle Whisper selon la configuration d'inférence"""
+    # torch et whisper ne sont importés qu'au premier besoin (plusieurs secondes) :
+    # le rendu d'un SRT existant et les sous-commandes sans modèle s'en passent
+    import torch
+    import whisper
+
+    config = config or InferenceConfig()
+    device = config.resolve_device()
+    if config.threads:
+        torch.set_num_threads(config.threads)
+    logger.info(f"Chargement du modèle {config.describe()}")
+    model = whisper.load_model(config.model_name, device=device)
+
+    if config.quantize:
+        if device != "cpu":
+            logger.warning("La quantification int8 n'est disponible que sur CPU, ignorée.")
+        else:
+            model = quantize_model_int8(model)
+    return model
+
+def quantize_model_int8(model):
+    """Quantification dynamique int8 des couches linéaires du modèle (CPU uniquement)"""
+    import torch
+
+    # Whisper sous-classe nn.Linear pour gérer le fp16 ; quantize_dynamic ne
+    # reconnaît que le type exact, on ramène donc ces couches à nn.Linear.
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def transcribe_with_model(model, audio: Union[str, np.ndarray], settings: dict) -> List[dict]:
+    """Appel du modèle Whisper avec les paramètres de transcription
+
+    Avec settings["batch_size"] > 1, les fenêtres sont décodées par lots
+    (BatchedTranscriber) au lieu d'une à une par model.transcribe.
+    """
+    if settings.get("batch_size", 1) > 1:
+        if isinstance(audio, str):
+            import whisper
+            audio = whisper.load_audio(audio)
+        return BatchedTranscriber(model, settings).transcribe(audio)
+    return model.transcribe(
+        audio,
+        word_timestamps=settings["word_timestamps"],
+        fp16=settings["fp16"],
+        language=settings["language"],
+        beam_size=settings.get("beam_size")
+    )["segments"]
+
+def workers_for_memory(model_name: str, requested: int, memory_budget_gb: Optional[float] = None) -> int:
+    """Nombre de processus portant chacun un modèle qui tiennent dans le budget mémoire"""
+    if not memory_budget_gb:
+        return max(1, requested)
+    per_worker = MODEL_MEMORY_GB.get(model_name, 10)
+    allowed = max(1, int(memory_budget_gb // per_worker))
+    if allowed < requested:
+        logger.warning(f"Budget de {memory_budget_gb} Go: {allowed} processus au lieu de {requested} "
+                       f"(~{per_worker} Go par modèle {model_name})")
+    return max(1, min(requested, allowed))
+
+def frame_energy(audio: np.ndarray, frame_ms: int = 20) -> np.ndarray:
+    """Énergie moyenne par trame de frame_ms, lissée sur ~200 ms pour privilégier les silences prolongés"""
+    frame_len = SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(audio) // frame_len
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    energy = np.einsum('ij,ij->i', frames, frames) / frame_len
+    smooth = max(1, 200 // frame_ms)
+    return np.convolve(energy, np.ones(smooth) / smooth, mode='same')
+
+def find_silence_splits(audio: np.ndarray, chunk_seconds: float = 300.0,
+                        search_seconds: float = 15.0, frame_ms: int = 20) -> List[int]:
+    """Points de découpe (en échantillons) placés dans les passages les plus silencieux.
+
+    Pour chaque frontière visée (tous les chunk_seconds), on cherche dans une
+    fenêtre de ±search_seconds la trame dont l'énergie lissée est minimale,
+    afin de ne jamais couper un mot en deux.
+    """
+    frame_len = SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(audio) // frame_len
+    if n_frames == 0 or len(audio) <= chunk_seconds * SAMPLE_RATE:
+        return []
+
+    energy = frame_energy(audio, frame_ms)
+    frames_per_chunk = int(chunk_seconds * 1000 / frame_ms)
+    search = int(search_seconds * 1000 / frame_ms)
+    splits = []
+    last = 0
+    for target in range(frames_per_chunk, n_frames - frames_per_chunk // 2, frames_per_chunk):
+        low = max(last + 1, target - search)
+        high = min(n_frames, target + search)
+        if low >= high:
+            continue
+        best = low + int(np.argmin(energy[low:high]))
+        splits.append(best * frame_len + frame_len // 2)
+        last = best
+    return splits
+
+def _merge_close(starts: np.ndarray, ends: np.ndarray, min_gap: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Fusion des intervalles triés séparés de moins de min_gap"""
+    if len(starts) == 0:
+        return starts, ends
+    keep = starts[1:] - ends[:-1] >= min_gap
+    return (np.concatenate((starts[:1], starts[1:][keep])),
+            np.concatenate((ends[:-1][keep], ends[-1:])))
+
+def detect_speech(audio: np.ndarray, config: Optional[VadConfig] = None) -> np.ndarray:
+    """Zones de parole [début, fin) en échantillons, sous forme de tableau (n, 2).
+
+    Une trame est retenue si son énergie dépasse nettement le bruit de
+    fond, ou si elle est un peu plus faible mais riche en passages par zéro
+    (consonnes sourdes). Les silences courts sont comblés, les zones trop
+    courtes ignorées, puis chaque zone est élargie de config.padding.
+    """
+    config = config or VadConfig()
+    frame_len = SAMPLE_RATE * config.frame_ms // 1000
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    energy_db = 10 * np.log10(np.einsum('ij,ij->i', frames, frames) / frame_len + 1e-10)
+    signs = np.signbit(frames)
+    zero_crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+    # Le seuil ne descend jamais sous -60 dB (un silence numérique n'est pas de la parole) et ne
+    # dépasse pas loud_db, pour un audio sans aucun silence où le bruit de fond est surestimé
+    threshold = min(max(float(np.percentile(energy_db, 10)) + config.threshold_db, -60.0), config.loud_db)
+    speech = (energy_db > threshold) | ((energy_db > threshold - config.threshold_db / 2) & (zero_crossings > 0.3))
+
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    frame_seconds = config.frame_ms / 1000
+    starts, ends = _merge_close(starts, ends, config.min_silence / frame_seconds)
+    long_enough = (ends - starts) * frame_seconds >= config.min_speech
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    padding = int(config.padding * SAMPLE_RATE)
+    starts, ends = _merge_close(np.maximum(starts * frame_len - padding, 0),
+                                np.minimum(ends * frame_len + padding, len(audio)), 1)
+    return np.stack((starts, ends), axis=1).astype(np.int64)
+
+class SpeechMap:
+    """Correspondance entre l'audio compacté (zones de parole mises bout à bout)
+    et la chronologie d'origine"""
+
+    def __init__(self, bounds: np.ndarray, total_samples: int):
+        self.bounds = bounds
+        self.total_samples = total_samples
+        lengths = bounds[:, 1] - bounds[:, 0]
+        self.compact_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        self.speech_samples = int(lengths.sum())
+
+    @property
+    def speech_seconds(self) -> float:
+        return self.speech_samples / SAMPLE_RATE
+
+    @property
+    def skipped_seconds(self) -> float:
+        return (self.total_samples - self.speech_samples) / SAMPLE_RATE
+
+    def compact(self, audio: np.ndarray) -> np.ndarray:
+        """Audio réduit aux zones de parole"""
+        if not len(self.bounds):
+            return np.empty(0, dtype=audio.dtype)
+        return np.concatenate([audio[start:end] for start, end in self.bounds])
+
+    def to_original(self, times: np.ndarray, ends: bool = False) -> np.ndarray:
+        """Instants (s) de l'audio compacté ramenés sur la chronologie d'origine.
+
+        Un instant situé exactement à la jonction de deux zones est rattaché
+        à la zone suivante pour un début, à la précédente pour une fin.
+        """
+        samples = np.asarray(times, dtype=np.float64) * SAMPLE_RATE
+        region = np.searchsorted(self.compact_starts, samples, side='left' if ends else 'right') - 1
+        region = np.clip(region, 0, len(self.bounds) - 1)
+        return (samples - self.compact_starts[region] + self.bounds[region, 0]) / SAMPLE_RATE
+
+    def remap_segments(self, segments: List[dict]) -> List[dict]:
+        """Horodatages des segments et de leurs mots ramenés sur la chronologie d'origine"""
+        items = segments + [word for segment in segments for word in segment.get("words", [])]
+        if not items or not len(self.bounds):
+            return segments
+        starts = self.to_original([item["start"] for item in items])
+        ends = self.to_original([item["end"] for item in items], ends=True)
+        for item, start, end in zip(items, starts.tolist(), ends.tolist()):
+            item["start"], item["end"] = start, max(start, end)
+        return segments
+
+def shift_segments(segments: List[dict], offset: float) -> List[dict]:
+    """Décalage des horodatages de segments (et de leurs mots) de offset secondes"""
+    for segment in segments:
+        segment["start"] += offset
+        segment["end"] += offset
+        for word in segment.get("words", []):
+            word["start"] += offset
+            word["end"] += offset
+    return segments
+
+def _normalize_word(word: str) -> str:
+    return word.strip().strip(".,;:!?…\"'«»").lower()
+
+class SegmentStitcher:
+    """Assemblage au fil de l'eau des segments de chunks consécutifs (horodatages déjà globaux).
+
+    Les mots qui reviennent en double à une frontière (même texte, début
+    antérieur à la fin du mot précédent) sont retirés, et les horodatages
+    sont rendus monotones pour que la suite des segments reste ordonnée.
+    Seul le dernier mot est conservé d'un chunk à l'autre.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.last_end = 0.0
+        self.last_word: Optional[dict] = None
+
+    def add(self, segments: List[dict]) -> List[dict]:
+        """Segments d'un chunk, nettoyés et renumérotés à la suite des précédents"""
+        stitched = []
+        for segment in segments:
+            words = []
+            for word in segment.get("words", []):
+                if (self.last_word is not None and word["start"] < self.last_end
+                        and _normalize_word(word["word"]) == _normalize_word(self.last_word["word"])):
+                    continue
+                word["start"] = max(word["start"], self.last_end)
+                word["end"] = max(word["end"], word["start"])
+                words.append(word)
+                self.last_end = word["end"]
+                self.last_word = word
+            if "words" in segment:
+                if not words:
+                    continue
+                segment["words"] = words
+                segment["start"] = words[0]["start"]
+                segment["end"] = words[-1]["end"]
+                segment["text"] = "".join(w["word"] for w in words)
+            segment["id"] = self.count
+            self.count += 1
+            stitched.append(segment)
+        return stitched
+
+def stitch_chunk_segments(chunks: List[List[dict]]) -> List[dict]:
+    """Assemblage des segments de chunks consécutifs (voir SegmentStitcher)"""
+    stitcher = SegmentStitcher()
+    return [segment for segments in chunks for segment in stitcher.add(segments)]
+
+def quietest_point(audio: np.ndarray, low: int, high: int, frame_ms: int = 20) -> int:
+    """Échantillon au centre de la trame la plus silencieuse entre les échantillons low et high"""
+    frame_len = SAMPLE_RATE * frame_ms // 1000
+    energy = frame_energy(audio, frame_ms)
+    first, last = low // frame_len, min(len(energy), high // frame_len)
+    if first >= last:
+        return min(high, len(audio))
+    return (first + int(np.argmin(energy[first:last]))) * frame_len + frame_len // 2
+
+class RawAudioFile:
+    """Audio PCM mono float32 brut sur disque, lu par fenêtres projetées en mémoire.
+
+    Chaque lecture ne projette (np.memmap) que la plage demandée et en
+    renvoie une copie ; la projection est libérée aussitôt, de sorte que les
+    pages déjà lues ne restent pas dans la mémoire résidente du processus.
+    La mémoire utilisée dépend de la taille des fenêtres, pas de la durée.
+    """
+
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.n_samples = os.path.getsize(path) // 4
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    @property
+    def duration(self) -> float:
+        return self.n_samples / self.sample_rate
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Copie des échantillons [start, stop)"""
+        stop = min(stop, self.n_samples)
+        if start >= stop:
+            return np.empty(0, dtype=np.float32)
+        mapped = np.memmap(self.path, dtype=np.float32, mode='r', offset=start * 4, shape=(stop - start,))
+        samples = np.array(mapped)
+        del mapped
+        return samples
+
+    def windows(self, window_seconds: float, search_seconds: float = 15.0):
+        """Fenêtres successives (début en échantillons, PCM) d'environ window_seconds.
+
+        Chaque fenêtre est coupée dans le passage le plus silencieux à
+        ±search_seconds de sa borne, pour ne pas couper un mot en deux.
+        """
+        window = int(window_seconds * self.sample_rate)
+        search = min(int(search_seconds * self.sample_rate), window // 2)
+        # Marge lue au-delà de la zone de recherche (lissage de l'énergie en bord de fenêtre)
+        margin = self.sample_rate
+        start = 0
+        while start < self.n_samples:
+            if start + window + search >= self.n_samples:
+                yield start, self.read(start, self.n_samples)
+                return
+            audio = self.read(start, start + window + search + margin)
+            split = quietest_point(audio, window - search, window + search)
+            yield start, audio[:split]
+            start += split
+
+def parse_ass_time(value: str) -> int:
+    """Lecture d'un horodatage ASS (H:MM:SS.cc) en centisecondes"""
+    hours, minutes, seconds = value.strip().split(":")
+    secs, centis = seconds.split(".")
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(secs)) * 100 + int(centis[:2].ljust(2, "0"))
+
+def format_ass_centiseconds(centiseconds: int) -> str:
+    """Formatage d'un horodatage ASS à partir de centisecondes"""
+    secs, centis = divmod(max(0, centiseconds), 100)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{secs:02}.{centis:02}"
+
+def _escape_filter_path(path: str) -> str:
+    return path.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+
+def ass_filter(ass_file: str, fonts_dir: Optional[str] = None) -> str:
+    """Filtre ffmpeg ass= avec le chemin échappé pour la syntaxe des filtres
+
+    fonts_dir permet à libass de trouver une police non installée sur le système.
+    """
+    option = f":fontsdir={_escape_filter_path(fonts_dir)}" if fonts_dir else ""
+    return f"ass={_escape_filter_path(ass_file)}{option}"
+
+def font_family_name(font_file: str) -> str:
+    """Nom de famille (name ID 1) d'une police TrueType/OpenType, à défaut le nom du fichier"""
+    with open(font_file, "rb") as f:
+        data = f.read()
+    try:
+        num_tables = struct.unpack(">H", data[4:6])[0]
+        for i in range(num_tables):
+            tag, _, offset, _ = struct.unpack(">4sLLL", data[12 + 16 * i:28 + 16 * i])
+            if tag != b"name":
+                continue
+            _, count, strings = struct.unpack(">HHH", data[offset:offset + 6])
+            for j in range(count):
+                platform, _, _, name_id, length, start = struct.unpack(
+                    ">HHHHHH", data[offset + 6 + 12 * j:offset + 18 + 12 * j])
+                if name_id == 1:
+                    raw = data[offset + strings + start:offset + strings + start + length]
+                    # Plateformes Unicode et Windows : UTF-16 big-endian
+                    return raw.decode("utf-16-be" if platform in (0, 3) else "latin-1")
+    except struct.error:
+        pass
+    return os.path.splitext(os.path.basename(font_file))[0]
+
+KARAOKE_TAG = re.compile(r"\\(k[fo]?|K)(\d+)")
+TRANSFORM_TIMES = re.compile(r"\\t\((\d+),(\d+),")
+
+def trim_karaoke_tags(text: str, centiseconds: int) -> str:
+    """Retrait des centisecondes déjà écoulées des premières balises karaoké d'un événement"""
+    def consume(match):
+        nonlocal centiseconds
+        duration = int(match.group(2))
+        used = min(duration, centiseconds)
+        centiseconds -= used
+        return f"\\{match.group(1)}{duration - used}"
+    return KARAOKE_TAG.sub(consume, text)
+
+def trim_transform_times(text: str, centiseconds: int) -> str:
+    """Recalage des balises \\t(t1,t2,...) d'un événement dont le début est avancé de centiseconds
+
+    t2 = 0 signifiant « fin de l'événement » pour libass, une transformation
+    déjà terminée est ramenée à (0,1) et non à (0,0).
+    """
+    milliseconds = centiseconds * 10
+
+    def shift(match):
+        t1, t2 = int(match.group(1)), int(match.group(2))
+        if t2 == 0:
+            return match.group(0)
+        return f"\\t({max(0, t1 - milliseconds)},{max(1, t2 - milliseconds)},"
+    return TRANSFORM_TIMES.sub(shift, text)
+
+def shift_ass_file(ass_file: str, output_path: str, start: float, end: float) -> int:
+    """Copie des événements ASS visibles dans [start, end), recalés pour commencer à 0.
+
+    Sert à rendre un segment de vidéo extrait par seek : ses horodatages
+    repartent de zéro. Retourne le nombre d'événements conservés.
+    """
+    offset = int(round(start * 100))
+    window_end = int(round(end * 100))
+    kept = 0
+    with open(ass_file, encoding='utf-8') as src, open(output_path, "w", encoding='utf-8') as dst:
+        for line in src:
+            if not line.startswith("Dialogue:"):
+                dst.write(line)
+                continue
+            prefix, rest = line.split(":", 1)
+            layer, event_start, event_end, tail = rest.split(",", 3)
+            event_start, event_end = parse_ass_time(event_start), parse_ass_time(event_end)
+            if event_end <= offset or event_start >= window_end:
+                continue
+            if event_start < offset:
+                # L'événement commence avant le segment : les balises \k et \t doivent suivre
+                tail = trim_transform_times(trim_karaoke_tags(tail, offset - event_start), offset - event_start)
+            dst.write(f"{prefix}:{layer},{format_ass_centiseconds(event_start - offset)},"
+                      f"{format_ass_centiseconds(event_end - offset)},{tail}")
+            kept += 1
+    return kept
+
+def choose_segment_bounds(keyframes: List[float], duration: float, segments: int) -> List[float]:
+    """Bornes de découpe (début de chaque segment puis fin) alignées sur les images clés"""
+    bounds = [0.0]
+    for k in range(1, segments):
+        target = duration * k / segments
+        candidates = [t for t in keyframes if bounds[-1] < t < duration]
+        if not candidates:
+            break
+        nearest = min(candidates, key=lambda t: abs(t - target))
+        if nearest not in bounds:
+            bounds.append(nearest)
+    bounds.append(duration)
+    return sorted(bounds)
+
+def _parse_frame_rate(value: str) -> float:
+    """Calcul du fps à partir de la fraction (ex: 30000/1001)"""
+    num, _, den = value.partition("/")
+    return float(num) / float(den or 1) if float(den or 1) else 0.0
+
+class MediaProbe:
+    """Analyse ffprobe unique et mémorisée des fichiers média.
+
+    Un seul appel ffprobe (sortie JSON) fournit dimensions, fps, durée et
+    flux audio ; les images clés ne sont lues que sur demande. Les résultats
+    sont mémorisés en mémoire et sur disque, avec pour clé le chemin, la
+    taille et la date de modification du fichier : toutes les étapes (et
+    tous les jobs batch) réutilisent la même analyse.
+    """
+    # Incrémenté quand le contenu mémorisé change (v2 : images clés relatives au début du fichier)
+    VERSION = 2
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_PROBE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.memory: Dict[str, MediaInfo] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(path: str) -> str:
+        stat = os.stat(path)
+        identity = f"{MediaProbe.VERSION}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def probe(self, path: str, keyframes: bool = False) -> MediaInfo:
+        """Informations du média, analysées une seule fois par version du fichier"""
+        try:
+            key = self.cache_key(path)
+        except OSError as e:
+            raise RuntimeError(f"Fichier introuvable: {path}") from e
+
+        with self.lock:
+            info = self.memory.get(key) or self._load(key)
+        if info is None:
+            info = self._run_ffprobe(path)
+        if keyframes and info.keyframes is None:
+            info = replace(info, keyframes=self._read_keyframes(path))
+
+        with self.lock:
+            if self.memory.get(key) is not info:
+                self.memory[key] = info
+                self._store(key, info)
+        return info
+
+    def _run_ffprobe(self, path: str) -> MediaInfo:
+        cmd = [
+            "ffprobe",
+            "-v", "error",
+            "-show_entries", "stream=codec_type,width,height,r_frame_rate:format=duration",
+            "-of", "json",
+            path
+        ]
+        try:
+            data = json.loads(subprocess.check_output(cmd, universal_newlines=True))
+            streams = data.get("streams", [])
+            video = next(stream for stream in streams if stream.get("codec_type") == "video")
+            return MediaInfo(
+                width=int(video["width"]),
+                height=int(video["height"]),
+                fps=_parse_frame_rate(video.get("r_frame_rate", "0/1")),
+                duration=float(data.get("format", {}).get("duration", 0.0)),
+                audio_streams=sum(1 for stream in streams if stream.get("codec_type") == "audio")
+            )
+        except (OSError, subprocess.CalledProcessError, ValueError, KeyError, StopIteration) as e:
+            raise RuntimeError(f"Impossible d'analyser la vidéo {path}: {e}") from e
+
+    def _read_keyframes(self, path: str) -> List[float]:
+        """Horodatages (s) des images clés du premier flux vidéo, lus dans les paquets sans décodage
+
+        Les pts sont absolus : le start_time du conteneur (non nul en MPEG-TS
+        et dans certains MOV) en est retranché, pour que les horodatages
+        servent directement de -ss d'entrée et de décalage des sous-titres.
+        """
+        cmd = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags:format=start_time",
+            "-of", "csv=p=0",
+            path
+        ]
+        try:
+            output = subprocess.check_output(cmd, universal_newlines=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RuntimeError(f"Impossible de lire les images clés de {path}: {e}") from e
+        keyframes, start_time = [], 0.0
+        for line in output.splitlines():
+            pts_time, separator, flags = line.partition(",")
+            if not separator:
+                # Ligne de la section format : start_time seul
+                start_time = float(pts_time) if pts_time not in ("", "N/A") else 0.0
+            elif "K" in flags and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+        return sorted(max(0.0, keyframe - start_time) for keyframe in keyframes)
+
+    def _load(self, key: str) -> Optional[MediaInfo]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json"), encoding='utf-8') as f:
+                info = MediaInfo(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        self.memory[key] = info
+        return info
+
+    def _store(self, key: str, info: MediaInfo):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"{key}.json")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding='utf-8') as f:
+                json.dump(asdict(info), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer l'analyse dans le cache: {e}")
+
+# Analyse partagée par toutes les étapes du processus
+media_probe = MediaProbe()
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente (Mo) du processus"""
+    if resource is None:
+        return None
+    # ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def _cpu_seconds() -> float:
+    """Temps CPU du processus et des processus enfants déjà terminés (ffmpeg)"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+class Instrumentation:
+    """Mesures par étape d'un job : durée, temps CPU, pic de mémoire et progression.
+
+    Chaque étape devient un événement « complet » au format Chrome trace
+    (chrome://tracing, Perfetto), sur la ligne du thread qui l'exécute ; la
+    progression ffmpeg et le facteur temps réel de Whisper sont enregistrés
+    comme compteurs. Le pic de mémoire est le maximum atteint par le
+    processus à la fin de l'étape ; le temps CPU inclut celui des
+    processus ffmpeg terminés pendant l'étape. on_progress, s'il
+    est fourni, reçoit chaque relevé de progression (fps, vitesse, ETA).
+    """
+
+    def __init__(self, on_progress: Optional[Callable[[str, dict], None]] = None):
+        self.origin = time.perf_counter()
+        self.events: List[dict] = []
+        self.on_progress = on_progress
+        self.lock = threading.Lock()
+
+    def _timestamp(self) -> float:
+        """Microsecondes écoulées depuis la création (unité du format Chrome trace)"""
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def _append(self, event: dict):
+        event.update(pid=os.getpid(), tid=threading.get_ident())
+        with self.lock:
+            self.events.append(event)
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        """Mesure d'une étape ; le dictionnaire produit peut être complété par l'appelant"""
+        start = self._timestamp()
+        cpu = _cpu_seconds()
+        try:
+            yield args
+        except Exception as e:
+            args["error"] = str(e)
+            raise
+        finally:
+            duration = self._timestamp() - start
+            args["wall_seconds"] = round(duration / 1e6, 4)
+            args["cpu_seconds"] = round(_cpu_seconds() - cpu, 4)
+            rss = _peak_rss_mb()
+            if rss is not None:
+                args["peak_rss_mb"] = round(rss, 1)
+            self._append({"name": name, "cat": "stage", "ph": "X", "ts": start, "dur": duration, "args": args})
+
+    def counter(self, name: str, values: Dict[str, float]):
+        self._append({"name": name, "cat": "counter", "ph": "C", "ts": self._timestamp(), "args": values})
+
+    def progress(self, label: str, snapshot: dict):
+        """Relevé de progression d'un processus ffmpeg"""
+        self.counter(label, {key: snapshot[key] for key in ("fps", "speed", "percent")
+                             if snapshot.get(key) is not None})
+        if self.on_progress is not None:
+            self.on_progress(label, snapshot)
+
+    def stages(self) -> List[dict]:
+        """Étapes terminées, dans l'ordre de fin"""
+        with self.lock:
+            return [{"stage": event["name"], **event["args"]} for event in self.events if event["ph"] == "X"]
+
+    def log_summary(self):
+        for stage in self.stages():
+            memory = f", pic mémoire {stage['peak_rss_mb']:.0f} Mo" if "peak_rss_mb" in stage else ""
+            logger.info(f"Étape {stage['stage']}: {stage['wall_seconds']:.2f}s, "
+                        f"CPU {stage['cpu_seconds']:.2f}s{memory}")
+
+    def export_chrome_trace(self, path: str) -> str:
+        """Export de la chronologie du job au format Chrome trace (JSON)"""
+        with self.lock:
+            events = list(self.events)
+        with open(path, "w", encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+def instrumented(stage_name: str):
+    """Décorateur de méthode : l'appel est mesuré comme une étape de self.instrumentation"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.stage(stage_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def drain_stderr(process: subprocess.Popen) -> Callable[[], str]:
+    """Lecture de stderr dans un thread, pour qu'un flot d'erreurs ne bloque pas ffmpeg
+
+    Retourne une fonction qui attend la fin de la lecture et renvoie le texte lu.
+    """
+    chunks = []
+    reader = threading.Thread(target=lambda: chunks.append(process.stderr.read()), daemon=True)
+    reader.start()
+
+    def collect() -> str:
+        reader.join()
+        text = chunks[0] if chunks else ""
+        return text.decode('utf-8', 'replace') if isinstance(text, bytes) else text
+    return collect
+
+def parse_ffmpeg_progress(lines):
+    """Relevés de progression à partir de la sortie de ffmpeg -progress (lignes clé=valeur)
+
+    ffmpeg émet un bloc de clés terminé par progress=continue|end ; chaque
+    bloc produit un dictionnaire frame, fps, speed (facteur), out_time (s), done.
+    """
+    block = {}
+    for line in lines:
+        key, _, value = line.strip().partition("=")
+        if key != "progress":
+            block[key] = value
+            continue
+        try:
+            # out_time_ms est en réalité exprimé en microsecondes
+            out_time = int(block.get("out_time_us") or block.get("out_time_ms") or 0) / 1e6
+        except ValueError:
+            out_time = 0.0
+        speed = block.get("speed", "").rstrip("x").strip()
+        try:
+            fps = float(block.get("fps", 0) or 0)
+        except ValueError:
+            fps = 0.0
+        yield {
+            "frame": int(block["frame"]) if block.get("frame", "").isdigit() else None,
+            "fps": fps,
+            "speed": float(speed) if re.fullmatch(r"[\d.]+", speed) else None,
+            "out_time": max(0.0, out_time),
+            "done": value == "end",
+        }
+        block = {}
+
+def format_progress(label: str, snapshot: dict) -> str:
+    parts = [label]
+    if snapshot.get("percent") is not None:
+        parts.append(f"{snapshot['percent']:.0f}%")
+    parts.append(f"{snapshot['fps']:.0f} img/s")
+    if snapshot.get("speed") is not None:
+        parts.append(f"x{snapshot['speed']:.2f}")
+    if snapshot.get("eta") is not None:
+        parts.append(f"reste {snapshot['eta']:.0f}s")
+    return " - ".join(parts)
+
+@dataclass
+class CueValidation:
+    """Rapport de validation des sous-titres (identifiants de cues)"""
+    overlaps: List[Tuple[int, int]] = field(default_factory=list)
+    gaps: List[Tuple[int, int, float]] = field(default_factory=list)
+    out_of_order: List[int] = field(default_factory=list)
+    invalid: List[int] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Les trous sont signalés mais ne rendent pas les sous-titres invalides"""
+        return not (self.overlaps or self.out_of_order or self.invalid)
+
+    def summary(self) -> str:
+        return (f"{len(self.overlaps)} chevauchement(s), {len(self.gaps)} trou(s), "
+                f"{len(self.out_of_order)} hors ordre, {len(self.invalid)} invalide(s)")
+
+class WordTimeline:
+    """Chronologie compacte des mots d'une transcription.
+
+    Les horodatages et probabilités sont stockés dans des tableaux NumPy, le
+    texte dans une table de chaînes (chaque mot distinct n'est stocké qu'une
+    fois) et les segments sous forme d'offsets dans ces tableaux. La
+    structure est construite une seule fois à partir des segments Whisper
+    puis partagée par l'export SRT, la génération ASS et l'éditeur.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, probabilities: np.ndarray,
+                 word_ids: np.ndarray, vocabulary: List[str], segment_offsets: np.ndarray,
+                 segment_starts: np.ndarray, segment_ends: np.ndarray, source: Optional[str] = None):
+        self.starts = starts
+        self.ends = ends
+        self.probabilities = probabilities
+        self.word_ids = word_ids
+        self.vocabulary = vocabulary
+        self.segment_offsets = segment_offsets
+        self.segment_starts = segment_starts
+        self.segment_ends = segment_ends
+        # Vidéo transcrite, pour les transcripts relus depuis le disque
+        self.source = source
+
+    @classmethod
+    def from_segments(cls, segments: List[dict]) -> "WordTimeline":
+        """Construction à partir des segments (avec horodatage des mots) de Whisper"""
+        n_words = sum(len(segment.get("words", ())) for segment in segments)
+        starts = np.empty(n_words, dtype=np.float64)
+        ends = np.empty(n_words, dtype=np.float64)
+        probabilities = np.empty(n_words, dtype=np.float32)
+        word_ids = np.empty(n_words, dtype=np.uint32)
+        segment_offsets = np.empty(len(segments) + 1, dtype=np.int64)
+        segment_starts = np.empty(len(segments), dtype=np.float64)
+        segment_ends = np.empty(len(segments), dtype=np.float64)
+
+        table: Dict[str, int] = {}
+        position = 0
+        for i, segment in enumerate(segments):
+            segment_offsets[i] = position
+            segment_starts[i] = segment["start"]
+            segment_ends[i] = segment["end"]
+            for word in segment.get("words", ()):
+                starts[position] = word["start"]
+                ends[position] = word["end"]
+                probabilities[position] = word.get("probability", 1.0)
+                word_ids[position] = table.setdefault(word["word"], len(table))
+                position += 1
+        segment_offsets[len(segments)] = position
+
+        # Les recherches par dichotomie supposent des débuts croissants,
+        # et un mot ne peut pas finir avant d'avoir commencé
+        np.maximum.accumulate(starts, out=starts)
+        np.maximum(ends, starts, out=ends)
+        return cls(starts, ends, probabilities, word_ids, list(table),
+                   segment_offsets, segment_starts, segment_ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def n_segments(self) -> int:
+        return len(self.segment_starts)
+
+    def word(self, position: int) -> str:
+        return self.vocabulary[self.word_ids[position]]
+
+    def segment_range(self, segment: int) -> Tuple[int, int]:
+        """Positions [début, fin) des mots d'un segment"""
+        return int(self.segment_offsets[segment]), int(self.segment_offsets[segment + 1])
+
+    def segment_words(self, segment: int) -> List[str]:
+        start, stop = self.segment_range(segment)
+        return [self.vocabulary[i] for i in self.word_ids[start:stop]]
+
+    def words_between(self, start: float, end: float) -> Tuple[int, int]:
+        """Positions [début, fin) des mots commençant dans l'intervalle [start, end)"""
+        return (int(np.searchsorted(self.starts, start, side='left')),
+                int(np.searchsorted(self.starts, end, side='left')))
+
+    def mean_probability(self, start: float, end: float) -> Optional[float]:
+        """Probabilité moyenne des mots prononcés dans l'intervalle"""
+        lo, hi = self.words_between(start, end)
+        if lo >= hi:
+            return None
+        return float(self.probabilities[lo:hi].mean())
+
+    def match_words(self, words: List[str], start: float, end: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Horodatages réels d'une suite de mots affichée dans l'intervalle [start, end].
+
+        Retourne None si le texte ne correspond plus à la transcription
+        (mot corrigé, ajouté ou supprimé dans l'éditeur).
+        """
+        lo, hi = self.words_between(start, end)
+        target = [_normalize_word(w) for w in words]
+        candidates = [_normalize_word(self.word(i)) for i in range(lo, hi)]
+        for offset in range(len(candidates) - len(target) + 1):
+            if candidates[offset:offset + len(target)] == target:
+                first = lo + offset
+                return self.starts[first:first + len(target)], self.ends[first:first + len(target)]
+        return None
+
+    def to_srt(self, start_padding: float = 0.5) -> pysrt.SubRipFile:
+        """Export en SRT : un sous-titre par segment, affiché jusqu'à start_padding
+        secondes en avance sans jamais remonter avant 0 ni avant la fin du segment précédent"""
+        previous_ends = np.concatenate(([0.0], self.segment_ends[:-1]))
+        starts = np.minimum(np.maximum(self.segment_starts - start_padding, previous_ends),
+                            self.segment_starts)
+        starts = np.maximum(starts, 0.0)
+        subtitles = pysrt.SubRipFile()
+        for i in range(self.n_segments):
+            subtitles.append(
+                pysrt.SubRipItem(
+                    index=i + 1,
+                    start=pysrt.SubRipTime(seconds=float(starts[i])),
+                    end=pysrt.SubRipTime(seconds=float(self.segment_ends[i])),
+                    text=" ".join(self.segment_words(i))
+                )
+            )
+        return subtitles
+
+    @classmethod
+    def concatenate(cls, timelines: List["WordTimeline"]) -> "WordTimeline":
+        """Chronologie unique à partir de chronologies consécutives (fenêtres d'un même audio)"""
+        if not timelines:
+            return cls.from_segments([])
+        table: Dict[str, int] = {}
+        word_ids, offsets, position = [], [np.zeros(1, dtype=np.int64)], 0
+        for timeline in timelines:
+            remap = np.array([table.setdefault(word, len(table)) for word in timeline.vocabulary], dtype=np.uint32)
+            word_ids.append(remap[timeline.word_ids] if len(remap) else timeline.word_ids)
+            offsets.append(timeline.segment_offsets[1:] + position)
+            position += len(timeline)
+        starts = np.concatenate([timeline.starts for timeline in timelines])
+        np.maximum.accumulate(starts, out=starts)
+        ends = np.maximum(np.concatenate([timeline.ends for timeline in timelines]), starts)
+        return cls(starts, ends,
+                   np.concatenate([timeline.probabilities for timeline in timelines]),
+                   np.concatenate(word_ids), list(table), np.concatenate(offsets),
+                   np.concatenate([timeline.segment_starts for timeline in timelines]),
+                   np.concatenate([timeline.segment_ends for timeline in timelines]))
+
+    def save(self, path: str, source: Optional[str] = None) -> str:
+        """Export du transcript mot à mot (.npz compressé, colonnes en millisecondes)
+
+        Le fichier garde les horodatages au format entier (ms), la probabilité
+        de chaque mot en float16, la table des mots et les offsets des
+        segments ; source est le chemin de la vidéo transcrite.
+        """
+        def to_ms(seconds: np.ndarray) -> np.ndarray:
+            return np.round(seconds * 1000).astype(np.int32)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            version=np.int32(TRANSCRIPT_VERSION),
+            source=np.array(os.path.abspath(source) if source else ""),
+            starts_ms=to_ms(self.starts),
+            ends_ms=to_ms(self.ends),
+            probabilities=self.probabilities.astype(np.float16),
+            word_ids=self.word_ids,
+            vocabulary=np.array(self.vocabulary, dtype=str),
+            segment_offsets=self.segment_offsets,
+            segment_starts_ms=to_ms(self.segment_starts),
+            segment_ends_ms=to_ms(self.segment_ends)
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "WordTimeline":
+        """Lecture d'un transcript écrit par save"""
+        with np.load(path) as data:
+            if int(data["version"]) != TRANSCRIPT_VERSION:
+                raise ValueError(f"Version de transcript non prise en charge: {path}")
+            return cls(data["starts_ms"] / 1000.0, data["ends_ms"] / 1000.0,
+                       data["probabilities"].astype(np.float32), data["word_ids"],
+                       data["vocabulary"].tolist(), data["segment_offsets"],
+                       data["segment_starts_ms"] / 1000.0, data["segment_ends_ms"] / 1000.0,
+                       source=str(data["source"]) or None)
+
+class TranscriptWriter:
+    """Écriture fenêtre par fenêtre d'un transcript mot à mot, au format de WordTimeline.save.
+
+    Les colonnes de chaque fenêtre sont ajoutées à des fichiers bruts dans
+    un dossier temporaire voisin ; seule la table des mots reste en mémoire.
+    close() assemble le .npz en recopiant ces fichiers par blocs : la
+    mémoire ne dépend pas de la durée de l'enregistrement.
+    """
+    COLUMNS = {
+        "starts_ms": np.int32,
+        "ends_ms": np.int32,
+        "probabilities": np.float16,
+        "word_ids": np.uint32,
+        "segment_offsets": np.int64,
+        "segment_starts_ms": np.int32,
+        "segment_ends_ms": np.int32,
+    }
+    COPY_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, path: str, source: Optional[str] = None):
+        self.path = path
+        self.source = source
+        self.spill_dir = tempfile.mkdtemp(prefix=".words_", dir=os.path.dirname(os.path.abspath(path)))
+        self.files = {name: open(os.path.join(self.spill_dir, name), "wb") for name in self.COLUMNS}
+        self.lengths = dict.fromkeys(self.COLUMNS, 0)
+        self.table: Dict[str, int] = {}
+        self.last_start = -np.inf
+        self._write("segment_offsets", np.zeros(1))
+
+    def _write(self, name: str, values: np.ndarray):
+        values.astype(self.COLUMNS[name]).tofile(self.files[name])
+        self.lengths[name] += len(values)
+
+    def append(self, timeline: WordTimeline):
+        """Ajout des mots d'une fenêtre, avec les mêmes règles que WordTimeline.concatenate"""
+        def to_ms(seconds: np.ndarray) -> np.ndarray:
+            return np.round(seconds * 1000)
+
+        position = self.lengths["word_ids"]
+        remap = np.array([self.table.setdefault(word, len(self.table)) for word in timeline.vocabulary],
+                         dtype=np.uint32)
+        # Débuts croissants d'une fenêtre à l'autre, comme dans une chronologie unique
+        starts = np.maximum(np.maximum.accumulate(timeline.starts), self.last_start)
+        if len(starts):
+            self.last_start = starts[-1]
+        self._write("starts_ms", to_ms(starts))
+        self._write("ends_ms", to_ms(np.maximum(timeline.ends, starts)))
+        self._write("probabilities", timeline.probabilities)
+        self._write("word_ids", remap[timeline.word_ids] if len(remap) else timeline.word_ids)
+        self._write("segment_offsets", timeline.segment_offsets[1:] + position)
+        self._write("segment_starts_ms", to_ms(timeline.segment_starts))
+        self._write("segment_ends_ms", to_ms(timeline.segment_ends))
+
+    def close(self) -> str:
+        """Assemblage du .npz (écriture atomique) et suppression des fichiers temporaires"""
+        for f in self.files.values():
+            f.close()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp.npz"
+        small = {
+            "version": np.int32(TRANSCRIPT_VERSION),
+            "source": np.array(os.path.abspath(self.source) if self.source else ""),
+            "vocabulary": np.array(list(self.table), dtype=str),
+        }
+        try:
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+                for name, value in small.items():
+                    with archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+                        np.lib.format.write_array(f, np.asanyarray(value), allow_pickle=False)
+                for name, dtype in self.COLUMNS.items():
+                    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                              "fortran_order": False, "shape": (self.lengths[name],)}
+                    with archive.open(f"{name}.npy", "w", force_zip64=True) as f, \
+                            open(os.path.join(self.spill_dir, name), "rb") as column:
+                        np.lib.format.write_array_header_1_0(f, header)
+                        shutil.copyfileobj(column, f, self.COPY_BYTES)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+        return self.path
+
+    def abort(self):
+        for f in self.files.values():
+            f.close()
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+def cue_start(segment: dict, previous_end: float, start_padding: float = 0.5) -> float:
+    """Début d'affichage d'un segment, avec les mêmes règles que WordTimeline.to_srt
+    (previous_end : fin du segment précédent, 0 pour le premier)"""
+    return max(min(max(segment["start"] - start_padding, previous_end), segment["start"]), 0.0)
+
+def segment_cue(segment: dict, previous_end: float, index: int, start_padding: float = 0.5) -> pysrt.SubRipItem:
+    """Sous-titre d'un segment isolé, produit au fil de la transcription"""
+    return pysrt.SubRipItem(
+        index=index,
+        start=pysrt.SubRipTime(seconds=cue_start(segment, previous_end, start_padding)),
+        end=pysrt.SubRipTime(seconds=segment["end"]),
+        text=" ".join(word["word"] for word in segment.get("words", []))
+    )
+
+class CueIndex:
+    """Index d'intervalles sur les sous-titres, maintenu à côté de la liste.
+
+    Les cues sont triés par début dans des tableaux NumPy (millisecondes) ;
+    le maximum cumulé des fins (reach) étant croissant, une dichotomie suffit
+    à écarter tous les cues terminés avant un instant donné. Les requêtes
+    ponctuelles et par plage coûtent donc O(log n + k). Les identifiants
+    suivent l'ordre de la liste de sous-titres, ce qui permet de repérer les
+    cues hors ordre lors de la validation.
+    """
+
+    def __init__(self):
+        self.starts = np.empty(0, dtype=np.int64)
+        self.ends = np.empty(0, dtype=np.int64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.reach = np.empty(0, dtype=np.int64)
+        self.spans: Dict[int, Tuple[int, int]] = {}
+
+    @classmethod
+    def from_subtitles(cls, subtitles: pysrt.SubRipFile,
+                       ids: Optional[List[int]] = None) -> "CueIndex":
+        """Construction en bloc ; par défaut l'identifiant est la position dans la liste"""
+        index = cls()
+        count = len(subtitles)
+        starts = np.fromiter((sub.start.ordinal for sub in subtitles), dtype=np.int64, count=count)
+        ends = np.fromiter((sub.end.ordinal for sub in subtitles), dtype=np.int64, count=count)
+        cue_ids = np.arange(count, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+
+        order = np.lexsort((cue_ids, starts))
+        index.starts, index.ends, index.ids = starts[order], ends[order], cue_ids[order]
+        index.spans = dict(zip(cue_ids.tolist(), zip(starts.tolist(), ends.tolist())))
+        index._update_reach()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _update_reach(self):
+        self.reach = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends.copy()
+
+    def _position(self, cue_id: int, start: int) -> int:
+        """Position triée (début, identifiant) d'un cue existant ou à insérer"""
+        lo = int(np.searchsorted(self.starts, start, side='left'))
+        hi = int(np.searchsorted(self.starts, start, side='right'))
+        return lo + int(np.searchsorted(self.ids[lo:hi], cue_id))
+
+    def add(self, cue_id: int, start: int, end: int):
+        """Ajout d'un cue (temps en millisecondes)"""
+        position = self._position(cue_id, start)
+        self.starts = np.insert(self.starts, position, start)
+        self.ends = np.insert(self.ends, position, end)
+        self.ids = np.insert(self.ids, position, cue_id)
+        self.spans[cue_id] = (start, end)
+        self._update_reach()
+
+    def add_many(self, cue_ids: List[int], starts: List[int], ends: List[int]):
+        """Ajout en bloc (temps en millisecondes) : une seule recopie des tableaux"""
+        cue_ids = np.asarray(cue_ids, dtype=np.int64)
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        # Triés, les nouveaux cues de même position d'insertion gardent l'ordre (début, identifiant)
+        order = np.lexsort((cue_ids, starts))
+        cue_ids, starts, ends = cue_ids[order], starts[order], ends[order]
+        positions = [self._position(cue_id, start) for cue_id, start in zip(cue_ids.tolist(), starts.tolist())]
+        self.starts = np.insert(self.starts, positions, starts)
+        self.ends = np.insert(self.ends, positions, ends)
+        self.ids = np.insert(self.ids, positions, cue_ids)
+        self.spans.update(zip(cue_ids.tolist(), zip(starts.tolist(), ends.tolist())))
+        self._update_reach()
+
+    def remove(self, cue_id: int):
+        start, _ = self.spans.pop(cue_id)
+        position = self._position(cue_id, start)
+        self.starts = np.delete(self.starts, position)
+        self.ends = np.delete(self.ends, position)
+        self.ids = np.delete(self.ids, position)
+        self._update_reach()
+
+    def update(self, cue_id: int, start: int, end: int):
+        """Mise à jour après édition des temps d'un cue"""
+        if self.spans.get(cue_id) == (start, end):
+            return
+        self.remove(cue_id)
+        self.add(cue_id, start, end)
+
+    def _candidates(self, start: int, end: int) -> np.ndarray:
+        """Positions triées des cues intersectant [start, end)"""
+        first = int(np.searchsorted(self.reach, start, side='right'))
+        last = int(np.searchsorted(self.starts, end, side='left'))
+        if last <= first:
+            return np.empty(0, dtype=np.int64)
+        return first + np.flatnonzero(self.ends[first:last] > start)
+
+    def at(self, time: float) -> List[int]:
+        """Identifiants des cues affichés à l'instant time (secondes)"""
+        instant = int(round(time * 1000))
+        return self.ids[self._candidates(instant, instant + 1)].tolist()
+
+    def between(self, start: float, end: float) -> List[int]:
+        """Identifiants des cues intersectant [start, end) (secondes), par ordre de début"""
+        return self.ids[self._candidates(int(round(start * 1000)), int(round(end * 1000)))].tolist()
+
+    def seek(self, time: float) -> Optional[int]:
+        """Cue affiché à l'instant time, à défaut le suivant (ou le dernier)"""
+        if not len(self):
+            return None
+        covering = self.at(time)
+        if covering:
+            return covering[0]
+        position = int(np.searchsorted(self.starts, int(round(time * 1000)), side='left'))
+        return int(self.ids[min(position, len(self) - 1)])
+
+    def display_ends(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Identifiants par ordre de début et fins (ms) tronquées au début du cue suivant"""
+        following = np.searchsorted(self.starts, self.starts, side='right')
+        next_starts = np.append(self.starts, np.iinfo(np.int64).max)[following]
+        return self.ids, np.minimum(self.ends, next_starts)
+
+    def validate(self, max_gap: float = 5.0) -> CueValidation:
+        """Vérification en bloc : chevauchements, trous de plus de max_gap secondes,
+        cues hors ordre et cues de durée nulle ou négative"""
+        report = CueValidation()
+        if not len(self):
+            return report
+
+        invalid = (self.ends <= self.starts) | (self.starts < 0)
+        report.invalid = self.ids[invalid].tolist()
+
+        # Cue atteignant le maximum cumulé des fins, pour nommer la paire en conflit
+        positions = np.arange(len(self))
+        holder = np.maximum.accumulate(np.where(self.ends == self.reach, positions, 0))
+        previous_reach, previous_holder = self.reach[:-1], holder[:-1]
+        following = positions[1:]
+
+        overlapping = self.starts[1:] < previous_reach
+        report.overlaps = list(zip(self.ids[previous_holder[overlapping]].tolist(),
+                                   self.ids[following[overlapping]].tolist()))
+
+        gap = (self.starts[1:] - previous_reach) / 1000.0
+        gapped = gap > max_gap
+        report.gaps = list(zip(self.ids[previous_holder[gapped]].tolist(),
+                               self.ids[following[gapped]].tolist(),
+                               gap[gapped].tolist()))
+
+        # Ordre de la liste (identifiants croissants) contre ordre chronologique
+        list_order = np.argsort(self.ids, kind='stable')
+        list_starts = self.starts[list_order]
+        late = list_starts[1:] < np.maximum.accumulate(list_starts)[:-1]
+        report.out_of_order = self.ids[list_order][1:][late].tolist()
+        return report
+
+class TranscriptionCache:
+    """Cache disque des segments Whisper, adressé par le contenu audio.
+
+    La clé combine l'empreinte de l'audio décodé et les paramètres du modèle,
+    de sorte qu'un nouveau rendu (ou une reprise après erreur) de la même
+    vidéo n'a pas à relancer l'inférence. Les entrées les moins récemment
+    utilisées sont supprimées lorsque la taille totale dépasse max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint_audio(audio: Union[str, np.ndarray]) -> str:
+        """Empreinte SHA-256 de l'audio décodé (fichier ou tableau PCM)"""
+        digest = hashlib.sha256()
+        if isinstance(audio, np.ndarray):
+            digest.update(np.ascontiguousarray(audio).data)
+            return digest.hexdigest()
+        with open(audio, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(audio_fingerprint: str, settings: dict) -> str:
+        """Clé de cache à partir de l'empreinte audio et des paramètres de décodage"""
+        payload = audio_fingerprint + json.dumps(settings, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        """Lecture des segments en cache (None si absents)"""
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            # La date de modification sert d'horodatage LRU
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry["segments"]
+
+    def put(self, key: str, segments: List[dict], settings: dict):
+        """Écriture atomique d'une entrée puis éviction si nécessaire"""
+        entry = {"key": key, "settings": settings, "created": time.time(), "segments": segments}
+        tmp_path = f"{self._entry_path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            json.dump(entry, f, default=float)
+        os.replace(tmp_path, self._entry_path(key))
+        self.prune()
+
+    def entries(self) -> List[dict]:
+        """Liste des entrées, de la plus récemment utilisée à la plus ancienne"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append({"key": name[:-5], "size": stat.st_size, "last_used": stat.st_mtime})
+        return sorted(entries, key=lambda e: e["last_used"], reverse=True)
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Suppression des entrées les plus anciennes au-delà de max_bytes, retourne le nombre supprimé"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(e["size"] for e in entries)
+        removed = 0
+        while entries and total > max_bytes:
+            entry = entries.pop()
+            try:
+                os.remove(self._entry_path(entry["key"]))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+        return removed
+
+    def describe(self, key: str) -> Optional[dict]:
+        """Paramètres et taille d'une entrée, sans les segments"""
+        try:
+            with open(self._entry_path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return {"key": key, "settings": entry["settings"], "created": entry["created"],
+                "segments": len(entry["segments"])}
+
+def run_cache_command(args: argparse.Namespace):
+    """Inspection et nettoyage du cache de transcription"""
+    cache = TranscriptionCache(args.cache_dir)
+    if args.action == "list":
+        for entry in cache.entries():
+            info = cache.describe(entry["key"]) or {"settings": {}, "segments": "?"}
+            last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_used"]))
+            print(f"{entry['key'][:16]}  {entry['size'] / 1024:10.1f} Ko  {last_used}  "
+                  f"{info['segments']} segments  {json.dumps(info['settings'], sort_keys=True)}")
+    elif args.action == "stats":
+        entries = cache.entries()
+        total = sum(e["size"] for e in entries)
+        print(f"{len(entries)} entrées, {total / 1024 ** 2:.1f} Mo dans {cache.cache_dir}")
+    elif args.action == "prune":
+        removed = cache.prune(int(args.max_size * 1024 ** 2))
+        print(f"{removed} entrées supprimées")
+    elif args.action == "clear":
+        removed = cache.prune(0)
+        print(f"{removed} entrées supprimées")
+
+class TranscriptIndex:
+    """Index inversé (SQLite) des transcripts mot à mot d'une bibliothèque de vidéos.
+
+    Pour chaque terme (mot normalisé) et chaque vidéo, les occurrences sont
+    stockées dans une seule ligne sous forme de tableaux int32 compactés :
+    position du mot dans le transcript, début et fin en millisecondes. Une
+    recherche ne lit donc que les lignes de ses termes, quelle que soit la
+    taille de la bibliothèque. Les transcripts sont ajoutés, remplacés (si
+    le fichier a changé) ou retirés un par un, sans reconstruire l'index.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS videos (
+            id INTEGER PRIMARY KEY,
+            transcript TEXT UNIQUE NOT NULL,
+            video TEXT,
+            mtime REAL NOT NULL,
+            words INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS terms (
+            id INTEGER PRIMARY KEY,
+            term TEXT UNIQUE NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            term_id INTEGER NOT NULL,
+            video_id INTEGER NOT NULL,
+            positions BLOB NOT NULL,
+            starts_ms BLOB NOT NULL,
+            ends_ms BLOB NOT NULL,
+            PRIMARY KEY (term_id, video_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_video ON postings (video_id);
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def query_terms(query: str) -> List[str]:
+        return [term for term in map(_normalize_word, query.split()) if term]
+
+    def _term_ids(self, terms: List[str]) -> Dict[str, int]:
+        """Identifiants des termes, créés au besoin"""
+        self.connection.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", ((t,) for t in terms))
+        ids = {}
+        for first in range(0, len(terms), 500):
+            chunk = terms[first:first + 500]
+            ids.update(self.connection.execute(
+                f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk))
+        return ids
+
+    def _remove(self, video_id: int):
+        self.connection.execute("DELETE FROM postings WHERE video_id = ?", (video_id,))
+        self.connection.execute("DELETE FROM videos WHERE id = ?", (video_id,))
+
+    def add(self, transcript_path: str) -> bool:
+        """Indexation d'un transcript (words.npz) ; False s'il est déjà indexé dans cette version"""
+        transcript_path = os.path.abspath(transcript_path)
+        mtime = os.path.getmtime(transcript_path)
+        row = self.connection.execute("SELECT id, mtime FROM videos WHERE transcript = ?",
+                                      (transcript_path,)).fetchone()
+        if row is not None and row[1] == mtime:
+            return False
+
+        timeline = WordTimeline.load(transcript_path)
+        # Les mots du vocabulaire qui se normalisent à l'identique partagent un terme
+        vocabulary_terms = [_normalize_word(word) for word in timeline.vocabulary]
+        terms = sorted(set(term for term in vocabulary_terms if term))
+        with self.connection:
+            if row is not None:
+                self._remove(row[0])
+            video_id = self.connection.execute(
+                "INSERT INTO videos (transcript, video, mtime, words) VALUES (?, ?, ?, ?)",
+                (transcript_path, timeline.source, mtime, len(timeline))).lastrowid
+            term_ids = self._term_ids(terms)
+            # Regroupement des positions par terme : un tri stable garde l'ordre chronologique
+            word_terms = np.array([term_ids.get(term, -1) for term in vocabulary_terms],
+                                  dtype=np.int64)[timeline.word_ids] if len(timeline) else np.empty(0, np.int64)
+            order = np.argsort(word_terms, kind="stable")
+            sorted_terms = word_terms[order]
+            bounds = np.flatnonzero(np.diff(sorted_terms)) + 1
+            starts_ms = np.round(timeline.starts * 1000).astype(np.int32)
+            ends_ms = np.round(timeline.ends * 1000).astype(np.int32)
+            rows = []
+            for group in np.split(order, bounds):
+                if len(group) == 0 or word_terms[group[0]] < 0:
+                    continue
+                rows.append((int(word_terms[group[0]]), video_id, group.astype(np.int32).tobytes(),
+                             starts_ms[group].tobytes(), ends_ms[group].tobytes()))
+            self.connection.executemany("INSERT INTO postings VALUES (?, ?, ?, ?, ?)", rows)
+        return True
+
+    def remove(self, path: str) -> bool:
+        """Retrait d'un transcript de l'index (chemin du transcript ou de la vidéo)"""
+        path = os.path.abspath(path)
+        with self.connection:
+            rows = self.connection.execute("SELECT id FROM videos WHERE transcript = ? OR video = ?",
+                                           (path, path)).fetchall()
+            for (video_id,) in rows:
+                self._remove(video_id)
+        return bool(rows)
+
+    def sync(self, root: str) -> Tuple[int, int]:
+        """Indexation des transcripts (words.npz) nouveaux ou modifiés sous root, retrait de ceux disparus
+
+        Retourne (transcripts indexés, transcripts retirés).
+        """
+        root = os.path.abspath(root)
+        found = set()
+        for directory, _, files in os.walk(root):
+            found.update(os.path.join(directory, name) for name in files if name == TRANSCRIPT_FILE)
+        added = sum(self.add(path) for path in sorted(found))
+        indexed = [path for (path,) in self.connection.execute("SELECT transcript FROM videos")
+                   if path.startswith(root + os.sep)]
+        removed = sum(self.remove(path) for path in indexed if path not in found)
+        return added, removed
+
+    def _term_id(self, term: str) -> Optional[int]:
+        row = self.connection.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()
+        return row[0] if row else None
+
+    def _select_in(self, query: str, column: str, ids: List[int], *params) -> List[tuple]:
+        """Lignes de query restreintes à column IN ids, par paquets sous la limite de paramètres de SQLite"""
+        rows = []
+        for first in range(0, len(ids), 500):
+            chunk = ids[first:first + 500]
+            rows.extend(self.connection.execute(
+                f"{query} {column} IN ({','.join('?' * len(chunk))})", (*params, *chunk)))
+        return rows
+
+    def _postings(self, term_id: int, video_ids: Optional[List[int]] = None) -> Dict[int, Tuple[np.ndarray, ...]]:
+        """Occurrences (positions, débuts, fins) d'un terme par vidéo, éventuellement limitées à video_ids"""
+        query = "SELECT video_id, positions, starts_ms, ends_ms FROM postings WHERE term_id = ?"
+        if video_ids is None:
+            rows = list(self.connection.execute(query, (term_id,)))
+        else:
+            rows = self._select_in(f"{query} AND", "video_id", video_ids, term_id)
+        return {video_id: tuple(np.frombuffer(blob, dtype=np.int32) for blob in blobs)
+                for video_id, *blobs in rows}
+
+    def search(self, query: str, limit: Optional[int] = 100) -> List[dict]:
+        """Occurrences d'un mot ou d'une expression (mots consécutifs), par vidéo puis par instant
+
+        Le terme présent dans le moins de vidéos est lu en premier ; les
+        autres ne sont lus que pour les vidéos qui le contiennent.
+        """
+        term_ids = [self._term_id(term) for term in self.query_terms(query)]
+        if not term_ids or None in term_ids:
+            return []
+        frequencies = [self.connection.execute("SELECT COUNT(*) FROM postings WHERE term_id = ?",
+                                               (term_id,)).fetchone()[0] for term_id in term_ids]
+        order = sorted(range(len(term_ids)), key=frequencies.__getitem__)
+        postings: Dict[int, Dict[int, Tuple[np.ndarray, ...]]] = {}
+        videos = None
+        for k in order:
+            postings[k] = self._postings(term_ids[k], None if videos is None else sorted(videos))
+            videos = set(postings[k]) if videos is None else videos & set(postings[k])
+            if not videos:
+                return []
+        # Seules les vidéos contenant tous les termes sont lues, pas toute la bibliothèque
+        names = {row[0]: row[1:] for row in self._select_in("SELECT id, video, transcript FROM videos WHERE",
+                                                            "id", sorted(videos))}
+
+        rarest, last = order[0], len(term_ids) - 1
+        hits = []
+        for video_id in sorted(videos, key=lambda v: names[v]):
+            # Positions de début d'expression candidates, d'après le terme le plus rare
+            first = postings[rarest][video_id][0] - rarest
+            for k in order[1:]:
+                # Positions triées et uniques : appartenance par dichotomie
+                positions = postings[k][video_id][0]
+                found = np.minimum(np.searchsorted(positions, first + k), len(positions) - 1)
+                first = first[positions[found] == first + k]
+            if not len(first):
+                continue
+            positions, starts_ms, _ = postings[0][video_id]
+            last_positions, _, last_ends = postings[last][video_id]
+            starts = starts_ms[np.searchsorted(positions, first)]
+            ends = last_ends[np.searchsorted(last_positions, first + last)]
+            video, transcript = names[video_id]
+            hits.extend({"video": video or transcript, "transcript": transcript,
+                         "start_ms": start_ms, "end_ms": end_ms}
+                        for start_ms, end_ms in zip(starts.tolist(), ends.tolist()))
+            if limit is not None and len(hits) >= limit:
+                return hits[:limit]
+        return hits
+
+    def stats(self) -> dict:
+        videos, words = self.connection.execute("SELECT COUNT(*), COALESCE(SUM(words), 0) FROM videos").fetchone()
+        terms = self.connection.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+        return {"videos": videos, "words": words, "terms": terms, "bytes": os.path.getsize(self.path)}
+
+def run_index_command(args: argparse.Namespace):
+    """Mise à jour et inspection de l'index des transcripts"""
+    with TranscriptIndex(args.index) as index:
+        if args.action == "add":
+            for path in args.paths:
+                if os.path.isdir(path):
+                    added, removed = index.sync(path)
+                    print(f"{path}: {added} transcripts indexés, {removed} retirés")
+                else:
+                    print(f"{path}: {'indexé' if index.add(path) else 'déjà à jour'}")
+        elif args.action == "remove":
+            for path in args.paths:
+                status = "retiré" if index.remove(path) else "absent de l'index"
+                print(f"{path}: {status}")
+        elif args.action == "stats":
+            stats = index.stats()
+            print(f"{stats['videos']} vidéos, {stats['words']} mots, {stats['terms']} termes, "
+                  f"{stats['bytes'] / 1024 ** 2:.1f} Mo dans {index.path}")
+
+def run_search_command(args: argparse.Namespace):
+    """Recherche d'un mot ou d'une expression dans l'index des transcripts"""
+    with TranscriptIndex(args.index) as index:
+        start = time.perf_counter()
+        hits = index.search(args.query, args.limit)
+        elapsed = time.perf_counter() - start
+    for hit in hits:
+        timestamp = pysrt.SubRipTime.from_ordinal(hit["start_ms"])
+        print(f"{hit['video']}\t{timestamp}\t{hit['start_ms']}-{hit['end_ms']} ms")
+    logger.info(f"{len(hits)} occurrence(s) de « {args.query} » en {elapsed * 1000:.1f} ms")
+
+def open_with_default_player(path: str):
+    """Ouverture d'un fichier avec l'application par défaut du système"""
+    if sys.platform == "win32":
+        os.startfile(path)
+    else:
+        subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", path])
+
+class BackgroundJob:
+    """Étape longue exécutée dans un thread, sans bloquer l'interface Tk.
+
+    target(post) tourne dans le thread de travail et ne touche jamais aux
+    widgets : il dépose ses messages (type, contenu) avec post dans une file
+    thread-safe, que l'interface relève toutes les POLL_MS millisecondes
+    (root.after) pour les transmettre au gestionnaire du même type. Le
+    résultat de target est transmis à "done", son exception à "error".
+    """
+    POLL_MS = 100
+    _local = threading.local()
+
+    def __init__(self, root: tk.Misc, target: Callable[[Callable], object],
+                 handlers: Dict[str, Callable[[object], None]]):
+        self.root = root
+        self.target = target
+        self.handlers = handlers
+        self.messages: "queue.Queue[Tuple[str, object]]" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.finished = False
+
+    def start(self) -> "BackgroundJob":
+        self.thread.start()
+        self.root.after(self.POLL_MS, self.poll)
+        return self
+
+    def post(self, kind: str, payload: object = None):
+        self.messages.put((kind, payload))
+
+    @classmethod
+    def current(cls) -> Optional["BackgroundJob"]:
+        """Job dont le thread de travail est le thread appelant (None ailleurs)"""
+        return getattr(cls._local, "job", None)
+
+    def _run(self):
+        BackgroundJob._local.job = self
+        try:
+            self.post("done", self.target(self.post))
+        except Exception as e:
+            logger.error(f"Erreur dans la tâche de fond: {e}")
+            self.post("error", e)
+
+    def poll(self):
+        """Distribution des messages en attente sur le thread de l'interface"""
+        while True:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            handler = self.handlers.get(kind)
+            if handler is not None:
+                handler(payload)
+            if kind in ("done", "error"):
+                self.finished = True
+                return
+        self.root.after(self.POLL_MS, self.poll)
+
+class ProgressPanel:
+    """Texte d'état et barre de progression (indéterminée tant que le pourcentage est inconnu)"""
+
+    def __init__(self, parent: tk.Misc):
+        self.frame = ttk.Frame(parent)
+        self.label = ttk.Label(self.frame, text="", width=60, anchor=tk.W)
+        self.label.pack(side=tk.LEFT, padx=5)
+        self.bar = ttk.Progressbar(self.frame, mode="indeterminate", maximum=100)
+        self.bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.running = False
+
+    def update(self, percent: Optional[float], text: str):
+        if percent is None:
+            if not self.running:
+                self.bar.config(mode="indeterminate")
+                self.bar.start(50)
+                self.running = True
+        else:
+            if self.running:
+                self.bar.stop()
+                self.running = False
+            self.bar.config(mode="determinate", value=min(100.0, percent))
+        self.label.config(text=text)
+
+    def stop(self):
+        if self.running:
+            self.bar.stop()
+            self.running = False
+
+class VirtualCueTable:
+    """
+    Tableau virtualisé : seules les lignes visibles existent dans le Treeview
+
+    Un nombre fixe de lignes est créé puis réutilisé lors du défilement ; le
+    contenu de chaque ligne est demandé à la source (row_count, row_values,
+    row_id) au moment de l'affichage. La sélection est conservée par identifiant
+    de sous-titre (row_id / row_of) et non par position.
+    """
+    ROW_HEIGHT = 22
+    HEADING_HEIGHT = 26
+
+    def __init__(self, parent, columns: Tuple[str, ...], widths: List[int],
+                 row_count: Callable[[], int], row_values: Callable[[int], tuple],
+                 row_id: Callable[[int], int], row_of: Callable[[int], int]):
+        self.row_count = row_count
+        self.row_values = row_values
+        self.row_id = row_id
+        self.row_of = row_of
+        self.first = 0
+        self.slots: List[str] = []
+        self.selected_id: Optional[int] = None
+
+        style = ttk.Style(parent)
+        style.configure("Virtual.Treeview", rowheight=self.ROW_HEIGHT)
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show='headings',
+                                 selectmode='browse', style="Virtual.Treeview")
+        for col, width in zip(columns, widths):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width)
+
+        # Le défilement vertical est géré ici, le Treeview ne contient que la fenêtre visible
+        self.vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self.on_scrollbar)
+        hsb = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.vsb.grid(row=0, column=1, sticky='ns')
+        hsb.grid(row=1, column=0, sticky='ew')
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.tree.bind(sequence, self.on_wheel)
+        for sequence in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            self.tree.bind(sequence, self.on_key)
+
+    def on_wheel(self, event):
+        """Molette (Windows/macOS : delta, X11 : boutons 4 et 5)"""
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_units(-1 if up else 1)
+        return "break"
+
+    def on_key(self, event):
+        """Navigation clavier dans l'ensemble des lignes, pas seulement les visibles"""
+        page = len(self.slots)
+        delta = {"Up": -1, "Down": 1, "Prior": -page, "Next": page,
+                 "Home": -self.row_count(), "End": self.row_count()}[event.keysym]
+        self.move_selection(delta)
+        return "break"
+
+    def on_resize(self, event):
+        """Ajustement du nombre de lignes matérialisées à la hauteur du tableau"""
+        visible = max(1, (event.height - self.HEADING_HEIGHT) // self.ROW_HEIGHT)
+        if visible != len(self.slots):
+            self.resize(visible)
+
+    def resize(self, visible: int):
+        while len(self.slots) < visible:
+            self.slots.append(self.tree.insert('', 'end', iid=f"row{len(self.slots)}"))
+        while len(self.slots) > visible:
+            self.tree.delete(self.slots.pop())
+        self.refresh()
+
+    def max_first(self) -> int:
+        return max(0, self.row_count() - len(self.slots))
+
+    def scroll_to(self, first: int):
+        first = min(max(0, first), self.max_first())
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def scroll_units(self, units: int):
+        self.scroll_to(self.first + units * 3)
+
+    def on_scrollbar(self, action: str, value: str, unit: Optional[str] = None):
+        """Commande de la barre de défilement (moveto / scroll units|pages)"""
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.row_count()))
+        elif action == "scroll":
+            step = len(self.slots) if unit == "pages" else 1
+            self.scroll_to(self.first + int(value) * step)
+
+    def see(self, row: int):
+        """Défilement minimal pour rendre la ligne visible"""
+        if row < self.first:
+            self.scroll_to(row)
+        elif row >= self.first + len(self.slots):
+            self.scroll_to(row - len(self.slots) + 1)
+
+    def refresh(self):
+        """Mise à jour des lignes visibles uniquement"""
+        count = self.row_count()
+        self.first = min(self.first, self.max_first())
+        selected_slot = None
+        for k, slot in enumerate(self.slots):
+            row = self.first + k
+            if row < count:
+                self.tree.item(slot, values=self.row_values(row))
+                if self.row_id(row) == self.selected_id:
+                    selected_slot = slot
+            else:
+                self.tree.item(slot, values=())
+        # La sélection suit l'identifiant, même hors de la fenêtre visible
+        self.tree.selection_set(selected_slot or ())
+
+        if count:
+            self.vsb.set(self.first / count, min(1.0, (self.first + len(self.slots)) / count))
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def refresh_row(self, row: int):
+        """Mise à jour d'une seule ligne, si elle est visible"""
+        k = row - self.first
+        if 0 <= k < len(self.slots) and row < self.row_count():
+            self.tree.item(self.slots[k], values=self.row_values(row))
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            row = self.first + self.slots.index(selection[0])
+            if row < self.row_count():
+                self.selected_id = self.row_id(row)
+
+    def select(self, row: int):
+        """Sélection d'une ligne par position, avec défilement si nécessaire"""
+        if not 0 <= row < self.row_count():
+            return
+        self.selected_id = self.row_id(row)
+        self.see(row)
+        self.refresh()
+
+    def move_selection(self, delta: int):
+        row = self.selected_row()
+        self.select(min(max(0, (row if row is not None else self.first - 1) + delta), self.row_count() - 1))
+
+    def selected_row(self) -> Optional[int]:
+        """Position courante du sous-titre sélectionné, visible ou non"""
+        if self.selected_id is None:
+            return None
+        return self.row_of(self.selected_id)
+
 class SubtitleEditor:
-    def __init__(self, subtitles: pysrt.SubRipFile, callback_after_save):
+    def __init__(self, subtitles: pysrt.SubRipFile, callback_after_save,
+                 timeline: Optional[WordTimeline] = None,
+                 generator: Optional["SubtitleGenerator"] = None,
+                 metadata: Optional[VideoMetadata] = None, loading: bool = False):
         """
         Interface d'édition des sous-titres avec visualisation en tableau
+
+        Si la chronologie des mots est fournie, la confiance moyenne de la
+        transcription est affichée pour repérer les passages à vérifier.
+
+        Chaque sous-titre reçoit un identifiant stable (cue_ids, parallèle à
+        subtitles) ; les numéros affichés sont calculés à partir de la position
+        et les index SRT ne sont renumérotés qu'à la sauvegarde. Un index
+        d'intervalles (self.index) est tenu à jour pour la navigation par
+        instant et la validation.
+
+        Si le générateur est fourni, un aperçu rapide de la vidéo autour du
+        sous-titre sélectionné peut être rendu sans quitter l'éditeur.
+
+        Avec loading, l'éditeur s'ouvre avant la fin de la transcription :
+        une barre de progression est affichée, les sous-titres arrivent par
+        extend_cues et le générateur par attach_generator, et la fermeture
+        attend loading_finished.
         """
         self.subtitles = subtitles
+        self.cue_ids: List[int] = list(range(len(subtitles)))
+        self.next_cue_id = len(subtitles)
+        self.index = CueIndex.from_subtitles(subtitles, self.cue_ids)
+        self.timeline = timeline
+        self.generator = generator
+        self.metadata = metadata
+        self.preview_executor = ThreadPoolExecutor(max_workers=1)
+        self.preview_job = None
+        self.preview_dir: Optional[str] = None
         self.modified = False
+        self.loading = loading
         self.callback_after_save = callback_after_save
         self.setup_gui()
 
@@ -42,7 +1981,7 @@ class SubtitleEditor:
         self.create_menu()
         self.create_main_frame()
         self.create_buttons()
-        self.populate_tree()
+        self.create_status_bar()
         self.bind_events()
 
     def create_menu(self):
@@ -60,32 +1999,27 @@ class SubtitleEditor:
         menubar.add_cascade(label="Édition", menu=edit_menu)
         edit_menu.add_command(label="Modifier la sélection", command=self.edit_subtitle)
         edit_menu.add_command(label="Supprimer la sélection", command=self.delete_subtitle)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Aller à l'instant...", command=self.goto_time)
+        edit_menu.add_command(label="Vérifier les sous-titres", command=self.validate_subtitles)
+        if self.generator is not None or self.loading:
+            edit_menu.add_command(label="Aperçu de la sélection", command=self.preview_selection)
 
     def create_main_frame(self):
-        """Création du frame principal avec le tableau"""
+        """Création du frame principal avec le tableau virtualisé"""
         main_frame = ttk.Frame(self.root)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        # Configuration du tableau
-        columns = ('Index', 'Début', 'Fin', 'Texte')
-        self.tree = ttk.Treeview(main_frame, columns=columns, show='headings')
-        
-        for col, width in zip(columns, [50, 100, 100, 900]):
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=width)
-
-        # Scrollbars
-        vsb = ttk.Scrollbar(main_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(main_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        # Placement des éléments
-        self.tree.grid(row=0, column=0, sticky='nsew')
-        vsb.grid(row=0, column=1, sticky='ns')
-        hsb.grid(row=1, column=0, sticky='ew')
-
-        main_frame.grid_rowconfigure(0, weight=1)
-        main_frame.grid_columnconfigure(0, weight=1)
+        columns = ('Index', 'Début', 'Fin', 'Confiance', 'Texte')
+        self.table = VirtualCueTable(
+            main_frame, columns, [50, 100, 100, 80, 820],
+            row_count=lambda: len(self.subtitles),
+            row_values=lambda row: self.row_values(row, self.subtitles[row]),
+            row_id=lambda row: self.cue_ids[row],
+            row_of=self.position_of
+        )
+        self.table.frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = self.table.tree
 
     def create_buttons(self):
         """Création des boutons d'action"""
@@ -96,27 +2030,205 @@ class SubtitleEditor:
             ("Ajouter", self.add_subtitle),
             ("Modifier", self.edit_subtitle),
             ("Supprimer", self.delete_subtitle),
+            ("Aller à", self.goto_time),
+            ("Vérifier", self.validate_subtitles),
             ("Sauvegarder", self.save_subtitles),
             ("Terminer", self.finish)
         ]
+        if self.generator is not None or self.loading:
+            buttons.insert(5, ("Aperçu", self.preview_selection))
 
         for text, command in buttons:
             ttk.Button(button_frame, text=text, command=command).pack(side=tk.LEFT, padx=5)
 
+    def create_status_bar(self):
+        """Barre de progression de la transcription en cours (mode loading)"""
+        self.progress = ProgressPanel(self.root)
+        if self.loading:
+            self.progress.frame.pack(fill=tk.X, padx=10, pady=5)
+            self.progress.update(None, "Analyse de la vidéo...")
+
     def bind_events(self):
         """Configuration des événements"""
         self.tree.bind('<Double-1>', lambda e: self.edit_subtitle())
         self.tree.bind('<Delete>', lambda e: self.delete_subtitle())
+        self.root.protocol("WM_DELETE_WINDOW", self.finish)
+
+    def row_values(self, row: int, sub: pysrt.SubRipItem) -> tuple:
+        """Valeurs affichées dans le tableau pour un sous-titre"""
+        confidence = ""
+        if self.timeline is not None:
+            probability = self.timeline.mean_probability(sub.start.ordinal / 1000.0, sub.end.ordinal / 1000.0)
+            if probability is not None:
+                confidence = f"{probability:.0%}"
+        return (
+            row + 1,
+            str(sub.start),
+            str(sub.end),
+            confidence,
+            sub.text.replace('\n', ' ')
+        )
+
+    def position_of(self, cue_id: int) -> int:
+        """Position courante d'un sous-titre à partir de son identifiant stable
+
+        Les identifiants sont attribués dans l'ordre de la liste (ajout en
+        fin, suppression sans réordonnancement) : cue_ids reste trié et une
+        dichotomie suffit.
+        """
+        row = bisect.bisect_left(self.cue_ids, cue_id)
+        if row == len(self.cue_ids) or self.cue_ids[row] != cue_id:
+            raise ValueError(f"Sous-titre inconnu: {cue_id}")
+        return row
+
+    def selected_cue_id(self) -> Optional[int]:
+        return self.table.selected_id
+
+    def append_cue(self, text: str, start: pysrt.SubRipTime, end: pysrt.SubRipTime) -> int:
+        """Ajout d'un sous-titre en fin de liste ; renvoie son identifiant"""
+        cue_id = self.next_cue_id
+        self.next_cue_id += 1
+        self.subtitles.append(pysrt.SubRipItem(len(self.subtitles) + 1, start, end, text))
+        self.cue_ids.append(cue_id)
+        self.index.add(cue_id, start.ordinal, end.ordinal)
+        self.modified = True
+        self.table.select(len(self.subtitles) - 1)
+        return cue_id
+
+    def update_cue(self, cue_id: int, text: str, start: pysrt.SubRipTime, end: pysrt.SubRipTime):
+        """Modification d'un sous-titre ; seule sa ligne est redessinée"""
+        row = self.position_of(cue_id)
+        sub = self.subtitles[row]
+        sub.text, sub.start, sub.end = text, start, end
+        self.index.update(cue_id, start.ordinal, end.ordinal)
+        self.modified = True
+        self.table.refresh_row(row)
+
+    def remove_cue(self, cue_id: int):
+        """Suppression d'un sous-titre ; seules les lignes visibles sont redessinées"""
+        row = self.position_of(cue_id)
+        del self.subtitles[row]
+        del self.cue_ids[row]
+        self.index.remove(cue_id)
+        self.modified = True
+        if self.table.selected_id == cue_id:
+            self.table.selected_id = self.cue_ids[min(row, len(self.cue_ids) - 1)] if self.cue_ids else None
+        self.table.refresh()
+
+    def select_cue(self, cue_id: int):
+        self.table.select(self.position_of(cue_id))
+
+    def attach_generator(self, generator: "SubtitleGenerator", metadata: VideoMetadata):
+        """Générateur et métadonnées disponibles une fois le modèle chargé (mode loading)"""
+        self.generator = generator
+        self.metadata = metadata
+
+    def extend_cues(self, cues: List[pysrt.SubRipItem], timeline: Optional[WordTimeline] = None):
+        """Ajout en fin de liste des sous-titres produits par la transcription en cours.
+
+        Ils ne comptent pas comme des modifications et la sélection n'est pas
+        déplacée ; seules les lignes visibles sont redessinées.
+        """
+        cue_ids = list(range(self.next_cue_id, self.next_cue_id + len(cues)))
+        self.next_cue_id += len(cues)
+        self.subtitles.extend(cues)
+        self.cue_ids.extend(cue_ids)
+        self.index.add_many(cue_ids, [sub.start.ordinal for sub in cues], [sub.end.ordinal for sub in cues])
+        if timeline is not None:
+            self.timeline = timeline
+        self.table.refresh()
+
+    def loading_finished(self, timeline: Optional[WordTimeline] = None):
+        if timeline is not None:
+            self.timeline = timeline
+            self.table.refresh()
+        self.loading = False
+        self.progress.stop()
+        self.progress.frame.pack_forget()
+
+    @staticmethod
+    def parse_time(value: str) -> float:
+        """Instant saisi en secondes ou au format SRT (hh:mm:ss,mmm)"""
+        value = value.strip()
+        try:
+            return float(value.replace(',', '.'))
+        except ValueError:
+            return pysrt.SubRipTime.from_string(value).ordinal / 1000.0
+
+    def goto_time(self):
+        """Sélection du sous-titre affiché à un instant donné"""
+        value = simpledialog.askstring("Aller à", "Instant (secondes ou hh:mm:ss,mmm) :", parent=self.root)
+        if not value:
+            return
+        try:
+            time_seconds = self.parse_time(value)
+        except (ValueError, pysrt.InvalidTimeString):
+            messagebox.showerror("Erreur", f"Format de temps invalide: {value}")
+            return
+        cue_id = self.index.seek(time_seconds)
+        if cue_id is not None:
+            self.select_cue(cue_id)
 
-    def populate_tree(self):
-        """Remplissage du tableau avec les sous-titres"""
-        for sub in self.subtitles:
-            self.tree.insert('', 'end', values=(
-                sub.index,
-                str(sub.start),
-                str(sub.end),
-                sub.text.replace('\n', ' ')
-            ))
+    def validate_subtitles(self):
+        """Vérification des chevauchements, trous et sous-titres hors ordre"""
+        report = self.index.validate()
+        problems = report.invalid + [second for _, second in report.overlaps] + report.out_of_order
+        if problems:
+            # Les identifiants suivent l'ordre de la liste : le plus petit est le premier
+            self.select_cue(min(problems))
+            messagebox.showwarning("Vérification", f"Sous-titres à vérifier : {report.summary()}")
+        else:
+            messagebox.showinfo("Vérification", f"Aucune erreur ({len(report.gaps)} trou(s) signalé(s)).")
+
+    def preview_selection(self):
+        """Aperçu basse résolution de la vidéo autour du sous-titre sélectionné"""
+        cue_id = self.selected_cue_id()
+        if cue_id is None:
+            messagebox.showwarning("Attention", "Veuillez sélectionner un sous-titre à prévisualiser.")
+            return
+        if self.preview_job is not None and not self.preview_job.done():
+            messagebox.showinfo("Aperçu", "Un aperçu est déjà en cours de rendu.")
+            return
+        if self.generator is None:
+            messagebox.showinfo("Aperçu", "L'aperçu sera disponible une fois la vidéo analysée.")
+            return
+
+        sub = self.subtitles[self.position_of(cue_id)]
+        start = max(0.0, sub.start.ordinal / 1000.0 - PREVIEW_MARGIN)
+        end = sub.end.ordinal / 1000.0 + PREVIEW_MARGIN
+        # Seuls les sous-titres de la fenêtre sont convertis en ASS
+        cues = pysrt.SubRipFile([self.subtitles[self.position_of(i)] for i in self.index.between(start, end)])
+
+        self.preview_dir = self.preview_dir or tempfile.mkdtemp(prefix="pikisub_preview_")
+        output_path = os.path.join(self.preview_dir, f"preview_{int(start * 1000)}.mp4")
+        self.root.config(cursor="watch")
+        # Pendant le chargement, generator.timeline est encore vide : la chronologie de
+        # l'éditeur, prolongée à chaque fenêtre, donne déjà les horodatages réels des mots
+        self.preview_job = self.preview_executor.submit(
+            self.generator.render_preview, cues, start, end, output_path, self.metadata,
+            timeline=self.timeline)
+        self.root.after(100, self.check_preview, output_path)
+
+    def check_preview(self, output_path: str):
+        """Attente du rendu de l'aperçu sans bloquer l'interface"""
+        if not self.preview_job.done():
+            self.root.after(100, self.check_preview, output_path)
+            return
+        self.root.config(cursor="")
+        try:
+            success = self.preview_job.result()
+        except Exception as e:
+            logger.error(f"Erreur lors du rendu de l'aperçu: {e}")
+            success = False
+        if success:
+            open_with_default_player(output_path)
+        else:
+            messagebox.showerror("Erreur", "Le rendu de l'aperçu a échoué.")
+
+    def renumber(self):
+        """Renumérotation des index SRT selon la position, avant sauvegarde"""
+        for i, sub in enumerate(self.subtitles, 1):
+            sub.index = i
 
     def add_subtitle(self):
         """Ajout d'un nouveau sous-titre"""
@@ -136,11 +2248,7 @@ class SubtitleEditor:
                 start = pysrt.SubRipTime.from_string(edit_window.start_entry.get())
                 end = pysrt.SubRipTime.from_string(edit_window.end_entry.get())
                 
-                sub = pysrt.SubRipItem(index, start, end, text)
-                self.subtitles.append(sub)
-                
-                self.tree.insert('', 'end', values=(index, str(start), str(end), text))
-                self.modified = True
+                self.append_cue(text, start, end)
                 edit_window.destroy()
                 
             except ValueError as e:
@@ -150,17 +2258,16 @@ class SubtitleEditor:
 
     def edit_subtitle(self):
         """Modification d'un sous-titre existant"""
-        selected_item = self.tree.selection()
-        if not selected_item:
+        cue_id = self.selected_cue_id()
+        if cue_id is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner un sous-titre à modifier.")
             return
 
-        item = selected_item[0]
-        index = int(self.tree.item(item)['values'][0]) - 1
-        sub = self.subtitles[index]
+        row = self.position_of(cue_id)
+        sub = self.subtitles[row]
         
         edit_window = self.create_edit_window(
-            title=f"Modifier le sous-titre #{sub.index}",
+            title=f"Modifier le sous-titre #{row + 1}",
             text=sub.text,
             start=sub.start,
             end=sub.end
@@ -168,18 +2275,12 @@ class SubtitleEditor:
         
         def save_changes():
             try:
-                sub.text = edit_window.text_entry.get('1.0', tk.END).strip()
-                sub.start = pysrt.SubRipTime.from_string(edit_window.start_entry.get())
-                sub.end = pysrt.SubRipTime.from_string(edit_window.end_entry.get())
-                
-                self.tree.item(item, values=(
-                    sub.index,
-                    str(sub.start),
-                    str(sub.end),
-                    sub.text.replace('\n', ' ')
-                ))
+                text = edit_window.text_entry.get('1.0', tk.END).strip()
+                start = pysrt.SubRipTime.from_string(edit_window.start_entry.get())
+                end = pysrt.SubRipTime.from_string(edit_window.end_entry.get())
                 
-                self.modified = True
+                # Le sous-titre a pu changer de position entre-temps : recherche par identifiant
+                self.update_cue(cue_id, text, start, end)
                 edit_window.destroy()
                 
             except ValueError as e:
@@ -221,29 +2322,18 @@ class SubtitleEditor:
 
     def delete_subtitle(self):
         """Suppression d'un sous-titre"""
-        selected_item = self.tree.selection()
-        if not selected_item:
+        cue_id = self.selected_cue_id()
+        if cue_id is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner un sous-titre à supprimer.")
             return
 
         if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer ce sous-titre ?"):
-            item = selected_item[0]
-            index = int(self.tree.item(item)['values'][0]) - 1
-            del self.subtitles[index]
-            self.tree.delete(item)
-            self.modified = True
-            
-            # Mise à jour des index
-            for i, sub in enumerate(self.subtitles, 1):
-                sub.index = i
-
-            # Rafraîchir l'affichage
-            self.tree.delete(*self.tree.get_children())
-            self.populate_tree()
+            self.remove_cue(cue_id)
 
     def save_subtitles(self):
         """Sauvegarde des sous-titres"""
         try:
+            self.renumber()
             self.subtitles.save("corrected_subtitles.srt")
             self.modified = False
             messagebox.showinfo("Succès", "Sous-titres sauvegardés avec succès!")
@@ -252,6 +2342,10 @@ class SubtitleEditor:
 
     def finish(self):
         """Fermeture de l'éditeur"""
+        if self.loading:
+            messagebox.showinfo("Transcription en cours",
+                                "Veuillez attendre la fin de la transcription avant de terminer.")
+            return
         if self.modified:
             response = messagebox.askyesno(
                 "Sauvegarder les modifications",
@@ -259,6 +2353,10 @@ class SubtitleEditor:
             )
             if response:
                 self.save_subtitles()
+        self.renumber()
+        self.preview_executor.shutdown(wait=False)
+        if self.preview_dir:
+            shutil.rmtree(self.preview_dir, ignore_errors=True)
         self.root.destroy()
         # Appel du callback pour continuer le traitement
         self.callback_after_save()
@@ -270,61 +2368,194 @@ class SubtitleEditor:
         return result
 
 class VideoProcessor:
-    def __init__(self, video_path: str):
+    def __init__(self, video_path: str, instrumentation: Optional[Instrumentation] = None):
         """
         Gestionnaire de traitement vidéo
+
+        Les étapes et la progression des processus ffmpeg sont enregistrées
+        dans instrumentation (partagée avec le générateur de sous-titres).
         """
         self.video_path = video_path
+        self.instrumentation = instrumentation or Instrumentation()
+        # Dossier de polices supplémentaires pour libass (voir SubtitleGenerator.use_font)
+        self.fonts_dir: Optional[str] = None
+
+    def probe(self, keyframes: bool = False) -> MediaInfo:
+        """Analyse mémorisée de la vidéo (voir MediaProbe)"""
+        return media_probe.probe(self.video_path, keyframes=keyframes)
 
     def get_metadata(self) -> VideoMetadata:
         """Récupération des métadonnées de la vidéo"""
+        return self.probe().metadata()
+
+    def get_duration(self) -> float:
+        """Récupération de la durée de la vidéo en secondes"""
+        return self.probe().duration
+
+    def duration_or_none(self) -> Optional[float]:
+        """Durée pour le calcul de la progression, sans échec si l'analyse est impossible"""
         try:
-            cmd = [
-                "ffprobe",
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=width,height,r_frame_rate",
-                "-of", "csv=p=0",
-                self.video_path
-            ]
-            output = subprocess.check_output(cmd, universal_newlines=True)
-            width, height, fps_str = output.strip().split(',')
-            
-            # Calcul du fps à partir de la fraction (ex: 30000/1001)
-            num, den = map(int, fps_str.split('/'))
-            fps = num / den
-            
-            return VideoMetadata(int(width), int(height), fps)
-        except Exception as e:
-            logger.error(f"Erreur lors de la récupération des métadonnées: {e}")
-            return VideoMetadata(1920, 1080, 30.0)
-    
+            return self.get_duration() or None
+        except RuntimeError:
+            return None
 
+    def run_ffmpeg(self, command: List[str], label: str, duration: Optional[float] = None):
+        """Exécution de ffmpeg avec suivi de la progression (-progress pipe:1)
 
+        Chaque relevé (fps, vitesse, pourcentage et ETA si la durée est
+        connue) est transmis à l'instrumentation et journalisé toutes les
+        5 secondes. Lève subprocess.CalledProcessError en cas d'échec, avec
+        la sortie d'erreur de ffmpeg.
+        """
+        command = [command[0], "-progress", "pipe:1", "-nostats"] + command[1:]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   encoding='utf-8', errors='replace')
+        stderr = drain_stderr(process)
+
+        start = time.perf_counter()
+        last_log = 0.0
+        for snapshot in parse_ffmpeg_progress(process.stdout):
+            elapsed = time.perf_counter() - start
+            if duration:
+                snapshot["percent"] = min(100.0, 100.0 * snapshot["out_time"] / duration)
+                rate = snapshot["speed"] or (snapshot["out_time"] / elapsed if elapsed else 0.0)
+                snapshot["eta"] = max(0.0, duration - snapshot["out_time"]) / rate if rate else None
+            self.instrumentation.progress(label, snapshot)
+            if elapsed - last_log >= 5.0 or snapshot["done"]:
+                logger.info(format_progress(label, snapshot))
+                last_log = elapsed
+
+        returncode = process.wait()
+        errors = stderr()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command, stderr=errors.encode('utf-8'))
+
+    @instrumented("extract_audio")
     def extract_audio(self, output_path: str) -> bool:
         """Extraction de l'audio de la vidéo"""
         try:
             command = [
-                "ffmpeg",
+                "ffmpeg", "-y",
                 "-i", self.video_path,
                 "-ar", "44100",
                 "-ac", "2",
                 "-vn",
                 output_path
             ]
-            subprocess.run(command, check=True, capture_output=True)
+            self.run_ffmpeg(command, "extract_audio", self.duration_or_none())
             return True
         except subprocess.CalledProcessError as e:
             logger.error(f"Erreur lors de l'extraction audio: {e}")
             return False
 
-    def overlay_subtitles(self, ass_file: str, output_path: str) -> bool:
-        """Superposition des sous-titres sur la vidéo"""
+    @instrumented("decode_audio")
+    def decode_audio_file(self, output_path: str, sample_rate: int = SAMPLE_RATE) -> RawAudioFile:
+        """Décodage unique de l'audio en PCM mono float32 brut sur disque, sans le charger en mémoire"""
+        command = [
+            "ffmpeg", "-y",
+            "-nostdin",
+            "-v", "error",
+            "-i", self.video_path,
+            "-vn",
+            "-ac", "1",
+            "-ar", str(sample_rate),
+            "-f", "f32le",
+            output_path
+        ]
+        try:
+            self.run_ffmpeg(command, "decode_audio", self.duration_or_none())
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erreur lors du décodage audio: {e.stderr.decode('utf-8', 'replace')[-500:]}")
+            raise RuntimeError("Échec du décodage audio")
+        return RawAudioFile(output_path, sample_rate)
+
+    @instrumented("load_audio")
+    def load_audio(self, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """Décodage de l'audio en PCM mono float32, lu directement depuis la sortie de ffmpeg.
+
+        Un seul décodage, au format attendu par Whisper, sans fichier temporaire.
+        """
+        command = [
+            "ffmpeg",
+            "-nostdin",
+            "-v", "error",
+            "-i", self.video_path,
+            "-vn",
+            "-ac", "1",
+            "-ar", str(sample_rate),
+            "-f", "f32le",
+            "pipe:1"
+        ]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stderr = drain_stderr(process)
+        buffer = bytearray()
+        for block in iter(lambda: process.stdout.read(1024 * 1024), b""):
+            buffer += block
+        if process.wait() != 0:
+            logger.error(f"Erreur lors du décodage audio: {stderr()}")
+            raise RuntimeError("Échec du décodage audio")
+
+        # Le bytearray est modifiable : le tableau peut être passé tel quel à torch
+        return np.frombuffer(buffer, dtype=np.float32)
+
+    def iter_audio_blocks(self, block_seconds: float = 1.0, follow: bool = False,
+                          idle_timeout: float = 10.0, sample_rate: int = SAMPLE_RATE):
+        """Décodage progressif de l'audio en blocs PCM mono float32
+
+        La source peut être un fichier, "-" (entrée standard) ou toute URL
+        lisible par ffmpeg. Avec follow=True, un fichier en cours d'écriture
+        est lu au fil de l'eau ; la lecture s'arrête après idle_timeout
+        secondes sans nouvelles données.
+        """
+        if self.video_path == "-":
+            source = ["-i", "pipe:0"]
+        elif follow:
+            source = ["-follow", "1", "-rw_timeout", str(int(idle_timeout * 1e6)),
+                      "-i", f"file:{os.path.abspath(self.video_path)}"]
+        else:
+            source = ["-i", self.video_path]
+        command = ["ffmpeg", "-v", "error"] + source + [
+            "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", "pipe:1"
+        ]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   stdin=None if self.video_path == "-" else subprocess.DEVNULL)
+        stderr = drain_stderr(process)
+        block_bytes = int(block_seconds * sample_rate) * 4
+        try:
+            for block in iter(lambda: process.stdout.read(block_bytes), b""):
+                # Un bloc tronqué en fin de flux est ramené à un nombre entier d'échantillons
+                yield np.frombuffer(block[:len(block) - len(block) % 4], dtype=np.float32)
+        finally:
+            # Arrêt anticipé par le consommateur : ffmpeg est interrompu sans erreur
+            interrupted = process.poll() is None
+            if interrupted:
+                process.kill()
+            if process.wait() != 0 and not interrupted:
+                logger.error(f"Erreur lors du décodage audio: {stderr()}")
+
+    def get_keyframes(self) -> List[float]:
+        """Horodatages (s) des images clés du premier flux vidéo"""
+        return self.probe(keyframes=True).keyframes
+
+    @instrumented("overlay_subtitles")
+    def overlay_subtitles(self, ass_file: str, output_path: str, segments: int = 1,
+                          work_dir: Optional[str] = None, render_dir: Optional[str] = None) -> bool:
+        """Superposition des sous-titres sur la vidéo
+
+        Avec segments > 1, la vidéo est découpée aux images clés et chaque
+        segment est encodé par un processus ffmpeg distinct (voir
+        overlay_subtitles_parallel). Avec render_dir, les segments du rendu
+        précédent sont réutilisés (voir overlay_subtitles_incremental).
+        """
+        if render_dir:
+            return self.overlay_subtitles_incremental(ass_file, output_path, render_dir)
+        if segments > 1:
+            return self.overlay_subtitles_parallel(ass_file, output_path, segments, work_dir)
         try:
             command = [
-                "ffmpeg",
+                "ffmpeg", "-y",
                 "-i", self.video_path,
-                "-vf", f"ass={ass_file}",
+                "-vf", ass_filter(ass_file, self.fonts_dir),
                 "-c:v", "libx264",
                 "-preset", "slow",
                 "-crf", "18",
@@ -332,63 +2563,620 @@ class VideoProcessor:
                 "-b:a", "192k",
                 output_path
             ]
-            subprocess.run(command, check=True, capture_output=True)
+            self.run_ffmpeg(command, "overlay_subtitles", self.duration_or_none())
             return True
         except subprocess.CalledProcessError as e:
             logger.error(f"Erreur lors de la superposition des sous-titres: {e}")
             return False
 
+    @instrumented("preview")
+    def render_preview(self, ass_file: str, output_path: str, start: float, end: float) -> bool:
+        """Aperçu basse résolution de la fenêtre [start, end) de la vidéo
+
+        Seek sur l'entrée (aucun décodage avant start), réduction à
+        PREVIEW_SETTINGS["height"] avant l'incrustation et preset ultrafast.
+        ass_file doit déjà être recalé au début de la fenêtre (voir
+        shift_ass_file) ; PlayResX/PlayResY y conservant la résolution
+        d'origine, libass met les sous-titres à l'échelle du proxy.
+        """
+        command = [
+            "ffmpeg", "-y",
+            "-ss", f"{start:.3f}",
+            "-i", self.video_path,
+            "-t", f"{end - start:.3f}",
+            "-vf", f"scale=-2:{PREVIEW_SETTINGS['height']},{ass_filter(ass_file, self.fonts_dir)}",
+            "-c:v", "libx264",
+            "-preset", PREVIEW_SETTINGS["preset"],
+            "-crf", str(PREVIEW_SETTINGS["crf"]),
+            "-c:a", "aac",
+            "-b:a", "96k",
+            output_path
+        ]
+        try:
+            self.run_ffmpeg(command, "preview", end - start)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erreur lors du rendu de l'aperçu: {e.stderr.decode('utf-8', 'replace')[-500:]}")
+            return False
+
+    @instrumented("overlay_renditions")
+    def overlay_renditions(self, groups: List[Tuple[str, List[Tuple[Rendition, str]]]]) -> bool:
+        """Incrustation en plusieurs déclinaisons dans un seul processus ffmpeg
+
+        groups associe à chaque format d'image son fichier ASS et ses
+        déclinaisons (avec leur chemin de sortie). La vidéo n'est décodée
+        qu'une fois ; chaque groupe est recadré au centre si besoin, réduit
+        à sa plus grande déclinaison et reçoit ses sous-titres une seule
+        fois, puis est dupliqué (split) et mis à l'échelle pour chaque sortie.
+        """
+        graph = [f"[0:v]split={len(groups)}" + "".join(f"[g{g}]" for g in range(len(groups)))]
+        outputs = []
+        for g, (ass_file, targets) in enumerate(groups):
+            largest = max((rendition for rendition, _ in targets), key=lambda r: r.width * r.height)
+            aspect = largest.width / largest.height
+            chain = (f"[g{g}]crop=w='min(iw,ih*{aspect:.6f})':h='min(ih,iw/{aspect:.6f})',"
+                     f"scale={largest.width}:{largest.height},{ass_filter(ass_file, self.fonts_dir)},"
+                     f"split={len(targets)}" + "".join(f"[g{g}s{k}]" for k in range(len(targets))))
+            graph.append(chain)
+            for k, (rendition, output_path) in enumerate(targets):
+                graph.append(f"[g{g}s{k}]scale={rendition.width}:{rendition.height}[out{len(outputs)}]")
+                outputs.append(output_path)
+
+        command = ["ffmpeg", "-y", "-i", self.video_path, "-filter_complex", ";".join(graph)]
+        for k, output_path in enumerate(outputs):
+            command += [
+                "-map", f"[out{k}]",
+                "-map", "0:a?",
+                "-c:v", "libx264",
+                "-preset", "slow",
+                "-crf", "18",
+                "-c:a", "aac",
+                "-b:a", "192k",
+                output_path
+            ]
+        try:
+            self.run_ffmpeg(command, "overlay_renditions", self.duration_or_none())
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erreur lors de l'incrustation des déclinaisons: {e.stderr.decode('utf-8', 'replace')[-500:]}")
+            return False
+
+    @instrumented("mux_subtitles")
+    def mux_subtitles(self, ass_file: str, output_path: str, font_file: Optional[str] = None) -> bool:
+        """Ajout des sous-titres comme piste séparée, sans réencodage (copie des flux)
+
+        En MKV, la piste reste au format ASS (styles conservés) et la police
+        est jointe au fichier ; en MP4, elle est convertie en mov_text, qui
+        ne conserve ni les styles ni les polices.
+        """
+        matroska = os.path.splitext(output_path)[1].lower() in (".mkv", ".mka")
+        command = [
+            "ffmpeg", "-y",
+            "-i", self.video_path,
+            "-i", ass_file,
+            "-map", "0:v",
+            "-map", "0:a?",
+            "-map", "1:0",
+            "-c:v", "copy",
+            "-c:a", "copy",
+            "-c:s", "ass" if matroska else "mov_text",
+            "-metadata:s:s:0", "language=fre",
+            "-disposition:s:0", "default",
+        ]
+        if matroska and font_file:
+            command += ["-attach", font_file, "-metadata:s:t:0", "mimetype=application/x-truetype-font"]
+        elif font_file:
+            logger.info("Police non jointe : le format MP4 ne permet pas les pièces jointes")
+        command.append(output_path)
+        try:
+            self.run_ffmpeg(command, "mux_subtitles", self.duration_or_none())
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erreur lors de l'ajout de la piste de sous-titres: {e.stderr.decode('utf-8', 'replace')[-500:]}")
+            return False
+
+    @instrumented("encode_segment")
+    def encode_segment(self, segment_ass: str, start: float, end: float, output_path: str,
+                       threads: int = 0) -> bool:
+        """Encodage d'un segment [start, end) de la vidéo, sans audio.
+
+        segment_ass contient les sous-titres déjà recalés au début du segment
+        (voir shift_ass_file).
+        """
+        command = [
+            "ffmpeg", "-y",
+            "-ss", f"{start:.6f}",
+            "-i", self.video_path,
+            "-t", f"{end - start:.6f}",
+            "-map", "0:v:0",
+            "-an",
+            "-vf", ass_filter(segment_ass, self.fonts_dir),
+            "-c:v", SEGMENT_ENCODER_SETTINGS["codec"],
+            "-preset", SEGMENT_ENCODER_SETTINGS["preset"],
+            "-crf", str(SEGMENT_ENCODER_SETTINGS["crf"]),
+            "-threads", str(threads),
+            output_path
+        ]
+        try:
+            self.run_ffmpeg(command, f"segment {start:.0f}-{end:.0f}s", end - start)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erreur lors de l'encodage du segment {start:.2f}-{end:.2f}s: "
+                         f"{e.stderr.decode('utf-8', 'replace')[-500:]}")
+            return False
+
+    @instrumented("concat_segments")
+    def concat_segments(self, segment_files: List[str], output_path: str, work_dir: str) -> bool:
+        """Assemblage des segments vidéo (copie de flux) avec l'audio d'origine encodé une seule fois"""
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w", encoding='utf-8') as f:
+            for segment_file in segment_files:
+                escaped = os.path.abspath(segment_file).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        command = [
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0",
+            "-i", list_path,
+            "-i", self.video_path,
+            "-map", "0:v:0",
+            "-map", "1:a?",
+            "-c:v", "copy",
+            "-c:a", "aac",
+            "-b:a", "192k",
+            output_path
+        ]
+        try:
+            self.run_ffmpeg(command, "concat_segments", self.duration_or_none())
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erreur lors de l'assemblage des segments: {e.stderr.decode('utf-8', 'replace')[-500:]}")
+            return False
+
+    def overlay_subtitles_parallel(self, ass_file: str, output_path: str, segments: int,
+                                   work_dir: Optional[str] = None) -> bool:
+        """Incrustation parallèle : découpe aux images clés, un ffmpeg par segment, puis concat.
+
+        Chaque segment est extrait par seek sur une image clé (donc sans
+        décodage superflu) et reçoit un fichier ASS recalé à son début.
+        L'audio n'est encodé qu'une fois, lors de l'assemblage.
+        """
+        try:
+            duration = self.get_duration()
+            keyframes = self.get_keyframes()
+        except RuntimeError as e:
+            logger.error(f"Erreur lors de la lecture des images clés: {e}")
+            return False
+        bounds = choose_segment_bounds(keyframes, duration, segments)
+        if len(bounds) <= 2:
+            logger.info("Pas assez d'images clés pour découper la vidéo, encodage en un seul passage.")
+            return self.overlay_subtitles(ass_file, output_path)
+
+        cleanup = work_dir is None
+        work_dir = work_dir or tempfile.mkdtemp(prefix="segments_", dir=os.path.dirname(os.path.abspath(output_path)))
+        os.makedirs(work_dir, exist_ok=True)
+        segment_files = [os.path.join(work_dir, f"segment_{i:04d}.mp4") for i in range(len(bounds) - 1)]
+        threads = max(1, (os.cpu_count() or 1) // (len(bounds) - 1))
+        logger.info(f"Incrustation en {len(segment_files)} segments parallèles")
+
+        def encode(i: int) -> bool:
+            segment_ass = f"{os.path.splitext(segment_files[i])[0]}.ass"
+            shift_ass_file(ass_file, segment_ass, bounds[i], bounds[i + 1])
+            return self.encode_segment(segment_ass, bounds[i], bounds[i + 1], segment_files[i], threads)
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(segment_files)) as pool:
+                encoded = list(pool.map(encode, range(len(segment_files))))
+            return all(encoded) and self.concat_segments(segment_files, output_path, work_dir)
+        finally:
+            if cleanup:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def source_signature(self) -> dict:
+        """Identité du fichier source (chemin, taille, date de modification)"""
+        stat = os.stat(self.video_path)
+        return {"path": os.path.abspath(self.video_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def fonts_signature(self) -> Optional[dict]:
+        """Identité des polices passées à libass (dossier, puis taille et date de chaque fichier)"""
+        if not self.fonts_dir:
+            return None
+        files = {}
+        try:
+            for name in sorted(os.listdir(self.fonts_dir)):
+                if name.lower().endswith((".ttf", ".otf", ".ttc")):
+                    stat = os.stat(os.path.join(self.fonts_dir, name))
+                    files[name] = [stat.st_size, stat.st_mtime]
+        except OSError:
+            pass
+        return {"dir": os.path.abspath(self.fonts_dir), "files": files}
+
+    def overlay_subtitles_incremental(self, ass_file: str, output_path: str, render_dir: str,
+                                      segment_seconds: float = 30.0) -> bool:
+        """Incrustation incrémentale : seuls les segments dont les sous-titres ont changé sont réencodés.
+
+        render_dir conserve les segments encodés du rendu précédent et un
+        manifeste associant à chaque segment l'empreinte de son fichier ASS
+        recalé (en-tête de styles compris). Les segments inchangés sont
+        réutilisés tels quels lors de l'assemblage par copie de flux. Un
+        changement de source, d'encodeur ou de police invalide tout le rendu.
+        """
+        os.makedirs(render_dir, exist_ok=True)
+        manifest_path = os.path.join(render_dir, "manifest.json")
+        source = self.source_signature()
+        encoder = SEGMENT_ENCODER_SETTINGS
+        fonts = self.fonts_signature()
+
+        previous = {}
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if (previous.get("source") != source or previous.get("encoder") != encoder
+                or previous.get("fonts") != fonts):
+            previous = {}
+
+        if previous:
+            bounds = previous["bounds"]
+        else:
+            try:
+                keyframes = self.get_keyframes()
+            except RuntimeError as e:
+                logger.error(f"Erreur lors de la lecture des images clés: {e}")
+                return False
+            duration = self.get_duration()
+            bounds = choose_segment_bounds(keyframes, duration, max(1, round(duration / segment_seconds)))
+
+        previous_hashes = previous.get("hashes", [])
+        segment_files, hashes, changed = [], [], []
+        for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            segment_file = os.path.join(render_dir, f"segment_{i:04d}.mp4")
+            segment_ass = os.path.join(render_dir, f"segment_{i:04d}.ass")
+            shift_ass_file(ass_file, segment_ass, start, end)
+            with open(segment_ass, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            segment_files.append(segment_file)
+            hashes.append(digest)
+            if i >= len(previous_hashes) or previous_hashes[i] != digest or not os.path.exists(segment_file):
+                changed.append(i)
+
+        logger.info(f"Rendu incrémental: {len(changed)}/{len(segment_files)} segments à réencoder")
+        if changed:
+            threads = max(1, (os.cpu_count() or 1) // len(changed))
+            with ThreadPoolExecutor(max_workers=min(len(changed), os.cpu_count() or 1)) as pool:
+                encoded = dict(zip(changed, pool.map(
+                    lambda i: self.encode_segment(
+                        os.path.join(render_dir, f"segment_{i:04d}.ass"),
+                        bounds[i], bounds[i + 1], segment_files[i], threads),
+                    changed
+                )))
+            # Un segment en échec ne doit pas être considéré comme à jour au prochain rendu
+            for i, success in encoded.items():
+                if not success:
+                    hashes[i] = None
+        else:
+            encoded = {}
+
+        with open(manifest_path, "w", encoding='utf-8') as f:
+            json.dump({"source": source, "encoder": encoder, "fonts": fonts,
+                       "bounds": bounds, "hashes": hashes}, f)
+
+        return all(encoded.values()) and self.concat_segments(segment_files, output_path, render_dir)
+
 class SubtitleGenerator:
-    def __init__(self, video_path: str):
+    def __init__(self, video_path: str, model=None, config: Optional[InferenceConfig] = None,
+                 cache: Optional[TranscriptionCache] = None,
+                 chunk_workers: int = 1, chunk_seconds: float = 300.0,
+                 instrumentation: Optional[Instrumentation] = None,
+                 vad: Optional[VadConfig] = None,
+                 chunk_pool: Optional[ProcessPoolExecutor] = None,
+                 model_loader: Optional[Callable[[], object]] = None):
         """
         Générateur de sous-titres avec interface d'édition
+
+        Un modèle déjà chargé peut être fourni pour éviter de le recharger
+        à chaque vidéo (mode batch). Si un cache est fourni, les segments
+        déjà transcrits pour le même audio sont réutilisés. Avec
+        chunk_workers > 1, les longs audios sont découpés aux silences et
+        transcrits en parallèle (un modèle par processus) ; chunk_pool permet
+        de réutiliser un pool déjà chargé (serveur). Avec vad, seules
+        les zones de parole sont transmises au modèle. Les mesures de
+        chaque étape sont regroupées dans self.instrumentation. Sans modèle
+        fourni, il n'est chargé qu'à la première transcription : la
+        conversion et l'incrustation de sous-titres existants s'en passent ;
+        model_loader remplace alors le chargement par défaut (modèle partagé
+        d'un processus du pool batch).
         """
         self.video_path = video_path
-        self.video_processor = VideoProcessor(video_path)
-        
-        # Initialisation du modèle Whisper
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Utilisation du périphérique: {self.device}")
-        self.model = whisper.load_model("large-v2", device=self.device)
-
-    def transcribe_audio(self, audio_path: str) -> List[dict]:
-        """Transcription de l'audio"""
-        logger.info("Transcription de l'audio...")
-        try:
-            result = self.model.transcribe(
-                audio_path,
-                word_timestamps=True,
-                fp16=True,
-                language='fr'
-            )
-            return result["segments"]
-        except Exception as e:
-            logger.error(f"Erreur lors de la transcription: {e}")
+        self.instrumentation = instrumentation or Instrumentation()
+        self.video_processor = VideoProcessor(video_path, self.instrumentation)
+        self.config = config or InferenceConfig()
+        self.model_name = self.config.model_name
+        self.cache = cache
+        self.chunk_workers = chunk_workers
+        self.chunk_seconds = chunk_seconds
+        self.chunk_pool = chunk_pool
+        self.vad = vad
+        self.timeline: Optional[WordTimeline] = None
+        self.font_name = "Arial"
+        self._model = model
+        self.model_loader = model_loader
+
+    @property
+    def model(self):
+        """Modèle Whisper, chargé au premier accès"""
+        if self._model is None:
+            logger.info(f"Utilisation du périphérique: {self.config.resolve_device()}")
+            self._model = self.model_loader() if self.model_loader else load_whisper_model(self.config)
+        return self._model
+
+    def transcription_settings(self) -> dict:
+        """Paramètres de transcription entrant dans la clé de cache"""
+        settings = {
+            "model": self.model_name,
+            "language": "fr",
+            "fp16": self.config.use_fp16(),
+            "quantize": self.config.quantize,
+            "word_timestamps": True
+        }
+        if self.chunk_workers > 1:
+            settings["chunk_seconds"] = self.chunk_seconds
+        if self.vad is not None:
+            settings["vad"] = asdict(self.vad)
+        # Le décodage par lots et en faisceau modifie le résultat : ils entrent dans la clé de cache
+        if self.config.batch_size > 1:
+            settings["batch_size"] = self.config.batch_size
+        if self.config.beam_size:
+            settings["beam_size"] = self.config.beam_size
+        return settings
+
+    def transcribe_audio(self, audio: Union[str, np.ndarray]) -> List[dict]:
+        """Transcription de l'audio (chemin de fichier ou PCM mono 16 kHz)
+
+        Le facteur temps réel (durée de transcription / durée de l'audio)
+        est journalisé et enregistré dans l'instrumentation.
+        """
+        audio_seconds = len(audio) / SAMPLE_RATE if isinstance(audio, np.ndarray) else None
+        with self.instrumentation.stage("transcribe", audio_seconds=audio_seconds) as stats:
+            settings = self.transcription_settings()
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(self.cache.fingerprint_audio(audio), settings)
+                segments = self.cache.get(cache_key)
+                stats["cache_hit"] = segments is not None
+                if segments is not None:
+                    logger.info("Transcription trouvée dans le cache.")
+                    return segments
+
+            logger.info("Transcription de l'audio...")
+            start = time.perf_counter()
+            try:
+                if isinstance(audio, np.ndarray):
+                    segments = self.transcribe_speech(audio, settings, stats)
+                else:
+                    segments = transcribe_with_model(self.model, audio, settings)
+            except Exception as e:
+                logger.error(f"Erreur lors de la transcription: {e}")
+                raise
+            elapsed = time.perf_counter() - start
+
+            if audio_seconds:
+                stats["real_time_factor"] = round(elapsed / audio_seconds, 4)
+                self.instrumentation.counter("real_time_factor", {"whisper": stats["real_time_factor"]})
+                logger.info(f"Transcription de {audio_seconds:.0f}s d'audio en {elapsed:.1f}s "
+                            f"(facteur temps réel {stats['real_time_factor']:.3f})")
+                self.log_speech_stats(stats, audio_seconds)
+
+            if cache_key is not None:
+                self.cache.put(cache_key, segments, settings)
+            return segments
+
+    def transcribe_speech(self, audio: np.ndarray, settings: dict, stats: dict) -> List[dict]:
+        """Transcription d'un tableau PCM, réduit à ses zones de parole si la détection est activée.
+
+        Les horodatages renvoyés sont ceux de l'audio d'origine ; les durées
+        de parole et de silence ignoré s'accumulent dans stats.
+        """
+        if self.vad is None:
+            return self.transcribe_array(audio, settings)
+        with self.instrumentation.stage("vad", audio_seconds=len(audio) / SAMPLE_RATE):
+            speech = SpeechMap(detect_speech(audio, self.vad), len(audio))
+        stats["speech_seconds"] = round(stats.get("speech_seconds", 0.0) + speech.speech_seconds, 3)
+        stats["skipped_seconds"] = round(stats.get("skipped_seconds", 0.0) + speech.skipped_seconds, 3)
+        if not speech.speech_samples:
+            return []
+        return speech.remap_segments(self.transcribe_array(speech.compact(audio), settings))
+
+    def transcribe_array(self, audio: np.ndarray, settings: dict) -> List[dict]:
+        if self.chunk_workers > 1:
+            return self.transcribe_chunked(audio, settings)
+        return transcribe_with_model(self.model, audio, settings)
+
+    def log_speech_stats(self, stats: dict, audio_seconds: float):
+        """Journalisation de l'audio ignoré par la détection de parole et du gain attendu"""
+        if "speech_seconds" not in stats:
+            return
+        speech, skipped = stats["speech_seconds"], stats["skipped_seconds"]
+        # Le coût de l'inférence est proportionnel à la durée d'audio transmise au modèle
+        stats["vad_speedup"] = round(audio_seconds / speech, 2) if speech else None
+        self.instrumentation.counter("vad", {"speech_seconds": speech, "skipped_seconds": skipped})
+        logger.info(f"Détection de parole : {skipped:.0f}s ignorées sur {audio_seconds:.0f}s "
+                    f"({100 * skipped / audio_seconds:.0f}%), accélération attendue de l'inférence "
+                    + (f"×{stats['vad_speedup']:.2f}" if speech else "totale (aucune parole)"))
+
+    def transcribe_chunked(self, audio: np.ndarray, settings: dict) -> List[dict]:
+        """Transcription parallèle par chunks découpés aux silences"""
+        splits = find_silence_splits(audio, self.chunk_seconds)
+        if not splits:
+            return transcribe_with_model(self.model, audio, settings)
+
+        bounds = [0] + splits + [len(audio)]
+        workers = min(self.chunk_workers, len(bounds) - 1)
+        logger.info(f"Transcription de {len(bounds) - 1} chunks sur {workers} processus")
+        if self.chunk_pool is not None:
+            return stitch_chunk_segments(self.submit_chunks(self.chunk_pool, audio, bounds, settings))
+        with create_chunk_pool(self.config, workers) as pool:
+            return stitch_chunk_segments(self.submit_chunks(pool, audio, bounds, settings))
+
+    @staticmethod
+    def submit_chunks(pool: ProcessPoolExecutor, audio: np.ndarray, bounds: List[int],
+                      settings: dict) -> List[List[dict]]:
+        futures = [
+            pool.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, settings)
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        return [future.result() for future in futures]
+
+    def transcribe_to_files(self, audio: RawAudioFile, srt_path: str, ass_path: Optional[str] = None,
+                            metadata: Optional[VideoMetadata] = None, mode: str = "word",
+                            window_seconds: float = 120.0, words_path: Optional[str] = None) -> int:
+        """Transcription à mémoire bornée d'un long enregistrement, fenêtre par fenêtre.
+
+        Seule la fenêtre courante est en mémoire ; ses segments sont assemblés
+        aux précédents puis écrits aussitôt dans le SRT (et l'ASS), avec les
+        mêmes règles que to_srt et convert_to_ass. Un seul sous-titre est
+        gardé en attente, le temps de connaître le début du suivant. Le cache
+        de transcription n'est pas utilisé. Avec words_path, le transcript mot
+        à mot est lui aussi écrit fenêtre par fenêtre (TranscriptWriter) ;
+        sinon la chronologie compacte des mots, qui croît avec la durée, est
+        gardée dans self.timeline. Retourne le nombre de sous-titres.
+        """
+        settings = self.transcription_settings()
+        stitcher = SegmentStitcher()
+        timelines = []
+        words = TranscriptWriter(words_path, source=self.video_path) if words_path else None
+        pending = None
+        count = 0
+        previous_end = 0.0
+        logger.info(f"Transcription par fenêtres de {window_seconds:.0f}s ({audio.duration:.0f}s d'audio)...")
+        try:
+            with self.instrumentation.stage("transcribe", audio_seconds=audio.duration) as stats, \
+                    IncrementalSubtitleWriter(srt_path, ass_path, self, metadata, mode) as writer:
+                start = time.perf_counter()
+                for offset, window in audio.windows(window_seconds):
+                    with self.instrumentation.stage("transcribe_window", offset=offset / audio.sample_rate):
+                        segments = self.transcribe_speech(window, settings, stats)
+                    del window
+                    segments = stitcher.add(shift_segments(segments, offset / audio.sample_rate))
+                    if words is not None:
+                        words.append(WordTimeline.from_segments(segments))
+                    else:
+                        timelines.append(WordTimeline.from_segments(segments))
+                    for segment in segments:
+                        count += 1
+                        start_time = cue_start(segment, previous_end)
+                        sub = segment_cue(segment, previous_end, count)
+                        previous_end = segment["end"]
+                        if pending is not None:
+                            writer.write(*pending, display_end=start_time)
+                        pending = (sub, segment.get("words", []))
+                    self.instrumentation.counter("memory", {"peak_rss_mb": _peak_rss_mb() or 0.0})
+                if pending is not None:
+                    writer.write(*pending)
+
+                elapsed = time.perf_counter() - start
+                if audio.duration:
+                    stats["real_time_factor"] = round(elapsed / audio.duration, 4)
+                    logger.info(f"Transcription de {audio.duration:.0f}s d'audio en {elapsed:.1f}s "
+                                f"(facteur temps réel {stats['real_time_factor']:.3f}), {writer.count} sous-titres")
+                    self.log_speech_stats(stats, audio.duration)
+        except BaseException:
+            if words is not None:
+                words.abort()
             raise
+        if words is not None:
+            words.close()
+        else:
+            self.timeline = WordTimeline.concatenate(timelines)
+        return writer.count
+
+    def iter_transcription(self, audio: np.ndarray, window_seconds: float = 60.0):
+        """Transcription progressive d'un tableau PCM, pour l'éditeur.
+
+        L'audio est découpé aux silences toutes les window_seconds environ ;
+        chaque fenêtre produit (segments assemblés, secondes traitées) dès
+        qu'elle est transcrite. La transcription complète est mise en cache
+        comme avec transcribe_audio : en cas de succès du cache, tous les
+        segments sont produits d'un coup.
+        """
+        audio_seconds = len(audio) / SAMPLE_RATE
+        with self.instrumentation.stage("transcribe", audio_seconds=audio_seconds) as stats:
+            settings = self.transcription_settings()
+            # Le découpage en fenêtres modifie le résultat : il entre dans la clé de cache
+            settings["window_seconds"] = window_seconds
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(self.cache.fingerprint_audio(audio), settings)
+                segments = self.cache.get(cache_key)
+                stats["cache_hit"] = segments is not None
+                if segments is not None:
+                    logger.info("Transcription trouvée dans le cache.")
+                    yield segments, audio_seconds
+                    return
+
+            bounds = [0] + find_silence_splits(audio, window_seconds) + [len(audio)]
+            logger.info(f"Transcription progressive en {len(bounds) - 1} fenêtre(s) ({audio_seconds:.0f}s d'audio)...")
+            stitcher = SegmentStitcher()
+            segments = []
+            start = time.perf_counter()
+            for low, high in zip(bounds[:-1], bounds[1:]):
+                with self.instrumentation.stage("transcribe_window", offset=low / SAMPLE_RATE):
+                    window = self.transcribe_speech(audio[low:high], settings, stats)
+                window = stitcher.add(shift_segments(window, low / SAMPLE_RATE))
+                segments.extend(window)
+                yield window, high / SAMPLE_RATE
+            elapsed = time.perf_counter() - start
+
+            if audio_seconds:
+                stats["real_time_factor"] = round(elapsed / audio_seconds, 4)
+                self.instrumentation.counter("real_time_factor", {"whisper": stats["real_time_factor"]})
+                logger.info(f"Transcription de {audio_seconds:.0f}s d'audio en {elapsed:.1f}s "
+                            f"(facteur temps réel {stats['real_time_factor']:.3f})")
+                self.log_speech_stats(stats, audio_seconds)
+
+            if cache_key is not None:
+                self.cache.put(cache_key, segments, settings)
 
+    @instrumented("generate_srt")
     def generate_srt(self, segments: List[dict]) -> pysrt.SubRipFile:
-        """Génération du fichier SRT initial"""
+        """Génération du fichier SRT initial
+
+        La chronologie des mots est conservée dans self.timeline pour que la
+        conversion ASS utilise les horodatages réels de chaque mot.
+        """
         logger.info("Génération du fichier SRT...")
-        subtitles = pysrt.SubRipFile()
+        self.timeline = WordTimeline.from_segments(segments)
+        return self.timeline.to_srt()
 
-        for i, segment in enumerate(segments):
-            start_time = pysrt.SubRipTime(seconds=segment["start"] - 0.5)
-            end_time = pysrt.SubRipTime(seconds=segment["end"])
-            text = " ".join([word["word"] for word in segment["words"]])
+    def subtitle_layout(self, metadata: VideoMetadata) -> Tuple[int, int, int]:
+        """Position (centre, bas) et taille de police des sous-titres pour un format d'image
 
-            subtitles.append(
-                pysrt.SubRipItem(
-                    index=i + 1,
-                    start=start_time,
-                    end=end_time,
-                    text=text
-                )
-            )
+        La taille de 170 est prévue pour le 16:9 ; les formats plus étroits
+        (4:3, vertical) la réduisent en proportion pour garder la même
+        largeur de ligne relative, et en vertical les sous-titres sont
+        remontés au-dessus de l'interface des plateformes.
+        """
+        aspect = metadata.width / metadata.height
+        font_size = int(round(170 * min(1.0, aspect / (16 / 9))))
+        bottom_ratio = 0.9 if aspect >= 1 else 0.75
+        return metadata.width // 2, int(metadata.height * bottom_ratio), font_size
 
-        return subtitles
+    def use_font(self, font_file: str):
+        """Utilisation d'un fichier de police pour les styles ASS et l'incrustation"""
+        font_file = os.path.abspath(font_file)
+        self.font_name = font_family_name(font_file)
+        self.video_processor.fonts_dir = os.path.dirname(font_file)
+        logger.info(f"Police des sous-titres: {self.font_name} ({font_file})")
 
     def generate_ass_style(self, metadata: VideoMetadata) -> str:
-        """Génération du style ASS sans fond noir"""
+        """Génération du style ASS sans fond noir
+
+        Le style Karaoke (texte blanc, contour noir) sert au mode karaoké de
+        convert_to_ass, avec la même position et le même aspect que les
+        surcharges du mode mot par mot.
+        """
+        _, bottom_y, font_size = self.subtitle_layout(metadata)
+        margin_v = metadata.height - bottom_y
         return f"""[Script Info]
 Title: Sous-titres stylisés
 ScriptType: v4.00+
@@ -399,7 +3187,8 @@ PlayDepth: 0
 
 [V4+ Styles]
 Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: SubtitleFadeZoom,Arial,170,&HFFFFFF,&HFFFFFF,&H000000,&H00000000,-1,0,0,0,100,100,0,0,1,2,0,2,0,0,0,1
+Style: SubtitleFadeZoom,{self.font_name},{font_size},&HFFFFFF,&HFFFFFF,&H000000,&H00000000,-1,0,0,0,100,100,0,0,1,2,0,2,0,0,0,1
+Style: Karaoke,{self.font_name},{font_size},&HFFFFFF,&HFFFFFF,&H000000,&H00000000,-1,0,0,0,100,100,0,0,1,2,0,2,0,0,{margin_v},1
 
 [Events]
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
@@ -415,102 +3204,229 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
     
     def get_metadata(self) -> VideoMetadata:
         """Récupération des métadonnées de la vidéo"""
-        try:
-            cmd = [
-                "ffprobe",
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=width,height,r_frame_rate",
-                "-of", "csv=p=0",
-                self.video_path
-            ]
-            output = subprocess.check_output(cmd, universal_newlines=True)
-            width, height, fps_str = output.strip().split(',')
-            
-            # Calcul du fps à partir de la fraction (ex: 30000/1001)
-            num, den = map(int, fps_str.split('/'))
-            fps = num / den
-            
-            return VideoMetadata(int(width), int(height), fps)
-        except Exception as e:
-            logger.error(f"Erreur lors de la récupération des métadonnées: {e}")
-            return VideoMetadata(1920, 1080, 30.0)
+        return self.video_processor.get_metadata()
 
-    def convert_to_ass(self, subtitles: pysrt.SubRipFile, metadata: VideoMetadata) -> str:
+    @instrumented("convert_to_ass")
+    def convert_to_ass(self, subtitles: pysrt.SubRipFile, metadata: Optional[VideoMetadata] = None,
+                       ass_file: str = "highlighted_subtitles.ass",
+                       timeline: Optional[WordTimeline] = None,
+                       mode: str = "word") -> str:
         """Conversion des sous-titres SRT en ASS avec fond rouge sur le mot prononcé,
-        limité à 4 mots maximum par phrase, sans fond noir."""
-        logger.info("Conversion en format ASS (effet sur le mot parlé)...")
-        ass_file = "highlighted_subtitles.ass"
+        limité à 4 mots maximum par phrase, sans fond noir.
+
+        Lorsque le texte d'un sous-titre correspond encore à la transcription,
+        le surlignage suit l'horodatage réel des mots ; sinon la durée est
+        répartie uniformément entre les mots.
 
-        metadata = self.get_metadata()
+        mode="word" écrit un événement par mot avec les surcharges complètes ;
+        mode="karaoke" écrit un seul événement par groupe de mots, le
+        surlignage étant animé par des balises \\t : même rendu, fichier
+        beaucoup plus léger."""
+        logger.info(f"Conversion en format ASS (mode {mode})...")
+        timeline = timeline or self.timeline
+
+        metadata = metadata or self.get_metadata()
         logger.info(f"Dimensions vidéo : {metadata.width}x{metadata.height}, FPS : {metadata.fps}")
 
         # Générer les styles de base
         with open(ass_file, "w", encoding='utf-8') as f:
             f.write(self.generate_ass_style(metadata))
 
-        # Position des sous-titres
-        center_x = metadata.width // 2
-        bottom_y = int(metadata.height * 0.9)
-
         with open(ass_file, "a", encoding='utf-8') as f:
-            for sub in subtitles:
-                # Diviser la phrase en groupes de 4 mots maximum
-                words = sub.text.split()
-                groups = [words[i:i+4] for i in range(0, len(words), 4)]
+            # Événements écrits un à un : aucune liste complète n'est gardée en mémoire
+            for sub, display_end in self.iter_cues(subtitles):
+                f.writelines(self.cue_events(sub, metadata, timeline, display_end, mode))
+
+        logger.info("Conversion en ASS terminée.")
+        return ass_file
+
+    def cue_events(self, sub: pysrt.SubRipItem, metadata: VideoMetadata,
+                   timeline: Optional[WordTimeline] = None, display_end: Optional[float] = None,
+                   mode: str = "word") -> Iterator[str]:
+        """Lignes Dialogue d'un sous-titre, dans le mode demandé, produites au fil de l'eau
+
+        Utilisé par convert_to_ass et par les écritures incrémentales (un
+        sous-titre finalisé peut être ajouté au fichier ASS à tout moment).
+        """
+        words = sub.text.split()
+        if not words:
+            return
+        word_times = self.word_display_times(sub, words, timeline, display_end)
+        if mode == "karaoke":
+            yield from self.karaoke_events(words, word_times)
+        else:
+            yield from self.word_events(words, word_times, metadata)
+
+    def word_events(self, words: List[str], word_times: List[Tuple[float, float]],
+                    metadata: VideoMetadata) -> List[str]:
+        """Mode mot par mot : un événement par mot, par groupes de 4 mots maximum"""
+        # Position et taille des sous-titres selon le format d'image
+        center_x, bottom_y, font_size = self.subtitle_layout(metadata)
+
+        # Diviser la phrase en groupes de 4 mots maximum
+        groups = [words[i:i+4] for i in range(0, len(words), 4)]
+        events = []
+
+        # Traiter chaque groupe de mots
+        current_word_index = 0
+        for group in groups:
+            for i, word in enumerate(group):
+                word_start, word_end = word_times[current_word_index]
+                start_time = self.format_ass_time(word_start)
+                end_time = self.format_ass_time(word_end)
+
+                # Style pour les mots normaux (vraiment sans fond)
+                base_style = (
+                    f"\\an2"  # Alignement centré en bas
+                    f"\\pos({center_x},{bottom_y})"
+                    f"\\1c&HFFFFFF&"  # Texte blanc
+                    f"\\3c&H000000&"  # Contour noir
+                    f"\\4a&HFF&"      # Ombre totalement transparente
+                    f"\\bord2"        # Contour fin
+                    f"\\shad0"        # Pas d'ombre
+                    f"\\fs{font_size}"  # Taille de police
+                )
+
+                # Style pour le mot en surbrillance (fond rouge)
+                highlight_style = (
+                    f"\\an2"
+                    f"\\pos({center_x},{bottom_y})"
+                    f"\\1c&HFFFFFF&"  # Texte blanc
+                    f"\\3c&H0000FF&"  # Contour rouge
+                    f"\\4c&H0000FF&"  # Fond rouge
+                    f"\\4a&H00&"      # Fond opaque
+                    f"\\bord15"       # Large bordure pour créer le fond
+                    f"\\shad0"        # Pas d'ombre
+                    f"\\fs{font_size}"
+                )
+
+                # Construction du texte pour ce groupe
+                text_parts = []
+                for j, w in enumerate(group):
+                    if j == i:
+                        # Mot actuel avec fond rouge
+                        text_parts.append(f"{{{highlight_style}}}{w}")
+                    else:
+                        # Autres mots (vraiment sans fond)
+                        text_parts.append(f"{{{base_style}}}{w}")
                 
-                total_duration = (sub.end.ordinal - sub.start.ordinal) / 1000.0
-                words_per_group = len(words)
-                word_duration = total_duration / words_per_group
-
-                # Traiter chaque groupe de mots
-                current_word_index = 0
-                for group in groups:
-                    for i, word in enumerate(group):
-                        start_time = self.format_ass_time(sub.start.ordinal / 1000.0 + current_word_index * word_duration)
-                        end_time = self.format_ass_time(sub.start.ordinal / 1000.0 + (current_word_index + 1) * word_duration)
-
-                        # Style pour les mots normaux (vraiment sans fond)
-                        base_style = (
-                            f"\\an2"  # Alignement centré en bas
-                            f"\\pos({center_x},{bottom_y})"
-                            f"\\1c&HFFFFFF&"  # Texte blanc
-                            f"\\3c&H000000&"  # Contour noir
-                            f"\\4a&HFF&"      # Ombre totalement transparente
-                            f"\\bord2"        # Contour fin
-                            f"\\shad0"        # Pas d'ombre
-                            f"\\fs170"        # Taille de police
-                        )
+                final_text = " ".join(text_parts)
+                events.append(f"Dialogue: 0,{start_time},{end_time},SubtitleFadeZoom,,0,0,0,,{final_text}\n")
+                current_word_index += 1
 
-                        # Style pour le mot en surbrillance (fond rouge)
-                        highlight_style = (
-                            f"\\an2"
-                            f"\\pos({center_x},{bottom_y})"
-                            f"\\1c&HFFFFFF&"  # Texte blanc
-                            f"\\3c&H0000FF&"  # Contour rouge
-                            f"\\4c&H0000FF&"  # Fond rouge
-                            f"\\4a&H00&"      # Fond opaque
-                            f"\\bord15"       # Large bordure pour créer le fond
-                            f"\\shad0"        # Pas d'ombre
-                            f"\\fs170"
-                        )
+        return events
 
-                        # Construction du texte pour ce groupe
-                        text_parts = []
-                        for j, w in enumerate(group):
-                            if j == i:
-                                # Mot actuel avec fond rouge
-                                text_parts.append(f"{{{highlight_style}}}{w}")
-                            else:
-                                # Autres mots (vraiment sans fond)
-                                text_parts.append(f"{{{base_style}}}{w}")
-                        
-                        final_text = " ".join(text_parts)
-                        f.write(f"Dialogue: 0,{start_time},{end_time},SubtitleFadeZoom,,0,0,0,,{final_text}\n")
-                        current_word_index += 1
+    def render_renditions(self, subtitles: pysrt.SubRipFile, renditions: List[Rendition], output_dir: str,
+                          metadata: Optional[VideoMetadata] = None, mode: str = "word") -> Dict[str, str]:
+        """Incrustation dans toutes les déclinaisons en un seul décodage
 
-        logger.info("Conversion en ASS terminée.")
-        return ass_file
+        Un fichier ASS est généré par format d'image, aux dimensions de sa
+        plus grande déclinaison (position et taille de police recalculées
+        par subtitle_layout). Renvoie le chemin de chaque déclinaison.
+        """
+        metadata = metadata or self.get_metadata()
+        by_aspect: Dict[float, List[Rendition]] = {}
+        for rendition in renditions:
+            by_aspect.setdefault(rendition.aspect, []).append(rendition)
+
+        groups, outputs = [], {}
+        for targets in by_aspect.values():
+            largest = max(targets, key=lambda r: r.width * r.height)
+            ass_file = self.convert_to_ass(
+                subtitles, VideoMetadata(largest.width, largest.height, metadata.fps),
+                os.path.join(output_dir, f"subtitles_{largest.width}x{largest.height}.ass"), mode=mode
+            )
+            paths = [(target, os.path.join(output_dir, f"video_{target.name}.mp4")) for target in targets]
+            groups.append((ass_file, paths))
+            outputs.update((target.name, path) for target, path in paths)
+
+        if not self.video_processor.overlay_renditions(groups):
+            raise RuntimeError("Échec de l'incrustation des déclinaisons")
+        return outputs
+
+    def render_preview(self, subtitles: pysrt.SubRipFile, start: float, end: float, output_path: str,
+                       metadata: Optional[VideoMetadata] = None, mode: str = "word",
+                       timeline: Optional[WordTimeline] = None) -> bool:
+        """Aperçu rapide de la fenêtre [start, end) avec les sous-titres fournis
+
+        Seuls les sous-titres de la fenêtre doivent être passés : le fichier
+        ASS généré est ensuite recalé au début de la fenêtre pour le rendu
+        basse résolution (voir VideoProcessor.render_preview). timeline
+        remplace self.timeline pour le surlignage, par exemple la chronologie
+        partielle de l'éditeur pendant la transcription.
+        """
+        base = os.path.splitext(output_path)[0]
+        full_ass = self.convert_to_ass(subtitles, metadata, f"{base}.full.ass", timeline=timeline, mode=mode)
+        window_ass = f"{base}.ass"
+        shift_ass_file(full_ass, window_ass, start, end)
+        return self.video_processor.render_preview(window_ass, output_path, start, end)
+
+    def iter_cues(self, subtitles: pysrt.SubRipFile):
+        """Sous-titres par ordre chronologique avec leur fin d'affichage (secondes)
+
+        L'index d'intervalles valide la liste et tronque chaque sous-titre au
+        début du suivant, pour éviter que deux événements se superposent à la
+        même position à l'écran.
+        """
+        index = CueIndex.from_subtitles(subtitles)
+        report = index.validate()
+        if not report.ok:
+            logger.warning(f"Sous-titres à vérifier : {report.summary()}")
+        ids, display_ends = index.display_ends()
+        for position, display_end in zip(ids.tolist(), display_ends.tolist()):
+            yield subtitles[position], display_end / 1000.0
+
+    def karaoke_events(self, words: List[str], word_times: List[Tuple[float, float]]) -> Iterator[str]:
+        """Mode karaoké : un événement par groupe de 4 mots, produit dès qu'il est prêt.
+
+        Chaque mot passe au fond rouge du mode mot par mot (large contour
+        rouge) pendant son intervalle puis revient au contour noir, par deux
+        balises \\t quasi instantanées (1 ms). Les instants sont calculés
+        en centisecondes depuis le début de l'événement pour éviter toute
+        dérive d'arrondi.
+        """
+        for first in range(0, len(words), 4):
+            group = words[first:first + 4]
+            times = word_times[first:first + 4]
+            event_start = int(times[0][0] * 100)
+            event_end = int(times[-1][1] * 100)
+
+            parts = []
+            elapsed = event_start
+            for word, (_, word_end) in zip(group, times):
+                boundary = max(elapsed, int(word_end * 100))
+                # \t(t,t+1) : bascule instantanée (t2 = 0 vaudrait « fin de l'événement »)
+                on, off = (elapsed - event_start) * 10, (boundary - event_start) * 10
+                # Les surcharges s'appliquent aux mots suivants : chaque mot repart du contour noir
+                parts.append(f"{{\\3c&H000000&\\bord2\\t({on},{on + 1},\\3c&H0000FF&\\bord15)"
+                             f"\\t({off},{off + 1},\\3c&H000000&\\bord2)}}{word}")
+                elapsed = boundary
+
+            yield (f"Dialogue: 0,{self.format_ass_time(event_start / 100)},"
+                   f"{self.format_ass_time(event_end / 100)},Karaoke,,0,0,0,,{' '.join(parts)}\n")
+
+    def word_display_times(self, sub: pysrt.SubRipItem, words: List[str],
+                           timeline: Optional[WordTimeline],
+                           display_end: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Intervalles d'affichage de chaque mot d'un sous-titre, en secondes.
+
+        Chaque mot reste surligné jusqu'au début du suivant pour que le groupe
+        reste affiché sans trou entre le début et la fin du sous-titre.
+        display_end tronque l'affichage (début du sous-titre suivant).
+        """
+        cue_start = sub.start.ordinal / 1000.0
+        sub_end = sub.end.ordinal / 1000.0
+        cue_end = sub_end if display_end is None else min(display_end, sub_end)
+        matched = timeline.match_words(words, cue_start, sub_end) if timeline is not None else None
+        if matched is None:
+            word_duration = (cue_end - cue_start) / len(words)
+            return [(cue_start + k * word_duration, cue_start + (k + 1) * word_duration)
+                    for k in range(len(words))]
+
+        starts = np.clip(matched[0], cue_start, cue_end)
+        bounds = np.append(starts, cue_end)
+        bounds[0] = cue_start
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
         
     def run(self) -> bool:
         """Processus principal de génération des sous-titres"""
@@ -519,13 +3435,11 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             metadata = self.video_processor.get_metadata()
             logger.info(f"Métadonnées vidéo: {metadata}")
 
-            # Extraction de l'audio
-            audio_path = "temp_audio.wav"
-            if not self.video_processor.extract_audio(audio_path):
-                raise RuntimeError("Échec de l'extraction audio")
+            # Décodage de l'audio
+            audio = self.video_processor.load_audio()
 
             # Transcription
-            segments = self.transcribe_audio(audio_path)
+            segments = self.transcribe_audio(audio)
             
             # Génération SRT
             subtitles = self.generate_srt(segments)
@@ -543,10 +3457,6 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
                 if not self.video_processor.overlay_subtitles(ass_file, output_path):
                     raise RuntimeError("Échec de la superposition des sous-titres")
 
-                # Nettoyage
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
-
                 logger.info("Traitement terminé avec succès!")
                 return True
             else:
@@ -557,8 +3467,532 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             logger.error(f"Erreur lors du traitement: {str(e)}")
             return False
 
-def main():
-    """Point d'entrée principal"""
+class BatchedTranscriber:
+    """Transcription par lots de fenêtres de 30 s avec un seul modèle chargé.
+
+    L'audio est découpé aux silences en fenêtres d'au plus 30 s. Les
+    spectrogrammes log-mel de batch_size fenêtres passent ensemble dans
+    l'encodeur puis dans le décodage (glouton ou en faisceau). Les fenêtres
+    dont le décodage échoue (texte trop répétitif ou peu probable) sont
+    redécodées par lots à température croissante, à partir des sorties de
+    l'encodeur déjà calculées, avec les mêmes seuils que model.transcribe.
+    Contrairement à ce dernier, chaque fenêtre est décodée sans le texte
+    des fenêtres précédentes en contexte. Les segments produits ont la même
+    structure que ceux de model.transcribe, horodatage des mots compris.
+    """
+    TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+    LOGPROB_THRESHOLD = -1.0
+    NO_SPEECH_THRESHOLD = 0.6
+
+    def __init__(self, model, settings: dict):
+        import whisper
+
+        self.model = model
+        self.settings = settings
+        self.batch_size = max(1, settings.get("batch_size", 1))
+        self.tokenizer = whisper.tokenizer.get_tokenizer(
+            model.is_multilingual, num_languages=model.num_languages,
+            language=settings["language"], task="transcribe"
+        )
+        # Durée représentée par un jeton d'horodatage (0,02 s)
+        input_stride = whisper.audio.N_FRAMES // model.dims.n_audio_ctx
+        self.time_precision = input_stride * whisper.audio.HOP_LENGTH / SAMPLE_RATE
+
+    @staticmethod
+    def split_windows(audio: np.ndarray, search_seconds: float = 10.0) -> List[Tuple[int, int]]:
+        """Bornes (échantillons) de fenêtres d'au plus 30 s, coupées au plus silencieux
+        de leurs search_seconds dernières secondes"""
+        import whisper
+
+        window = whisper.audio.N_SAMPLES
+        # Les dernières trames sont écartées : leur énergie lissée est sous-estimée
+        low, high = window - int(search_seconds * SAMPLE_RATE), window - SAMPLE_RATE // 2
+        bounds, start = [], 0
+        while len(audio) - start > window:
+            split = start + quietest_point(audio[start:start + window], low, high)
+            bounds.append((start, split))
+            start = split
+        if start < len(audio):
+            bounds.append((start, len(audio)))
+        return bounds
+
+    def decoding_options(self, temperature: float):
+        import whisper
+
+        options = {"task": "transcribe", "language": self.settings["language"],
+                   "fp16": self.settings["fp16"], "temperature": temperature}
+        if temperature == 0:
+            options["beam_size"] = self.settings.get("beam_size")
+        return whisper.DecodingOptions(**options)
+
+    def is_silence(self, result) -> bool:
+        return result.no_speech_prob > self.NO_SPEECH_THRESHOLD and result.avg_logprob < self.LOGPROB_THRESHOLD
+
+    def needs_fallback(self, result) -> bool:
+        if self.is_silence(result):
+            return False
+        return (result.compression_ratio > self.COMPRESSION_RATIO_THRESHOLD
+                or result.avg_logprob < self.LOGPROB_THRESHOLD)
+
+    def decode_batch(self, mel: "torch.Tensor") -> list:
+        """Décodage d'un lot de spectrogrammes, puis des échecs à température croissante"""
+        import torch
+        import whisper
+
+        results = whisper.decode(self.model, mel, self.decoding_options(0.0))
+        # Les redécodages repartent des sorties de l'encodeur, sans le relancer
+        features = torch.stack([result.audio_features for result in results])
+        for temperature in self.TEMPERATURES[1:]:
+            retry = [i for i, result in enumerate(results) if self.needs_fallback(result)]
+            if not retry:
+                break
+            retried = whisper.decode(self.model, features[retry], self.decoding_options(temperature))
+            for i, result in zip(retry, retried):
+                results[i] = result
+        return results
+
+    def window_segments(self, result, seek: int, num_frames: int) -> List[dict]:
+        """Segments d'une fenêtre, délimités par les paires de jetons d'horodatage"""
+        import torch
+        import whisper
+
+        tokenizer = self.tokenizer
+        time_offset = seek * whisper.audio.HOP_LENGTH / SAMPLE_RATE
+        window_end = time_offset + num_frames * whisper.audio.HOP_LENGTH / SAMPLE_RATE
+        tokens = torch.tensor(result.tokens, dtype=torch.long)
+        is_timestamp = tokens.ge(tokenizer.timestamp_begin)
+        consecutive = (torch.where(is_timestamp[:-1] & is_timestamp[1:])[0] + 1).tolist()
+
+        segments = []
+        slices = [0] + consecutive + [len(tokens)]
+        for first, last in zip(slices[:-1], slices[1:]):
+            part = tokens[first:last].tolist()
+            text_tokens = [token for token in part if token < tokenizer.eot]
+            if not text_tokens:
+                continue
+            # Segment inachevé en fin de fenêtre : il se termine avec elle
+            start = (time_offset + (part[0] - tokenizer.timestamp_begin) * self.time_precision
+                     if part[0] >= tokenizer.timestamp_begin else time_offset)
+            end = (time_offset + (part[-1] - tokenizer.timestamp_begin) * self.time_precision
+                   if part[-1] >= tokenizer.timestamp_begin else window_end)
+            end = min(max(end, start), window_end)
+            segments.append({
+                "seek": seek,
+                "start": min(start, end),
+                "end": end,
+                "text": tokenizer.decode(text_tokens),
+                "tokens": part,
+                "temperature": result.temperature,
+                "avg_logprob": result.avg_logprob,
+                "compression_ratio": result.compression_ratio,
+                "no_speech_prob": result.no_speech_prob,
+            })
+        return segments
+
+    def transcribe(self, audio: np.ndarray) -> List[dict]:
+        """Segments de tout l'audio (PCM mono 16 kHz), horodatages depuis son début"""
+        import torch
+        import whisper
+
+        windows = self.split_windows(audio)
+        n_mels = self.model.dims.n_mels
+        segments = []
+        last_speech = 0.0
+        with torch.no_grad():
+            for first in range(0, len(windows), self.batch_size):
+                batch = windows[first:first + self.batch_size]
+                mel = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(np.array(audio[start:end]))),
+                                                n_mels, device=self.model.device)
+                    for start, end in batch
+                ])
+                if self.settings["fp16"]:
+                    mel = mel.half()
+
+                for (start, end), window_mel, result in zip(batch, mel, self.decode_batch(mel)):
+                    if self.is_silence(result):
+                        continue
+                    seek = start // whisper.audio.HOP_LENGTH
+                    num_frames = (end - start) // whisper.audio.HOP_LENGTH
+                    window_segments = self.window_segments(result, seek, num_frames)
+                    if self.settings["word_timestamps"] and window_segments:
+                        whisper.timing.add_word_timestamps(
+                            segments=window_segments, model=self.model, tokenizer=self.tokenizer,
+                            mel=window_mel, num_frames=num_frames, last_speech_timestamp=last_speech
+                        )
+                        last_speech = window_segments[-1]["end"]
+                    segments.extend(window_segments)
+                logger.debug(f"Lot de {len(batch)} fenêtres décodé ({first + len(batch)}/{len(windows)})")
+
+        for i, segment in enumerate(segments):
+            segment["id"] = i
+        return segments
+
+class StreamingTranscriber:
+    """Transcription d'un flux audio par fenêtre glissante.
+
+    À chaque pas, la fenêtre d'audio non encore validé est retranscrite ;
+    les mots sur lesquels deux hypothèses consécutives s'accordent (préfixe
+    commun) sont validés, ainsi que tous ceux qui se terminent plus de
+    max_latency secondes avant la fin de l'audio reçu : le retard sur le
+    temps réel reste borné même si le modèle hésite. L'audio validé est
+    retiré de la fenêtre, qui ne dépasse jamais window_seconds.
+    """
+
+    def __init__(self, model, settings: dict, window_seconds: float = 30.0,
+                 max_latency: float = 10.0, sample_rate: int = SAMPLE_RATE):
+        if max_latency >= window_seconds:
+            raise ValueError("La latence maximale doit être inférieure à la taille de la fenêtre")
+        self.model = model
+        self.settings = settings
+        self.window_seconds = window_seconds
+        self.max_latency = max_latency
+        self.sample_rate = sample_rate
+        self.buffer = np.empty(0, dtype=np.float32)
+        self.buffer_start = 0.0
+        self.committed_end = 0.0
+        self.last_committed: Optional[dict] = None
+        self.previous: List[dict] = []
+
+    @property
+    def buffer_end(self) -> float:
+        """Instant (s) de la fin de l'audio reçu"""
+        return self.buffer_start + len(self.buffer) / self.sample_rate
+
+    def feed(self, samples: np.ndarray):
+        self.buffer = np.concatenate((self.buffer, samples))
+
+    def hypothesis(self) -> List[dict]:
+        """Mots transcrits dans la fenêtre courante, postérieurs aux mots validés"""
+        if len(self.buffer) < self.sample_rate // 10:
+            return []
+        segments = shift_segments(transcribe_with_model(self.model, self.buffer, self.settings),
+                                  self.buffer_start)
+        words = []
+        for word in (w for segment in segments for w in segment.get("words", [])):
+            # Le dernier mot validé peut réapparaître au bord de la fenêtre
+            if (self.last_committed is not None and word["start"] < self.committed_end
+                    and _normalize_word(word["word"]) == _normalize_word(self.last_committed["word"])):
+                continue
+            if word["end"] <= self.committed_end:
+                continue
+            word["start"] = max(word["start"], self.committed_end)
+            words.append(word)
+        return words
+
+    def step(self, final: bool = False) -> List[dict]:
+        """Nouvelle hypothèse sur la fenêtre ; renvoie les mots validés à ce pas"""
+        words = self.hypothesis()
+        if final:
+            count = len(words)
+        else:
+            count = 0
+            while (count < min(len(words), len(self.previous))
+                   and _normalize_word(words[count]["word"]) == _normalize_word(self.previous[count]["word"])):
+                count += 1
+            deadline = self.buffer_end - self.max_latency
+            while count < len(words) and words[count]["end"] <= deadline:
+                count += 1
+
+        committed, self.previous = words[:count], words[count:]
+        if committed:
+            self.committed_end = committed[-1]["end"]
+            self.last_committed = committed[-1]
+        self._trim()
+        return committed
+
+    def _trim(self):
+        """Retrait de l'audio validé, et de l'audio le plus ancien si la fenêtre déborde"""
+        cut = max(self.committed_end, self.buffer_end - self.window_seconds)
+        drop = int((cut - self.buffer_start) * self.sample_rate)
+        if drop > 0:
+            self.buffer = self.buffer[drop:]
+            self.buffer_start += drop / self.sample_rate
+
+class CueBuilder:
+    """Regroupement au fil de l'eau des mots validés en sous-titres.
+
+    Un sous-titre est finalisé à la fin d'une phrase, après un silence de
+    plus de max_gap secondes ou lorsqu'il atteint max_seconds ; comme
+    to_srt, son début est avancé de start_padding sans chevaucher le
+    précédent.
+    """
+
+    def __init__(self, max_seconds: float = 6.0, max_gap: float = 1.0, start_padding: float = 0.5):
+        self.max_seconds = max_seconds
+        self.max_gap = max_gap
+        self.start_padding = start_padding
+        self.words: List[dict] = []
+        self.index = 0
+        self.previous_end = 0.0
+
+    def add(self, words: List[dict]) -> List[Tuple[pysrt.SubRipItem, List[dict]]]:
+        """Ajout de mots validés ; renvoie les sous-titres finalisés (avec leurs mots)"""
+        cues = []
+        for word in words:
+            if self.words and (word["start"] - self.words[-1]["end"] > self.max_gap
+                               or word["end"] - self.words[0]["start"] > self.max_seconds):
+                cues.append(self._close())
+            self.words.append(word)
+            if word["word"].strip().endswith((".", "?", "!", "…")):
+                cues.append(self._close())
+        return cues
+
+    def flush(self) -> List[Tuple[pysrt.SubRipItem, List[dict]]]:
+        return [self._close()] if self.words else []
+
+    def _close(self) -> Tuple[pysrt.SubRipItem, List[dict]]:
+        words, self.words = self.words, []
+        start = max(words[0]["start"] - self.start_padding, self.previous_end, 0.0)
+        end = words[-1]["end"]
+        self.previous_end = end
+        self.index += 1
+        sub = pysrt.SubRipItem(
+            index=self.index,
+            start=pysrt.SubRipTime(seconds=min(start, words[0]["start"])),
+            end=pysrt.SubRipTime(seconds=end),
+            text=" ".join(word["word"].strip() for word in words)
+        )
+        return sub, words
+
+class IncrementalSubtitleWriter:
+    """Écriture des sous-titres finalisés au fur et à mesure (SRT et ASS).
+
+    Chaque sous-titre est ajouté et vidé sur disque dès sa finalisation :
+    les fichiers sont lisibles (et l'ASS utilisable par ffmpeg) pendant la
+    transcription. Les événements ASS sont produits par
+    SubtitleGenerator.cue_events à partir des mots du sous-titre.
+    """
+
+    def __init__(self, srt_path: str, ass_path: Optional[str] = None,
+                 generator: Optional["SubtitleGenerator"] = None,
+                 metadata: Optional[VideoMetadata] = None, mode: str = "word"):
+        self.generator = generator
+        self.metadata = metadata
+        self.mode = mode
+        self.count = 0
+        self.srt = open(srt_path, "w", encoding='utf-8')
+        self.ass = None
+        if ass_path is not None:
+            self.ass = open(ass_path, "w", encoding='utf-8')
+            self.ass.write(generator.generate_ass_style(metadata))
+            self.ass.flush()
+
+    def write(self, sub: pysrt.SubRipItem, words: List[dict], display_end: Optional[float] = None):
+        """Ajout d'un sous-titre ; display_end (s) tronque son affichage ASS au début du suivant"""
+        self.srt.write(f"{sub}\n")
+        self.srt.flush()
+        if self.ass is not None:
+            timeline = WordTimeline.from_segments(
+                [{"start": words[0]["start"], "end": words[-1]["end"], "words": words}]) if words else None
+            self.ass.writelines(self.generator.cue_events(sub, self.metadata, timeline, display_end, self.mode))
+            self.ass.flush()
+        self.count += 1
+
+    def close(self):
+        self.srt.close()
+        if self.ass is not None:
+            self.ass.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def run_live(source: str, output_dir: str, config: Optional[InferenceConfig] = None,
+             ass_mode: str = "word", window_seconds: float = 30.0, step_seconds: float = 5.0,
+             max_latency: float = 10.0, follow: bool = False,
+             metadata: Optional[VideoMetadata] = None) -> Dict[str, str]:
+    """Sous-titrage en direct d'un flux (fichier en cours d'écriture, pipe, URL)
+
+    Le décodage tourne dans un thread et alimente une file ; la
+    transcription avance par pas de step_seconds d'audio reçu. Lorsque le
+    modèle prend du retard, tout l'audio en attente est intégré au pas
+    suivant. Les sous-titres sont écrits dans output_dir/live.srt et
+    live.ass dès leur finalisation.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    generator = SubtitleGenerator(source, config=config)
+    if metadata is None:
+        try:
+            metadata = generator.get_metadata()
+        except RuntimeError:
+            metadata = VideoMetadata(1920, 1080, 30.0)
+            logger.info("Dimensions du flux inconnues, sous-titres ASS en 1920x1080")
+
+    transcriber = StreamingTranscriber(generator.model, generator.transcription_settings(),
+                                       window_seconds, max_latency)
+    builder = CueBuilder()
+    blocks: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+
+    def read_audio():
+        try:
+            for block in generator.video_processor.iter_audio_blocks(follow=follow):
+                blocks.put(block)
+        finally:
+            blocks.put(None)
+
+    threading.Thread(target=read_audio, daemon=True).start()
+
+    outputs = {"srt": os.path.join(output_dir, "live.srt"), "ass": os.path.join(output_dir, "live.ass")}
+    with IncrementalSubtitleWriter(outputs["srt"], outputs["ass"], generator, metadata, ass_mode) as writer:
+        finished = False
+        pending = 0.0
+        while not finished:
+            block = blocks.get()
+            # Intégration de tout l'audio déjà disponible
+            while block is not None:
+                transcriber.feed(block)
+                pending += len(block) / SAMPLE_RATE
+                if blocks.empty():
+                    break
+                block = blocks.get()
+            finished = block is None
+            if pending < step_seconds and not finished:
+                continue
+            pending = 0.0
+
+            committed = transcriber.step(final=finished)
+            cues = builder.add(committed) + (builder.flush() if finished else [])
+            for sub, words in cues:
+                writer.write(sub, words)
+            latency = transcriber.buffer_end - transcriber.committed_end
+            generator.instrumentation.counter("live", {"latency": latency, "cues": writer.count})
+            logger.info(f"Direct: {transcriber.buffer_end:.0f}s d'audio reçus, {writer.count} sous-titres, "
+                        f"retard de validation {latency:.1f}s")
+
+    logger.info(f"Sous-titrage en direct terminé: {writer.count} sous-titres")
+    return outputs
+
+class GuiPipeline:
+    """Pipeline interactif : l'éditeur s'ouvre dès la vidéo choisie.
+
+    Le chargement du modèle, l'analyse de la vidéo, le décodage audio et la
+    transcription tournent dans un thread (BackgroundJob) ; les sous-titres
+    s'ajoutent à l'éditeur à chaque fenêtre transcrite. Le rendu final
+    tourne lui aussi dans un thread, avec la progression d'ffmpeg affichée
+    dans une petite fenêtre.
+    """
+
+    def __init__(self, root: tk.Tk, video_path: str, window_seconds: float = 60.0):
+        self.root = root
+        self.video_path = video_path
+        self.window_seconds = window_seconds
+        self.generator: Optional[SubtitleGenerator] = None
+        self.metadata: Optional[VideoMetadata] = None
+        self.job: Optional[BackgroundJob] = None
+        self.instrumentation = Instrumentation(on_progress=self.report_progress)
+        self.editor = SubtitleEditor(pysrt.SubRipFile(), self.render, loading=True)
+        self.panel = self.editor.progress
+
+    def report_progress(self, label: str, snapshot: dict):
+        # Appelé depuis les threads de travail : transmis par la file du job qui l'exécute.
+        # Les aperçus (pool de l'éditeur) n'ont pas de job : leur progression est ignorée.
+        job = BackgroundJob.current()
+        if job is not None:
+            job.post("progress", (snapshot.get("percent"), format_progress(label, snapshot)))
+
+    def show_progress(self, payload: Tuple[Optional[float], str]):
+        self.panel.update(*payload)
+
+    def start(self) -> "GuiPipeline":
+        self.job = BackgroundJob(self.editor.root, self.transcribe, {
+            "progress": self.show_progress,
+            "ready": lambda payload: self.editor.attach_generator(*payload),
+            "cues": lambda payload: self.editor.extend_cues(*payload),
+            "done": self.editor.loading_finished,
+            "error": self.failed
+        }).start()
+        return self
+
+    def transcribe(self, post: Callable) -> WordTimeline:
+        """Thread de travail : métadonnées, audio puis transcription fenêtre par fenêtre"""
+        self.generator = SubtitleGenerator(self.video_path, cache=TranscriptionCache(),
+                                           instrumentation=self.instrumentation)
+        self.metadata = self.generator.video_processor.get_metadata()
+        logger.info(f"Métadonnées vidéo: {self.metadata}")
+        # L'aperçu ne dépend pas du modèle : il est disponible avant son chargement
+        post("ready", (self.generator, self.metadata))
+
+        post("progress", (None, "Décodage de l'audio..."))
+        audio = self.generator.video_processor.load_audio()
+        duration = len(audio) / SAMPLE_RATE
+        segments: List[dict] = []
+        timeline = WordTimeline.from_segments([])
+        # Le modèle n'est chargé qu'à la première fenêtre, et pas du tout si la transcription est en cache
+        post("progress", (0.0, "Transcription (chargement du modèle)..."))
+        for window, done_seconds in self.generator.iter_transcription(audio, self.window_seconds):
+            cues = []
+            for segment in window:
+                cues.append(segment_cue(segment, segments[-1]["end"] if segments else 0.0, len(segments) + 1))
+                segments.append(segment)
+            # La chronologie (colonne de confiance) est prolongée ici, hors du thread de l'interface
+            timeline = WordTimeline.concatenate([timeline, WordTimeline.from_segments(window)])
+            post("cues", (cues, timeline))
+            post("progress", (100.0 * done_seconds / duration if duration else 100.0,
+                              f"Transcription : {done_seconds:.0f}s / {duration:.0f}s, {len(segments)} sous-titres"))
+        self.generator.timeline = timeline
+        return timeline
+
+    def failed(self, error: Exception):
+        messagebox.showerror("Erreur", f"Une erreur est survenue: {error}")
+        self.editor.preview_executor.shutdown(wait=False)
+        self.editor.root.destroy()
+        self.root.destroy()
+
+    def render(self):
+        """Rendu final, après la fermeture de l'éditeur, dans un thread"""
+        window = tk.Toplevel(self.root)
+        window.title("Rendu de la vidéo")
+        window.protocol("WM_DELETE_WINDOW", lambda: None)
+        self.panel = ProgressPanel(window)
+        self.panel.frame.pack(fill=tk.X, padx=10, pady=10)
+        self.panel.update(None, "Conversion des sous-titres...")
+        self.job = BackgroundJob(self.root, self.render_video, {
+            "progress": self.show_progress,
+            "done": self.rendered,
+            "error": self.render_failed
+        }).start()
+
+    def render_video(self, post: Callable):
+        # Conversion en ASS avec effets
+        ass_file = self.generator.convert_to_ass(self.editor.subtitles, self.metadata)
+
+        # Superposition des sous-titres (seuls les segments modifiés
+        # depuis le rendu précédent sont réencodés)
+        post("progress", (0.0, "Incrustation des sous-titres..."))
+        if not self.generator.video_processor.overlay_subtitles(
+                ass_file, "video_with_subtitles.mp4", render_dir="video_with_subtitles.segments"):
+            raise RuntimeError("Échec de la superposition des sous-titres")
+
+        self.generator.timeline.save(TRANSCRIPT_FILE, source=self.video_path)
+        logger.info("Traitement terminé avec succès!")
+        self.instrumentation.log_summary()
+        self.instrumentation.export_chrome_trace("pipeline_trace.json")
+
+    def rendered(self, _):
+        self.panel.stop()
+        messagebox.showinfo(
+            "Succès",
+            "Traitement terminé avec succès!\n"
+            "Les fichiers suivants ont été générés:\n"
+            "- corrected_subtitles.srt\n"
+            "- styled_subtitles.ass\n"
+            "- video_with_subtitles.mp4\n"
+            f"- {TRANSCRIPT_FILE}"
+        )
+        self.root.destroy()
+
+    def render_failed(self, error: Exception):
+        self.panel.stop()
+        logger.error(f"Erreur lors du traitement final: {error}")
+        messagebox.showerror("Erreur", f"Une erreur est survenue: {error}")
+        self.root.destroy()
+
+def run_gui():
+    """Point d'entrée interactif (sélection de fichier et éditeur)"""
     root = tk.Tk()
     root.withdraw()
 
@@ -576,67 +4010,679 @@ def main():
             root.destroy()
             return
 
-        # Création et exécution du générateur de sous-titres
-        generator = SubtitleGenerator(video_path)
-        
-        try:
-            # Récupération des métadonnées vidéo
-            metadata = generator.video_processor.get_metadata()
-            logger.info(f"Métadonnées vidéo: {metadata}")
+        # L'éditeur s'ouvre aussitôt ; transcription et rendu tournent en arrière-plan
+        GuiPipeline(root, video_path).start()
+        root.mainloop()
 
-            # Extraction de l'audio
-            audio_path = "temp_audio.wav"
-            if not generator.video_processor.extract_audio(audio_path):
-                raise RuntimeError("Échec de l'extraction audio")
+    except Exception as e:
+        logger.error(f"Erreur principale: {str(e)}")
+        messagebox.showerror("Erreur critique", str(e))
+        root.destroy()
 
-            # Transcription
-            segments = generator.transcribe_audio(audio_path)
-            
-            # Génération SRT
+# Modèle Whisper propre à chaque processus du pool batch, chargé au premier besoin
+_worker_config: Optional[InferenceConfig] = None
+_worker_model = None
+
+def _init_batch_worker(config: InferenceConfig, threads: Optional[int] = None):
+    """Initialisation d'un processus du pool : configuration du modèle, sans le charger"""
+    global _worker_config
+    if threads and not config.threads:
+        # Évite que chaque processus réclame tous les cœurs
+        config = replace(config, threads=threads)
+    _worker_config = config
+
+def _get_worker_model():
+    """Modèle du processus, chargé une seule fois au premier cache manqué"""
+    global _worker_model
+    if _worker_model is None:
+        _worker_model = load_whisper_model(_worker_config)
+    return _worker_model
+
+def worker_threads(workers: int) -> int:
+    """Part des cœurs revenant à chacun des processus d'un pool"""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+def create_chunk_pool(config: InferenceConfig, workers: int) -> ProcessPoolExecutor:
+    """Pool de transcription par chunks, un modèle chargé par processus"""
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=_init_batch_worker, initargs=(config, worker_threads(workers)))
+
+def _transcribe_chunk(chunk: np.ndarray, offset: float, settings: dict) -> List[dict]:
+    """Transcription d'un chunk dans un processus du pool, horodatages remis à l'échelle globale"""
+    return shift_segments(transcribe_with_model(_get_worker_model(), chunk, settings), offset)
+
+def run_batch_job(video_path: str, output_dir: str, model=None, render: bool = True,
+                  on_stage: Optional[Callable[[str], None]] = None,
+                  config: Optional[InferenceConfig] = None,
+                  options: Optional[JobOptions] = None,
+                  subtitles_path: Optional[str] = None,
+                  chunk_pool: Optional[ProcessPoolExecutor] = None) -> BatchJobResult:
+    """Traitement complet d'une vidéo sans interface graphique.
+
+    Tous les fichiers intermédiaires sont écrits dans output_dir pour que
+    plusieurs jobs puissent tourner en parallèle sans se marcher dessus.
+    Avec render=False, le traitement s'arrête après la génération du SRT.
+    Avec subtitles_path (SRT ou ASS déjà corrigé), ni l'audio ni le modèle
+    ne sont chargés : les sous-titres sont directement convertis et rendus.
+    chunk_pool est un pool de transcription par chunks déjà démarré.
+    La chronologie des étapes est exportée dans output_dir/trace.json.
+    """
+    options = options or JobOptions()
+    start = time.perf_counter()
+    result = BatchJobResult(video_path=video_path, output_dir=output_dir, success=False)
+    notify = on_stage or (lambda stage: None)
+    instrumentation = Instrumentation()
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        generator = SubtitleGenerator(
+            video_path,
+            model=model,
+            config=config,
+            # Dans un processus du pool batch : modèle partagé entre les jobs
+            model_loader=_get_worker_model if _worker_config is not None else None,
+            cache=TranscriptionCache(options.cache_dir) if options.cache_dir else None,
+            chunk_workers=options.chunk_workers,
+            instrumentation=instrumentation,
+            vad=options.vad,
+            chunk_pool=chunk_pool
+        )
+        processor = generator.video_processor
+
+        notify("metadata")
+        with instrumentation.stage("metadata"):
+            metadata = processor.get_metadata()
+
+        font_file = options.font_file
+        if render and options.output_mode == "softsub":
+            # La police est jointe au fichier : on peut utiliser celle du projet
+            font_file = font_file or BUNDLED_FONT_FILE
+        if render and font_file:
+            generator.use_font(font_file)
+
+        srt_path = os.path.join(output_dir, "subtitles.srt")
+        ass_file = os.path.join(output_dir, "highlighted_subtitles.ass")
+        subtitles = None
+        if subtitles_path is not None:
+            notify("load_subtitles")
+            if subtitles_path.lower().endswith(".ass"):
+                # ASS déjà stylé : rendu tel quel, sans conversion
+                if os.path.abspath(subtitles_path) != os.path.abspath(ass_file):
+                    shutil.copyfile(subtitles_path, ass_file)
+            else:
+                subtitles = pysrt.open(subtitles_path, encoding='utf-8')
+                srt_path = subtitles_path
+        elif options.stream_window:
+            # Mémoire bornée : ni l'audio complet ni la transcription ne sont gardés en mémoire
+            notify("decode_audio")
+            audio_file = processor.decode_audio_file(os.path.join(output_dir, "audio.f32"))
+            result.audio_duration = audio_file.duration
+            notify("transcribe")
+            try:
+                # Le transcript mot à mot est lui aussi écrit au fil de l'eau
+                words_path = os.path.join(output_dir, TRANSCRIPT_FILE)
+                generator.transcribe_to_files(audio_file, srt_path, ass_file if render else None,
+                                              metadata, options.ass_mode, options.stream_window,
+                                              words_path=words_path)
+            finally:
+                os.remove(audio_file.path)
+            result.outputs["words"] = words_path
+        else:
+            notify("load_audio")
+            audio = processor.load_audio()
+            result.audio_duration = len(audio) / SAMPLE_RATE
+
+            notify("transcribe")
+            segments = generator.transcribe_audio(audio)
+            del audio
             subtitles = generator.generate_srt(segments)
-            
-            def continue_processing():
-                try:
-                    # Conversion en ASS avec effets
-                    ass_file = generator.convert_to_ass(subtitles, metadata)
-                    
-                    # Superposition des sous-titres
-                    output_path = "video_with_subtitles.mp4"
-                    if not generator.video_processor.overlay_subtitles(ass_file, output_path):
-                        raise RuntimeError("Échec de la superposition des sous-titres")
-
-                    # Nettoyage
-                    if os.path.exists(audio_path):
-                        os.remove(audio_path)
-
-                    logger.info("Traitement terminé avec succès!")
-                    messagebox.showinfo(
-                        "Succès",
-                        "Traitement terminé avec succès!\n"
-                        "Les fichiers suivants ont été générés:\n"
-                        "- corrected_subtitles.srt\n"
-                        "- styled_subtitles.ass\n"
-                        "- video_with_subtitles.mp4"
-                    )
-                    root.destroy()
-                except Exception as e:
-                    logger.error(f"Erreur lors du traitement final: {str(e)}")
-                    messagebox.showerror("Erreur", f"Une erreur est survenue: {str(e)}")
-                    root.destroy()
+            subtitles.save(srt_path, encoding='utf-8')
+        if generator.timeline is not None:
+            # Transcript mot à mot pour l'index de recherche (commande index)
+            result.outputs["words"] = generator.timeline.save(os.path.join(output_dir, TRANSCRIPT_FILE),
+                                                              source=video_path)
+        # Un ASS fourni tel quel n'a pas de SRT associé
+        if subtitles_path is None or subtitles is not None:
+            result.outputs["srt"] = srt_path
 
-            # Interface d'édition
-            editor = SubtitleEditor(subtitles, continue_processing)
-            editor.root.mainloop()
-            
-        except Exception as e:
-            logger.error(f"Erreur lors du traitement: {str(e)}")
-            messagebox.showerror("Erreur", f"Une erreur est survenue: {str(e)}")
-            root.destroy()
+        if render:
+            if subtitles is not None:
+                notify("convert_to_ass")
+                generator.convert_to_ass(subtitles, metadata, ass_file, mode=options.ass_mode)
+            result.outputs["ass"] = ass_file
+
+            if options.output_mode == "softsub":
+                if options.renditions:
+                    logger.warning("Déclinaisons ignorées : elles nécessitent l'incrustation (--output-mode burn)")
+                notify("mux_subtitles")
+                output_path = os.path.join(output_dir, f"video_with_subtitles.{options.soft_format}")
+                if not processor.mux_subtitles(ass_file, output_path, font_file):
+                    raise RuntimeError("Échec de l'ajout de la piste de sous-titres")
+                result.outputs["video"] = output_path
+            elif options.renditions and subtitles is not None:
+                notify("overlay_renditions")
+                renditions = generator.render_renditions(subtitles, options.renditions, output_dir,
+                                                         metadata, options.ass_mode)
+                result.outputs.update((f"video_{name}", path) for name, path in renditions.items())
+            else:
+                if options.renditions:
+                    logger.warning("Déclinaisons ignorées : elles nécessitent les sous-titres SRT complets en mémoire "
+                                   "(ni --stream-window ni ASS fourni)")
+                notify("overlay_subtitles")
+                output_path = os.path.join(output_dir, "video_with_subtitles.mp4")
+                render_dir = os.path.join(output_dir, "render_segments") if options.incremental else None
+                if not processor.overlay_subtitles(ass_file, output_path, segments=options.burn_segments,
+                                                   render_dir=render_dir):
+                    raise RuntimeError("Échec de la superposition des sous-titres")
+                result.outputs["video"] = output_path
 
+        result.success = True
     except Exception as e:
-        logger.error(f"Erreur principale: {str(e)}")
-        messagebox.showerror("Erreur critique", str(e))
-        root.destroy()
+        logger.error(f"Erreur lors du traitement de {video_path}: {e}")
+        result.error = str(e)
+    result.elapsed = time.perf_counter() - start
+
+    if instrumentation.events and os.path.isdir(output_dir):
+        instrumentation.log_summary()
+        result.outputs["trace"] = instrumentation.export_chrome_trace(os.path.join(output_dir, "trace.json"))
+    return result
+
+def collect_batch_inputs(source: str) -> List[str]:
+    """Liste des vidéos à traiter depuis un dossier ou un manifeste (un chemin par ligne)"""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name)
+            for name in os.listdir(source)
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        )
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    videos = []
+    with open(source, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            videos.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+    return videos
+
+def batch_output_dirs(videos: List[str], output_root: str) -> List[str]:
+    """Un dossier de sortie par vidéo, dédoublonné si deux vidéos portent le même nom"""
+    dirs, seen = [], {}
+    for video in videos:
+        stem = os.path.splitext(os.path.basename(video))[0]
+        count = seen.get(stem, 0)
+        seen[stem] = count + 1
+        dirs.append(os.path.join(output_root, stem if count == 0 else f"{stem}_{count}"))
+    return dirs
+
+def run_batch(videos: List[str], output_root: str, workers: int = 1,
+              config: Optional[InferenceConfig] = None,
+              options: Optional[JobOptions] = None) -> List[BatchJobResult]:
+    """Traitement d'une liste de vidéos sur un pool de processus"""
+    config = config or InferenceConfig()
+    start = time.perf_counter()
+    results = []
+    # "spawn" évite d'hériter d'un état CUDA/torch incohérent après un fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_batch_worker,
+                             initargs=(config, worker_threads(workers))) as pool:
+        futures = {
+            pool.submit(run_batch_job, video, output_dir, config=config, options=options): video
+            for video, output_dir in zip(videos, batch_output_dirs(videos, output_root))
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            status = "OK" if result.success else f"ÉCHEC ({result.error})"
+            logger.info(f"[{len(results) + 1}/{len(videos)}] {result.video_path}: {status} "
+                        f"en {result.elapsed:.1f}s")
+            results.append(result)
+
+    wall_time = time.perf_counter() - start
+    log_batch_throughput(results, wall_time)
+    return results
+
+def log_batch_throughput(results: List[BatchJobResult], wall_time: float):
+    """Affichage du débit global du batch"""
+    succeeded = [r for r in results if r.success]
+    audio_seconds = sum(r.audio_duration for r in succeeded)
+    wall_time = max(wall_time, 1e-6)
+    logger.info(f"Batch terminé: {len(succeeded)}/{len(results)} vidéos en {wall_time:.1f}s")
+    logger.info(f"Débit: {len(succeeded) * 3600 / wall_time:.2f} vidéos/heure, "
+                f"{audio_seconds / wall_time:.2f} secondes d'audio par seconde")
+
+@dataclass
+class ServerJob:
+    id: str
+    video_path: str
+    output_dir: str
+    render: bool
+    output_mode: Optional[str] = None   # None : mode configuré au lancement du serveur
+    status: str = "queued"
+    stage: str = ""
+    version: int = 0
+    submitted_at: float = 0.0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+class TranscriptionServer:
+    """Serveur local gardant le modèle Whisper chargé entre les jobs.
+
+    Les jobs sont placés dans une file bornée et traités un par un par un
+    thread unique qui partage le modèle déjà en mémoire. Avec chunk_workers
+    > 1, le pool de transcription par chunks est lui aussi créé une seule
+    fois : ses processus gardent leur modèle d'un job à l'autre.
+    """
+    MAX_FINISHED_JOBS = 1000
+
+    def __init__(self, config: Optional[InferenceConfig] = None, host: str = "127.0.0.1",
+                 port: int = 8765, max_queue: int = 16, options: Optional[JobOptions] = None):
+        self.config = config or InferenceConfig()
+        self.options = options or JobOptions()
+        self.model = load_whisper_model(self.config)
+        self.chunk_pool = None
+        if self.options.chunk_workers > 1:
+            self.chunk_pool = create_chunk_pool(self.config, self.options.chunk_workers)
+        self.jobs: Dict[str, ServerJob] = {}
+        self.queue: "queue.Queue[ServerJob]" = queue.Queue(maxsize=max_queue)
+        self.condition = threading.Condition()
+        self.httpd = ThreadingHTTPServer((host, port), TranscriptionRequestHandler)
+        self.httpd.app = self
+
+    def submit(self, video_path: str, output_dir: str, render: bool = True,
+               output_mode: Optional[str] = None) -> ServerJob:
+        """Ajout d'un job dans la file (lève queue.Full si elle est pleine)"""
+        if output_mode not in (None,) + OUTPUT_MODES:
+            raise ValueError(f"Mode de sortie inconnu: {output_mode}")
+        job = ServerJob(
+            id=uuid.uuid4().hex[:12],
+            video_path=os.path.abspath(video_path),
+            output_dir=os.path.abspath(output_dir),
+            render=render,
+            output_mode=output_mode,
+            submitted_at=time.time()
+        )
+        with self.condition:
+            self.queue.put_nowait(job)
+            self.jobs[job.id] = job
+            self._prune_finished_jobs()
+        logger.info(f"Job {job.id} ajouté à la file: {job.video_path}")
+        return job
+
+    def update(self, job: ServerJob, **changes):
+        """Mise à jour d'un job et réveil des clients qui suivent son statut"""
+        with self.condition:
+            for key, value in changes.items():
+                setattr(job, key, value)
+            job.version += 1
+            self.condition.notify_all()
+
+    def wait_for_change(self, job: ServerJob, version: int, timeout: float = 30.0) -> ServerJob:
+        """Attente d'une nouvelle version du job (ou expiration du délai)"""
+        with self.condition:
+            self.condition.wait_for(lambda: job.version != version, timeout=timeout)
+        return job
+
+    def _prune_finished_jobs(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    def _worker_loop(self):
+        """Traitement séquentiel des jobs avec le modèle déjà chargé"""
+        while True:
+            job = self.queue.get()
+            self.update(job, status="running")
+            options = replace(self.options, output_mode=job.output_mode) if job.output_mode else self.options
+            result = run_batch_job(
+                job.video_path, job.output_dir, model=self.model, render=job.render,
+                on_stage=lambda stage, job=job: self.update(job, stage=stage),
+                config=self.config, options=options, chunk_pool=self.chunk_pool
+            )
+            if result.success:
+                self.update(job, status="done", stage="", result=asdict(result))
+            else:
+                self.update(job, status="failed", stage="", error=result.error, result=asdict(result))
+            self.queue.task_done()
+
+    def serve_forever(self):
+        """Démarrage du thread de traitement puis du serveur HTTP"""
+        threading.Thread(target=self._worker_loop, daemon=True).start()
+        host, port = self.httpd.server_address[:2]
+        logger.info(f"Serveur de transcription en écoute sur http://{host}:{port}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+            if self.chunk_pool is not None:
+                self.chunk_pool.shutdown(cancel_futures=True)
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    """API HTTP du serveur de transcription
+
+    POST /jobs              soumission d'un job {"video": ..., "output_dir": ..., "render": true,
+                            "output_mode": "burn" | "softsub" (optionnel)}
+    GET  /jobs/<id>         statut courant du job
+    GET  /jobs/<id>/events  flux JSON (une ligne par changement) jusqu'à la fin du job
+    """
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self.send_json(404, {"error": "Ressource inconnue"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            video_path = request["video"]
+        except (ValueError, KeyError) as e:
+            self.send_json(400, {"error": f"Requête invalide: {e}"})
+            return
+
+        output_dir = request.get("output_dir") or os.path.join(
+            "server_output", os.path.splitext(os.path.basename(video_path))[0])
+        try:
+            job = self.server.app.submit(video_path, output_dir, bool(request.get("render", True)),
+                                         request.get("output_mode"))
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except queue.Full:
+            self.send_json(503, {"error": "File d'attente pleine, réessayez plus tard"})
+            return
+        self.send_json(202, asdict(job))
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("/") if part]
+        if len(parts) < 2 or parts[0] != "jobs":
+            self.send_json(404, {"error": "Ressource inconnue"})
+            return
+
+        job = self.server.app.jobs.get(parts[1])
+        if job is None:
+            self.send_json(404, {"error": f"Job inconnu: {parts[1]}"})
+            return
+
+        if len(parts) == 2:
+            self.send_json(200, asdict(job))
+        elif parts[2:] == ["events"]:
+            self.stream_events(job)
+        else:
+            self.send_json(404, {"error": "Ressource inconnue"})
+
+    def stream_events(self, job: ServerJob):
+        """Envoi d'une ligne JSON à chaque changement d'état, jusqu'à la fin du job"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        version = -1
+        try:
+            while True:
+                if job.version != version:
+                    version = job.version
+                    self.wfile.write((json.dumps(asdict(job)) + "\n").encode('utf-8'))
+                    self.wfile.flush()
+                if job.finished:
+                    return
+                self.server.app.wait_for_change(job, version)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Client déconnecté du flux du job {job.id}")
+
+def submit_to_server(video_path: str, output_dir: Optional[str], render: bool = True,
+                     server_url: str = "http://127.0.0.1:8765", output_mode: Optional[str] = None) -> bool:
+    """Client léger : soumission d'un job au serveur et suivi de son statut"""
+    payload = {"video": os.path.abspath(video_path), "render": render}
+    if output_dir:
+        payload["output_dir"] = os.path.abspath(output_dir)
+    if output_mode:
+        payload["output_mode"] = output_mode
+
+    request = urllib.request.Request(
+        f"{server_url.rstrip('/')}/jobs",
+        data=json.dumps(payload).encode('utf-8'),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            job = json.load(response)
+    except urllib.error.HTTPError as e:
+        logger.error(f"Soumission refusée par le serveur: {e.read().decode('utf-8', 'replace')}")
+        return False
+    logger.info(f"Job {job['id']} soumis")
+
+    with urllib.request.urlopen(f"{server_url.rstrip('/')}/jobs/{job['id']}/events") as response:
+        for line in response:
+            job = json.loads(line)
+            logger.info(f"Job {job['id']}: {job['status']} {job['stage']}".rstrip())
+
+    if job["status"] != "done":
+        logger.error(f"Échec du job {job['id']}: {job['error']}")
+        return False
+    for kind, path in job["result"]["outputs"].items():
+        logger.info(f"{kind}: {path}")
+    return True
+
+def add_inference_arguments(parser: argparse.ArgumentParser):
+    """Options communes de configuration de l'inférence Whisper"""
+    parser.add_argument("--model", default="large-v2", help="Modèle Whisper à utiliser (tiny, base, small, medium, large-v2...)")
+    parser.add_argument("--device", default="auto", choices=["auto", "cpu", "cuda"],
+                        help="Périphérique d'inférence")
+    parser.add_argument("--precision", default="auto", choices=["auto", "fp16", "fp32"],
+                        help="Précision de calcul (auto : fp16 sur GPU, fp32 sur CPU)")
+    parser.add_argument("--int8", action="store_true",
+                        help="Quantification int8 dynamique des couches linéaires (CPU)")
+    parser.add_argument("--threads", type=int, help="Nombre de threads torch")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Nombre de fenêtres de 30 s décodées ensemble (1 : décodage séquentiel de Whisper)")
+    parser.add_argument("--beam-size", type=int, help="Recherche en faisceau (défaut : décodage glouton)")
+
+def inference_config_from_args(args: argparse.Namespace) -> InferenceConfig:
+    return InferenceConfig(
+        model_name=args.model,
+        device=args.device,
+        precision=args.precision,
+        quantize=args.int8,
+        threads=args.threads,
+        batch_size=args.batch_size,
+        beam_size=args.beam_size
+    )
+
+def add_job_arguments(parser: argparse.ArgumentParser):
+    """Options communes de traitement des jobs sans interface"""
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Dossier du cache de transcription")
+    parser.add_argument("--no-cache", action="store_true", help="Désactiver le cache de transcription")
+    parser.add_argument("--chunk-workers", type=int, default=1,
+                        help="Processus de transcription parallèle par vidéo (découpe aux silences)")
+    parser.add_argument("--memory-budget", type=float,
+                        help="Mémoire totale (Go) allouée aux processus de transcription par chunks")
+    add_render_arguments(parser)
+    parser.add_argument("--vad", action="store_true",
+                        help="Ne transcrire que les zones de parole (détection par énergie et passages par zéro)")
+    parser.add_argument("--vad-threshold", type=float, default=VadConfig.threshold_db,
+                        help="Seuil de parole en dB au-dessus du bruit de fond")
+    parser.add_argument("--vad-padding", type=float, default=VadConfig.padding,
+                        help="Marge conservée autour de chaque zone de parole (s)")
+    parser.add_argument("--stream-window", type=float, metavar="SECONDES",
+                        help="Mémoire bornée pour les longs enregistrements : transcription par fenêtres "
+                             "de N secondes lues sur disque, sous-titres écrits au fil de l'eau")
+
+def add_render_arguments(parser: argparse.ArgumentParser):
+    """Options de conversion ASS et de rendu vidéo"""
+    parser.add_argument("--ass-mode", default="word", choices=["word", "karaoke"],
+                        help="Un événement ASS par mot (word) ou par groupe de mots au surlignage animé (karaoke)")
+    parser.add_argument("--burn-segments", type=int, default=1,
+                        help="Nombre de segments encodés en parallèle lors de l'incrustation")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Ne réencoder que les segments dont les sous-titres ont changé depuis le dernier rendu")
+    parser.add_argument("--rendition", action="append", dest="renditions", default=[], type=Rendition.parse,
+                        help="Déclinaison NOM=LxH produite dans le même passage ffmpeg (répétable)")
+    parser.add_argument("--output-mode", default="burn", choices=OUTPUT_MODES,
+                        help="Incrustation dans l'image (burn) ou piste de sous-titres sans réencodage (softsub)")
+    parser.add_argument("--soft-format", default="mkv", choices=["mkv", "mp4"],
+                        help="Conteneur du mode softsub : mkv (ASS stylé + police jointe) ou mp4 (mov_text)")
+    parser.add_argument("--font", dest="font_file",
+                        help="Fichier de police des sous-titres (défaut en softsub : Alatsi-Regular.ttf)")
+
+def job_options_from_args(args: argparse.Namespace, jobs: int = 1) -> JobOptions:
+    """Options de job ; le budget mémoire est réparti entre les jobs simultanés"""
+    budget = args.memory_budget / jobs if args.memory_budget else None
+    return JobOptions(
+        cache_dir=None if args.no_cache else args.cache_dir,
+        chunk_workers=workers_for_memory(args.model, args.chunk_workers, budget),
+        ass_mode=args.ass_mode,
+        burn_segments=args.burn_segments,
+        incremental=args.incremental,
+        renditions=args.renditions,
+        output_mode=args.output_mode,
+        soft_format=args.soft_format,
+        font_file=args.font_file,
+        stream_window=args.stream_window,
+        vad=VadConfig(threshold_db=args.vad_threshold, padding=args.vad_padding) if args.vad else None
+    )
+
+def render_options_from_args(args: argparse.Namespace) -> JobOptions:
+    """Options de rendu de sous-titres existants (sans transcription ni cache)"""
+    return JobOptions(
+        cache_dir=None,
+        ass_mode=args.ass_mode,
+        burn_segments=args.burn_segments,
+        incremental=args.incremental,
+        renditions=args.renditions,
+        output_mode=args.output_mode,
+        soft_format=args.soft_format,
+        font_file=args.font_file
+    )
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lecture des arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Générateur de sous-titres vidéo")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser("batch", help="Traitement sans interface d'un dossier ou d'un manifeste")
+    batch.add_argument("source", help="Dossier de vidéos ou fichier manifeste (un chemin par ligne)")
+    batch.add_argument("-o", "--output-dir", default="batch_output",
+                       help="Dossier racine des sorties (un sous-dossier par vidéo)")
+    batch.add_argument("-w", "--workers", type=int, default=1,
+                       help="Nombre de processus de traitement")
+    add_inference_arguments(batch)
+    add_job_arguments(batch)
+
+    serve = subparsers.add_parser("serve", help="Serveur local gardant le modèle chargé")
+    serve.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    serve.add_argument("--port", type=int, default=8765, help="Port d'écoute")
+    serve.add_argument("--queue-size", type=int, default=16, help="Taille maximale de la file de jobs")
+    add_inference_arguments(serve)
+    add_job_arguments(serve)
+
+    submit = subparsers.add_parser("submit", help="Soumission d'une vidéo au serveur local")
+    submit.add_argument("video", help="Vidéo à traiter")
+    submit.add_argument("-o", "--output-dir", help="Dossier de sortie du job")
+    submit.add_argument("--server", default="http://127.0.0.1:8765", help="Adresse du serveur")
+    submit.add_argument("--transcribe-only", action="store_true",
+                        help="S'arrêter après la génération du SRT")
+    submit.add_argument("--output-mode", choices=OUTPUT_MODES,
+                        help="Mode de sortie de ce job (défaut : celui du serveur)")
+
+    render = subparsers.add_parser("render", help="Rendu d'un SRT ou ASS existant sur une vidéo, sans transcription")
+    render.add_argument("video", help="Vidéo source")
+    render.add_argument("subtitles", help="Sous-titres déjà corrigés (.srt converti en ASS, .ass rendu tel quel)")
+    render.add_argument("-o", "--output-dir", default="render_output", help="Dossier de sortie")
+    add_render_arguments(render)
+
+    live = subparsers.add_parser("live", help="Sous-titrage en direct d'un flux ou d'un fichier en cours d'écriture")
+    live.add_argument("source", help="Fichier, '-' pour l'entrée standard, ou URL lisible par ffmpeg")
+    live.add_argument("-o", "--output-dir", default="live_output", help="Dossier de sortie (live.srt, live.ass)")
+    live.add_argument("--follow", action="store_true",
+                      help="Suivre un fichier en cours d'écriture (arrêt après 10 s sans nouvelles données)")
+    live.add_argument("--window", type=float, default=30.0, help="Taille maximale de la fenêtre glissante (s)")
+    live.add_argument("--step", type=float, default=5.0, help="Audio reçu entre deux transcriptions (s)")
+    live.add_argument("--max-latency", type=float, default=10.0,
+                      help="Retard maximal de validation des mots sur l'audio reçu (s)")
+    live.add_argument("--ass-mode", choices=["word", "karaoke"], default="word",
+                      help="Émission ASS : un événement par mot ou karaoké par groupe de mots")
+    add_inference_arguments(live)
+
+    cache = subparsers.add_parser("cache", help="Inspection et nettoyage du cache de transcription")
+    cache.add_argument("action", choices=["list", "stats", "prune", "clear"])
+    cache.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Dossier du cache de transcription")
+    cache.add_argument("--max-size", type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 ** 2,
+                       help="Taille maximale conservée par 'prune', en Mo")
+
+    index = subparsers.add_parser("index", help="Index de recherche des transcripts mot à mot (words.npz)")
+    index.add_argument("action", choices=["add", "remove", "stats"])
+    index.add_argument("paths", nargs="*",
+                       help="Transcripts ou dossiers à (ré)indexer, transcripts ou vidéos à retirer")
+    index.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Fichier SQLite de l'index")
+
+    search = subparsers.add_parser("search", help="Recherche d'un mot ou d'une expression dans les vidéos indexées")
+    search.add_argument("query", help="Mot ou expression (mots consécutifs)")
+    search.add_argument("--limit", type=int, default=100, help="Nombre maximal d'occurrences affichées")
+    search.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Fichier SQLite de l'index")
+
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Point d'entrée principal"""
+    args = parse_args(argv)
+
+    if args.command == "batch":
+        videos = collect_batch_inputs(args.source)
+        if not videos:
+            logger.info("Aucune vidéo à traiter.")
+            return
+        results = run_batch(videos, args.output_dir, args.workers, inference_config_from_args(args),
+                            job_options_from_args(args, args.workers))
+        sys.exit(0 if all(r.success for r in results) else 1)
+
+    if args.command == "serve":
+        TranscriptionServer(inference_config_from_args(args), args.host, args.port,
+                            args.queue_size, job_options_from_args(args)).serve_forever()
+        return
+
+    if args.command == "cache":
+        run_cache_command(args)
+        return
+
+    if args.command == "index":
+        run_index_command(args)
+        return
+
+    if args.command == "search":
+        run_search_command(args)
+        return
+
+    if args.command == "render":
+        result = run_batch_job(args.video, args.output_dir, options=render_options_from_args(args),
+                               subtitles_path=args.subtitles)
+        sys.exit(0 if result.success else 1)
+
+    if args.command == "live":
+        run_live(args.source, args.output_dir, inference_config_from_args(args), args.ass_mode,
+                 args.window, args.step, args.max_latency, args.follow)
+        return
+
+    if args.command == "submit":
+        success = submit_to_server(args.video, args.output_dir, not args.transcribe_only, args.server,
+                                   args.output_mode)
+        sys.exit(0 if success else 1)
+
+    run_gui()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,757 @@
+"""
+Outils de mesure des performances du générateur de sous-titres
+
+Usage :
+    python benchmarks.py inference video.mp4 --reference reference.srt \
+        --config small --config small+int8 --config large-v2+fp16
+    python benchmarks.py ass-modes --duration 600 --burn
+    python benchmarks.py editor --cues 50000
+    python benchmarks.py pipeline --durations 30 120 --resolutions 640x360 1920x1080 \
+        --json results.json --baseline baseline.json
+    python benchmarks.py memory --durations 600 3600 --window 120 --max-growth 64
+    python benchmarks.py vad interview.mp4 --reference interview.srt --config small
+    python benchmarks.py batch video.mp4 --config small+int8 --batch-sizes 4 8 16
+    python benchmarks.py startup --repeat 5 --max-import 1.0
+    python benchmarks.py search --hours 1000 --videos 2000
+"""
+import os
+import re
+import json
+import time
+import argparse
+import logging
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+import pysrt
+
+from PikiSubCreator import (InferenceConfig, SubtitleGenerator, SubtitleEditor, VideoProcessor,
+                            VideoMetadata, VadConfig, WordTimeline, TranscriptIndex, SAMPLE_RATE,
+                            TRANSCRIPT_FILE, _peak_rss_mb, load_whisper_model)
+
+logger = logging.getLogger("benchmarks")
+
+def parse_config_spec(spec: str) -> InferenceConfig:
+    """Lecture d'une configuration compacte :
+    modele[+fp16|fp32][+int8][+cpu|cuda][+t<threads>][+b<lot>][+beam<faisceau>]"""
+    model_name, *options = spec.split("+")
+    config = InferenceConfig(model_name=model_name)
+    for option in options:
+        if option in ("fp16", "fp32"):
+            config.precision = option
+        elif option == "int8":
+            config.quantize = True
+        elif option in ("cpu", "cuda"):
+            config.device = option
+        elif re.fullmatch(r"t\d+", option):
+            config.threads = int(option[1:])
+        elif re.fullmatch(r"b\d+", option):
+            config.batch_size = int(option[1:])
+        elif re.fullmatch(r"beam\d+", option):
+            config.beam_size = int(option[4:])
+        else:
+            raise ValueError(f"Option de configuration inconnue: {option}")
+    return config
+
+def normalize_words(text: str) -> List[str]:
+    """Découpage en mots minuscules sans ponctuation pour le calcul du WER"""
+    return re.findall(r"[\w']+", text.lower())
+
+def word_error_rate(reference: List[str], hypothesis: List[str]) -> float:
+    """Taux d'erreur de mots (distance d'édition / nombre de mots de référence)"""
+    if not reference:
+        return float(len(hypothesis) > 0)
+
+    vocabulary = {}
+    ref = np.array([vocabulary.setdefault(w, len(vocabulary)) for w in reference])
+    hyp = np.array([vocabulary.setdefault(w, len(vocabulary)) for w in hypothesis])
+    columns = np.arange(len(hyp) + 1)
+
+    # Programmation dynamique ligne par ligne, vectorisée sur les colonnes
+    previous = columns.copy()
+    for i, word in enumerate(ref, 1):
+        current = np.empty_like(previous)
+        current[0] = i
+        current[1:] = np.minimum(previous[1:] + 1, previous[:-1] + (hyp != word))
+        # Insertions : current[j] = min(current[j], current[j-1] + 1)
+        current = np.minimum.accumulate(current - columns) + columns
+        previous = current
+    return float(previous[-1]) / len(ref)
+
+def srt_words(subtitles: pysrt.SubRipFile) -> List[str]:
+    return normalize_words(" ".join(sub.text for sub in subtitles))
+
+def bench_inference(video_path: str, reference_path: Optional[str], specs: List[str]) -> List[dict]:
+    """Facteur temps réel et WER de chaque configuration d'inférence"""
+    audio = VideoProcessor(video_path).load_audio()
+    duration = len(audio) / SAMPLE_RATE
+    reference = srt_words(pysrt.open(reference_path, encoding='utf-8')) if reference_path else None
+
+    results = []
+    for spec in specs:
+        config = parse_config_spec(spec)
+        start = time.perf_counter()
+        # Chargement explicite : le modèle paresseux serait sinon compté dans la transcription
+        generator = SubtitleGenerator(video_path, model=load_whisper_model(config), config=config)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        segments = generator.transcribe_audio(audio)
+        elapsed = time.perf_counter() - start
+
+        result = {
+            "config": spec,
+            "resolved": config.describe(),
+            "load_seconds": round(load_time, 2),
+            "transcribe_seconds": round(elapsed, 2),
+            "real_time_factor": round(elapsed / duration, 4) if duration else None,
+        }
+        if reference is not None:
+            hypothesis = srt_words(generator.generate_srt(segments))
+            result["wer"] = round(word_error_rate(reference, hypothesis), 4)
+        results.append(result)
+        logger.info(f"{spec}: {result}")
+        del generator
+
+    print(f"{'Configuration':<28}{'Chargement':>12}{'RTF':>10}{'WER':>10}")
+    for r in results:
+        wer = f"{r['wer']:.2%}" if "wer" in r else "-"
+        print(f"{r['config']:<28}{r['load_seconds']:>11.1f}s{r['real_time_factor']:>10.3f}{wer:>10}")
+    return results
+
+def bench_vad(video_path: str, reference_path: Optional[str], spec: str,
+              thresholds: List[float]) -> List[dict]:
+    """Durée de transcription et WER sans détection de parole puis avec chaque seuil"""
+    audio = VideoProcessor(video_path).load_audio()
+    duration = len(audio) / SAMPLE_RATE
+    reference = srt_words(pysrt.open(reference_path, encoding='utf-8')) if reference_path else None
+    config = parse_config_spec(spec)
+    # Modèle chargé avant la boucle pour que la première mesure (sans détection) ne le paie pas
+    generator = SubtitleGenerator(video_path, model=load_whisper_model(config), config=config)
+
+    results = []
+    for threshold in [None] + thresholds:
+        generator.vad = VadConfig(threshold_db=threshold) if threshold is not None else None
+        start = time.perf_counter()
+        segments = generator.transcribe_audio(audio)
+        elapsed = time.perf_counter() - start
+        stats = generator.instrumentation.stages()[-1]
+        result = {
+            "vad": "off" if threshold is None else f"{threshold:g} dB",
+            "transcribe_seconds": round(elapsed, 2),
+            "skipped_ratio": round(stats.get("skipped_seconds", 0.0) / duration, 4) if duration else 0.0,
+            "segments": len(segments),
+        }
+        if reference is not None:
+            result["wer"] = round(word_error_rate(reference, srt_words(generator.generate_srt(segments))), 4)
+        results.append(result)
+        logger.info(f"VAD {result['vad']}: {result}")
+
+    baseline = results[0]["transcribe_seconds"]
+    print(f"{'VAD':<10}{'Ignoré':>10}{'Durée':>10}{'Accélération':>14}{'Segments':>10}{'WER':>10}")
+    for r in results:
+        speedup = f"{baseline / r['transcribe_seconds']:.2f}x" if r["transcribe_seconds"] and baseline else "-"
+        wer = f"{r['wer']:.2%}" if "wer" in r else "-"
+        print(f"{r['vad']:<10}{r['skipped_ratio']:>10.1%}{r['transcribe_seconds']:>9.1f}s"
+              f"{speedup:>14}{r['segments']:>10}{wer:>10}")
+    return results
+
+def bench_batch(video_path: str, reference_path: Optional[str], spec: str,
+                batch_sizes: List[int]) -> List[dict]:
+    """Débit du décodage par lots face au décodage séquentiel de model.transcribe, avec le même modèle"""
+    audio = VideoProcessor(video_path).load_audio()
+    duration = len(audio) / SAMPLE_RATE
+    reference = srt_words(pysrt.open(reference_path, encoding='utf-8')) if reference_path else None
+    config = parse_config_spec(spec)
+    generator = SubtitleGenerator(video_path, model=load_whisper_model(config), config=config)
+
+    results = []
+    sequential_words = None
+    for batch_size in [1] + [size for size in batch_sizes if size > 1]:
+        generator.config.batch_size = batch_size
+        start = time.perf_counter()
+        segments = generator.transcribe_audio(audio)
+        elapsed = time.perf_counter() - start
+        words = srt_words(generator.generate_srt(segments))
+        sequential_words = sequential_words if sequential_words is not None else words
+        result = {
+            "batch_size": batch_size,
+            "transcribe_seconds": round(elapsed, 2),
+            "audio_seconds_per_second": round(duration / elapsed, 2) if elapsed else None,
+            # Écart de texte avec le décodage séquentiel (contexte des fenêtres précédentes absent)
+            "wer_vs_sequential": round(word_error_rate(sequential_words, words), 4),
+        }
+        if reference is not None:
+            result["wer"] = round(word_error_rate(reference, words), 4)
+        results.append(result)
+        logger.info(f"Lot de {batch_size}: {result}")
+
+    sequential = results[0]["transcribe_seconds"]
+    print(f"{'Lot':<8}{'Durée':>10}{'Débit (s/s)':>14}{'Accélération':>14}{'Écart':>10}{'WER':>10}")
+    for r in results:
+        label = "séq." if r["batch_size"] == 1 else str(r["batch_size"])
+        speedup = f"{sequential / r['transcribe_seconds']:.2f}x" if r["transcribe_seconds"] else "-"
+        wer = f"{r['wer']:.2%}" if "wer" in r else "-"
+        print(f"{label:<8}{r['transcribe_seconds']:>9.1f}s{r['audio_seconds_per_second'] or 0:>14.2f}"
+              f"{speedup:>14}{r['wer_vs_sequential']:>10.2%}{wer:>10}")
+    return results
+
+def synthetic_segments(duration: float, words_per_cue: int = 8, cue_seconds: float = 2.5) -> List[dict]:
+    """Segments Whisper factices couvrant duration secondes, avec horodatage des mots"""
+    segments = []
+    start = 0.5
+    while start + cue_seconds <= duration:
+        step = cue_seconds / words_per_cue
+        words = [
+            {"word": f" mot{len(segments)}_{k}", "start": start + k * step,
+             "end": start + (k + 0.8) * step, "probability": 0.9}
+            for k in range(words_per_cue)
+        ]
+        segments.append({"start": start, "end": start + cue_seconds, "words": words})
+        start += cue_seconds
+    return segments
+
+def burn_in_seconds(ass_file: str, metadata: VideoMetadata, duration: float) -> float:
+    """Durée d'incrustation d'un fichier ASS sur une vidéo synthétique (sortie ignorée)"""
+    command = [
+        "ffmpeg", "-v", "error",
+        "-f", "lavfi", "-i", f"color=c=gray:s={metadata.width}x{metadata.height}:r={metadata.fps}:d={duration}",
+        "-vf", f"ass={ass_file}",
+        "-c:v", "libx264", "-preset", "ultrafast",
+        "-f", "null", "-"
+    ]
+    start = time.perf_counter()
+    subprocess.run(command, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+def bench_ass_modes(duration: float, burn: bool) -> List[dict]:
+    """Comparaison des modes ASS mot par mot et karaoké : temps, taille, événements, incrustation"""
+    metadata = VideoMetadata(1920, 1080, 30.0)
+    # Aucun modèle n'est nécessaire pour la conversion
+    generator = SubtitleGenerator("synthetic.mp4", model=object())
+    subtitles = generator.generate_srt(synthetic_segments(duration))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("word", "karaoke"):
+            ass_file = os.path.join(tmp, f"{mode}.ass")
+            start = time.perf_counter()
+            generator.convert_to_ass(subtitles, metadata, ass_file, mode=mode)
+            elapsed = time.perf_counter() - start
+            with open(ass_file, encoding='utf-8') as f:
+                events = sum(1 for line in f if line.startswith("Dialogue:"))
+            result = {
+                "mode": mode,
+                "cues": len(subtitles),
+                "convert_seconds": round(elapsed, 4),
+                "file_bytes": os.path.getsize(ass_file),
+                "events": events,
+            }
+            if burn:
+                result["burn_seconds"] = round(burn_in_seconds(ass_file, metadata, duration), 2)
+            results.append(result)
+
+    print(f"{'Mode':<10}{'Conversion':>12}{'Taille':>14}{'Événements':>12}{'Incrustation':>14}")
+    for r in results:
+        burn_time = f"{r['burn_seconds']:.2f}s" if "burn_seconds" in r else "-"
+        print(f"{r['mode']:<10}{r['convert_seconds']:>11.3f}s{r['file_bytes'] / 1024:>11.0f} Ko"
+              f"{r['events']:>12}{burn_time:>14}")
+    return results
+
+def synthetic_subtitles(cues: int, cue_seconds: float = 2.5) -> pysrt.SubRipFile:
+    """Fichier SRT factice de cues sous-titres consécutifs"""
+    subtitles = pysrt.SubRipFile()
+    for i in range(cues):
+        start = pysrt.SubRipTime.from_ordinal(int(i * cue_seconds * 1000))
+        end = pysrt.SubRipTime.from_ordinal(int((i + 1) * cue_seconds * 1000) - 100)
+        subtitles.append(pysrt.SubRipItem(i + 1, start, end, f"Sous-titre synthétique numéro {i + 1}"))
+    return subtitles
+
+def bench_editor(cues: int, operations: int = 200) -> Optional[dict]:
+    """Ouverture, défilement et édition de l'éditeur sur un grand fichier synthétique"""
+    import tkinter as tk
+
+    subtitles = synthetic_subtitles(cues)
+
+    def timed(action) -> float:
+        start = time.perf_counter()
+        action()
+        editor.root.update()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        editor = SubtitleEditor(subtitles, lambda: None)
+    except tk.TclError as e:
+        logger.warning(f"Benchmark de l'éditeur ignoré (pas d'affichage disponible): {e}")
+        return None
+    editor.root.update()
+    open_time = time.perf_counter() - start
+
+    table = editor.table
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, cues, size=operations)
+    scroll_times = [timed(lambda: table.scroll_to(int(row))) for row in rows]
+    select_times = [timed(lambda: table.select(int(row))) for row in rows]
+
+    def edit(row: int):
+        sub = subtitles[row]
+        editor.update_cue(editor.cue_ids[row], sub.text + " (modifié)", sub.start, sub.end)
+
+    def delete(row: int):
+        editor.remove_cue(editor.cue_ids[row])
+
+    edit_times = [timed(lambda: edit(int(row))) for row in rows]
+    delete_times = [timed(lambda: delete(int(row) % len(subtitles))) for row in rows]
+    add_times = [timed(lambda: editor.append_cue("Ajout", subtitles[-1].end, subtitles[-1].end + 2000))
+                 for _ in rows]
+    editor.root.destroy()
+
+    result = {
+        "cues": cues,
+        "open_seconds": round(open_time, 3),
+        "visible_rows": len(table.slots),
+    }
+    for name, times in (("scroll", scroll_times), ("select", select_times), ("edit", edit_times),
+                        ("delete", delete_times), ("add", add_times)):
+        result[f"{name}_ms_mean"] = round(1000 * float(np.mean(times)), 3)
+        result[f"{name}_ms_max"] = round(1000 * float(np.max(times)), 3)
+
+    print(f"{cues} sous-titres, ouverture en {result['open_seconds']:.3f}s, "
+          f"{result['visible_rows']} lignes matérialisées")
+    print(f"{'Opération':<12}{'Moyenne':>12}{'Maximum':>12}")
+    for name in ("scroll", "select", "edit", "delete", "add"):
+        print(f"{name:<12}{result[name + '_ms_mean']:>10.2f}ms{result[name + '_ms_max']:>10.2f}ms")
+    return result
+
+class StubTranscriber:
+    """Remplaçant déterministe du modèle Whisper (aucun réseau ni GPU)
+
+    Produit des segments synthétiques couvrant toute la durée de l'audio,
+    avec horodatage des mots, pour mesurer les étapes en aval.
+    """
+
+    def transcribe(self, audio: np.ndarray, **kwargs) -> dict:
+        return {"segments": synthetic_segments(len(audio) / SAMPLE_RATE)}
+
+def whisper_model_cached(model_name: str) -> bool:
+    """Le modèle est-il déjà téléchargé dans le cache local de Whisper ?"""
+    cache_root = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.exists(os.path.join(cache_root, "whisper", f"{model_name}.pt"))
+
+def make_test_media(path: str, duration: float, width: int, height: int, fps: int = 30) -> str:
+    """Vidéo synthétique lavfi : mire de barres, tonalité sinusoïdale et bruit"""
+    if os.path.exists(path):
+        return path
+    command = [
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"smptebars=s={width}x{height}:r={fps}:d={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={duration}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.05:sample_rate=44100:duration={duration}",
+        "-filter_complex", "[1:a][2:a]amix=inputs=2[a]",
+        "-map", "0:v", "-map", "[a]",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest",
+        path
+    ]
+    subprocess.run(command, check=True, capture_output=True)
+    return path
+
+def bench_pipeline_run(video_path: str, metadata: VideoMetadata, work_dir: str,
+                       transcriber: str, render: bool) -> Dict[str, float]:
+    """Durée de chaque étape du pipeline pour une vidéo et un transcripteur"""
+    stages = {}
+
+    def timed(stage: str, action):
+        start = time.perf_counter()
+        value = action()
+        stages[stage] = round(time.perf_counter() - start, 4)
+        return value
+
+    if transcriber == "stub":
+        generator = SubtitleGenerator(video_path, model=StubTranscriber(),
+                                      config=InferenceConfig(device="cpu"))
+    else:
+        config = InferenceConfig(model_name=transcriber, device="cpu")
+        generator = timed("load_model", lambda: SubtitleGenerator(
+            video_path, model=load_whisper_model(config), config=config))
+    processor = generator.video_processor
+
+    if not timed("extract_audio", lambda: processor.extract_audio(os.path.join(work_dir, "audio.wav"))):
+        raise RuntimeError("Échec de l'extraction audio")
+    audio = timed("load_audio", processor.load_audio)
+    segments = timed("transcribe", lambda: generator.transcribe_audio(audio))
+    subtitles = timed("generate_srt", lambda: generator.generate_srt(segments))
+    ass_file = timed("convert_to_ass", lambda: generator.convert_to_ass(
+        subtitles, metadata, os.path.join(work_dir, "subtitles.ass")))
+    if render:
+        output_path = os.path.join(work_dir, "output.mp4")
+        if not timed("overlay_subtitles", lambda: processor.overlay_subtitles(ass_file, output_path)):
+            raise RuntimeError("Échec de la superposition des sous-titres")
+    return stages
+
+def bench_pipeline(durations: List[float], resolutions: List[str], media_dir: Optional[str],
+                   repeat: int = 1, render: bool = True, use_model: bool = True) -> List[dict]:
+    """Mesure de chaque étape sur des médias synthétiques, avec le transcripteur factice
+    et, s'il est déjà en cache, le modèle tiny"""
+    transcribers = ["stub"]
+    if use_model and whisper_model_cached("tiny"):
+        transcribers.append("tiny")
+    elif use_model:
+        logger.info("Modèle tiny absent du cache local : seul le transcripteur factice est mesuré")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        media_dir = media_dir or tmp
+        os.makedirs(media_dir, exist_ok=True)
+        for duration in durations:
+            for resolution in resolutions:
+                width, height = (int(v) for v in resolution.split("x"))
+                media = f"{duration:g}s_{resolution}"
+                video_path = make_test_media(os.path.join(media_dir, f"{media}.mp4"), duration, width, height)
+                metadata = VideoMetadata(width, height, 30.0)
+                for transcriber in transcribers:
+                    runs = []
+                    for _ in range(repeat):
+                        with tempfile.TemporaryDirectory(dir=tmp) as work_dir:
+                            runs.append(bench_pipeline_run(video_path, metadata, work_dir, transcriber, render))
+                    # Meilleure mesure sur les répétitions, moins sensible au bruit
+                    stages = {stage: min(run[stage] for run in runs) for stage in runs[0]}
+                    results.append({"media": media, "transcriber": transcriber, "stages": stages})
+                    logger.info(f"{media} / {transcriber}: {stages}")
+
+    stage_names = list(dict.fromkeys(stage for r in results for stage in r["stages"]))
+    print(f"{'Média':<18}{'Transcripteur':<14}" + "".join(f"{name:>18}" for name in stage_names))
+    for r in results:
+        cells = "".join(f"{r['stages'][name]:>17.3f}s" if name in r["stages"] else f"{'-':>18}"
+                        for name in stage_names)
+        print(f"{r['media']:<18}{r['transcriber']:<14}{cells}")
+    return results
+
+def compare_with_baseline(results: List[dict], baseline: List[dict], tolerance: float = 0.2,
+                          min_seconds: float = 0.05) -> List[dict]:
+    """Étapes plus lentes que la référence de plus de tolerance (et de min_seconds)"""
+    reference = {(r["media"], r["transcriber"], stage): seconds
+                 for r in baseline for stage, seconds in r["stages"].items()}
+    regressions = []
+    for r in results:
+        for stage, seconds in r["stages"].items():
+            before = reference.get((r["media"], r["transcriber"], stage))
+            if before is None:
+                continue
+            if seconds > before * (1 + tolerance) and seconds - before > min_seconds:
+                regressions.append({"media": r["media"], "transcriber": r["transcriber"], "stage": stage,
+                                    "baseline": before, "current": seconds,
+                                    "ratio": round(seconds / before, 2) if before else None})
+
+    for reg in regressions:
+        logger.warning(f"Régression {reg['media']} / {reg['transcriber']} / {reg['stage']}: "
+                       f"{reg['baseline']:.3f}s -> {reg['current']:.3f}s")
+    if not regressions:
+        logger.info("Aucune régression par rapport à la référence.")
+    return regressions
+
+def make_test_audio(path: str, duration: float) -> str:
+    """Enregistrement audio synthétique (tonalité et bruit), compressé en FLAC"""
+    if os.path.exists(path):
+        return path
+    command = [
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate={SAMPLE_RATE}:duration={duration}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.05:sample_rate={SAMPLE_RATE}:duration={duration}",
+        "-filter_complex", "[0:a][1:a]amix=inputs=2",
+        "-c:a", "flac",
+        path
+    ]
+    subprocess.run(command, check=True, capture_output=True)
+    return path
+
+def _memory_run(audio_path: str, mode: str, window: float, work_dir: str) -> dict:
+    """Transcription (factice) et écriture SRT/ASS dans un processus neuf, pour un pic RSS isolé"""
+    start_rss = _peak_rss_mb()
+    generator = SubtitleGenerator(audio_path, model=StubTranscriber())
+    metadata = VideoMetadata(1920, 1080, 30.0)
+    srt_path = os.path.join(work_dir, "subtitles.srt")
+    ass_path = os.path.join(work_dir, "subtitles.ass")
+    if mode == "stream":
+        audio = generator.video_processor.decode_audio_file(os.path.join(work_dir, "audio.f32"))
+        generator.transcribe_to_files(audio, srt_path, ass_path, metadata, window_seconds=window,
+                                      words_path=os.path.join(work_dir, TRANSCRIPT_FILE))
+    else:
+        subtitles = generator.generate_srt(generator.transcribe_audio(generator.video_processor.load_audio()))
+        subtitles.save(srt_path, encoding='utf-8')
+        generator.convert_to_ass(subtitles, metadata, ass_path)
+    return {"start_rss_mb": start_rss, "peak_rss_mb": _peak_rss_mb()}
+
+def bench_memory(durations: List[float], window: float, media_dir: Optional[str],
+                 compare_full: bool = True) -> List[dict]:
+    """Pic de mémoire résidente selon la durée, en mode fenêtré (et en mode complet pour comparaison)"""
+    if _peak_rss_mb() is None:
+        logger.warning("Mesure du pic mémoire indisponible sur cette plateforme")
+        return []
+    modes = ["stream", "full"] if compare_full else ["stream"]
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        media_dir = media_dir or tmp
+        os.makedirs(media_dir, exist_ok=True)
+        for duration in durations:
+            audio_path = make_test_audio(os.path.join(media_dir, f"{duration:g}s.flac"), duration)
+            for mode in modes:
+                with tempfile.TemporaryDirectory(dir=tmp) as work_dir, context.Pool(1) as pool:
+                    run = pool.apply(_memory_run, (audio_path, mode, window, work_dir))
+                results.append({"duration": duration, "mode": mode, **run})
+                logger.info(f"{duration:g}s / {mode}: pic {run['peak_rss_mb']:.0f} Mo")
+
+    print(f"{'Durée':>10}{'Mode':>8}{'RSS initial':>14}{'Pic RSS':>12}")
+    for r in results:
+        print(f"{r['duration']:>9g}s{r['mode']:>8}{r['start_rss_mb']:>11.0f} Mo{r['peak_rss_mb']:>9.0f} Mo")
+    return results
+
+def check_memory_bounds(results: List[dict], max_growth: float, max_rss: Optional[float] = None) -> List[str]:
+    """Le pic du mode fenêtré ne doit pas croître avec la durée (ni dépasser max_rss)"""
+    stream = sorted((r for r in results if r["mode"] == "stream"), key=lambda r: r["duration"])
+    failures = []
+    if len(stream) >= 2:
+        growth = stream[-1]["peak_rss_mb"] - stream[0]["peak_rss_mb"]
+        if growth > max_growth:
+            failures.append(f"pic mémoire en hausse de {growth:.0f} Mo entre {stream[0]['duration']:g}s "
+                            f"et {stream[-1]['duration']:g}s (toléré : {max_growth:g} Mo)")
+    if max_rss is not None:
+        failures.extend(f"pic de {r['peak_rss_mb']:.0f} Mo pour {r['duration']:g}s (maximum : {max_rss:g} Mo)"
+                        for r in stream if r["peak_rss_mb"] > max_rss)
+
+    for failure in failures:
+        logger.warning(f"Mémoire non bornée : {failure}")
+    if not failures:
+        logger.info("Pic mémoire du mode fenêtré indépendant de la durée.")
+    return failures
+
+# Modules dont le chargement coûte plusieurs secondes : seule la transcription en a besoin
+HEAVY_MODULES = ("torch", "whisper")
+
+STARTUP_CASES = [
+    ("python", "pass"),
+    ("import", "import PikiSubCreator"),
+    ("render", "import PikiSubCreator as P; P.parse_args(['render', 'v.mp4', 's.srt']); P.SubtitleGenerator('v.mp4')"),
+    ("torch+whisper", "import torch, whisper"),
+]
+
+def _startup_run(code: str) -> dict:
+    """Durée d'un interpréteur neuf exécutant code, et modules lourds qu'il a chargés"""
+    probe = f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return {"seconds": time.perf_counter() - start, "heavy_modules": output.split()}
+
+def bench_startup(repeat: int = 5) -> List[dict]:
+    """Temps de démarrage (meilleur de repeat) : import du module et chemin de rendu sans modèle,
+    comparés à l'interpréteur seul et au coût évité de torch et whisper"""
+    results = []
+    for name, code in STARTUP_CASES:
+        runs = [_startup_run(code) for _ in range(repeat)]
+        results.append({"case": name, "seconds": round(min(r["seconds"] for r in runs), 3),
+                        "heavy_modules": runs[0]["heavy_modules"]})
+
+    print(f"{'Cas':<16}{'Durée':>10}  Modules lourds")
+    for r in results:
+        print(f"{r['case']:<16}{r['seconds']:>9.3f}s  {' '.join(r['heavy_modules']) or '-'}")
+    return results
+
+def check_startup(results: List[dict], max_import: float) -> List[str]:
+    """L'import et le rendu sans modèle ne doivent ni charger torch/whisper ni dépasser max_import secondes"""
+    failures = []
+    for r in results:
+        if r["case"] not in ("import", "render"):
+            continue
+        if r["heavy_modules"]:
+            failures.append(f"{r['case']} charge {', '.join(r['heavy_modules'])}")
+        if r["seconds"] > max_import:
+            failures.append(f"{r['case']} en {r['seconds']:.2f}s (maximum : {max_import:g}s)")
+
+    for failure in failures:
+        logger.warning(f"Démarrage trop lent : {failure}")
+    return failures
+
+def synthetic_timeline(seconds: float, vocabulary: List[str], rng: np.random.Generator,
+                       words_per_second: float = 2.5, words_per_segment: int = 10) -> WordTimeline:
+    """Transcript synthétique : mots tirés selon une loi de Zipf, comme dans une langue naturelle"""
+    n = int(seconds * words_per_second)
+    starts = np.sort(rng.uniform(0.0, seconds, n))
+    ends = starts + 0.2
+    used, word_ids = np.unique((rng.zipf(1.3, n) - 1) % len(vocabulary), return_inverse=True)
+    offsets = np.append(np.arange(0, n, words_per_segment), n)
+    return WordTimeline(starts, ends, np.ones(n, dtype=np.float32), word_ids.astype(np.uint32),
+                        [vocabulary[i] for i in used], offsets, starts[offsets[:-1]], ends[offsets[1:] - 1])
+
+def bench_search(hours: float, videos: int, vocabulary_size: int = 30000, repeat: int = 20,
+                 limit: int = 100) -> dict:
+    """Construction de l'index des transcripts d'une bibliothèque synthétique et latence des recherches
+    (limit premières occurrences, comme la commande search)"""
+    rng = np.random.default_rng(0)
+    vocabulary = [f" mot{i}" for i in range(vocabulary_size)]
+    with tempfile.TemporaryDirectory() as tmp:
+        library = os.path.join(tmp, "library")
+        words = 0
+        for i in range(videos):
+            timeline = synthetic_timeline(hours * 3600 / videos, vocabulary, rng)
+            os.makedirs(os.path.join(library, f"video_{i:05d}"))
+            timeline.save(os.path.join(library, f"video_{i:05d}", TRANSCRIPT_FILE), source=f"video_{i:05d}.mp4")
+            words += len(timeline)
+        phrase = " ".join(timeline.word(k) for k in range(len(timeline) // 2, len(timeline) // 2 + 3))
+
+        with TranscriptIndex(os.path.join(tmp, "index.sqlite")) as index:
+            start = time.perf_counter()
+            index.sync(library)
+            build_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            index.sync(library)
+            resync_seconds = time.perf_counter() - start
+            result = {"hours": hours, "videos": videos, "words": words,
+                      "index_mb": round(index.stats()["bytes"] / 1024 ** 2, 1),
+                      "build_seconds": round(build_seconds, 2), "resync_seconds": round(resync_seconds, 3),
+                      "queries": []}
+
+            queries = [("mot fréquent", vocabulary[0]), ("mot moyen", vocabulary[100]),
+                       ("mot rare", vocabulary[10000]), ("expression", phrase)]
+            for name, query in queries:
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    index.search(query, limit=limit)
+                    times.append(time.perf_counter() - start)
+                result["queries"].append({"query": name, "hits": len(index.search(query, limit=None)),
+                                          "median_ms": round(1000 * float(np.median(times)), 2)})
+
+            start = time.perf_counter()
+            index.remove(os.path.join(library, "video_00000", TRANSCRIPT_FILE))
+            result["remove_seconds"] = round(time.perf_counter() - start, 3)
+
+    print(f"{result['hours']:g} h, {result['videos']} vidéos, {result['words']} mots : index de "
+          f"{result['index_mb']:.1f} Mo construit en {result['build_seconds']:.1f}s "
+          f"(resynchronisation {result['resync_seconds']:.2f}s, retrait d'une vidéo {result['remove_seconds']:.3f}s)")
+    print(f"{'Recherche':<16}{'Occurrences':>12}{'Médiane (' + str(limit) + ' premières)':>26}")
+    for q in result["queries"]:
+        print(f"{q['query']:<16}{q['hits']:>12}{q['median_ms']:>24.2f}ms")
+    return result
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmarks du générateur de sous-titres")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    inference = subparsers.add_parser("inference", help="Vitesse et qualité par configuration d'inférence")
+    inference.add_argument("video", help="Vidéo de test")
+    inference.add_argument("--reference", help="SRT de référence pour le calcul du WER")
+    inference.add_argument("--config", action="append", dest="configs", default=[],
+                           help="Configuration modele[+fp16|fp32][+int8][+cpu|cuda][+t<threads>][+b<lot>][+beam<faisceau>] (répétable)")
+    inference.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    ass_modes = subparsers.add_parser("ass-modes", help="Comparaison des modes d'émission ASS")
+    ass_modes.add_argument("--duration", type=float, default=300.0, help="Durée des sous-titres synthétiques (s)")
+    ass_modes.add_argument("--burn", action="store_true", help="Mesurer aussi l'incrustation avec ffmpeg")
+    ass_modes.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    editor = subparsers.add_parser("editor", help="Réactivité de l'éditeur sur un grand fichier")
+    editor.add_argument("--cues", type=int, default=50000, help="Nombre de sous-titres synthétiques")
+    editor.add_argument("--operations", type=int, default=200, help="Nombre d'opérations par type")
+    editor.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    pipeline = subparsers.add_parser("pipeline", help="Durée de chaque étape sur des médias synthétiques")
+    pipeline.add_argument("--durations", type=float, nargs="+", default=[30.0, 120.0],
+                          help="Durées des vidéos synthétiques (s)")
+    pipeline.add_argument("--resolutions", nargs="+", default=["640x360", "1920x1080"],
+                          help="Résolutions des vidéos synthétiques (LxH)")
+    pipeline.add_argument("--media-dir", help="Dossier où conserver les médias générés (réutilisés)")
+    pipeline.add_argument("--repeat", type=int, default=1, help="Répétitions (meilleure mesure conservée)")
+    pipeline.add_argument("--no-render", action="store_true", help="Ne pas mesurer l'incrustation")
+    pipeline.add_argument("--stub-only", action="store_true",
+                          help="Ne pas utiliser le modèle tiny même s'il est en cache")
+    pipeline.add_argument("--baseline", help="Résultats de référence (JSON) pour détecter les régressions")
+    pipeline.add_argument("--tolerance", type=float, default=0.2,
+                          help="Ralentissement relatif toléré par rapport à la référence")
+    pipeline.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    vad = subparsers.add_parser("vad", help="Gain de la détection de parole avant transcription")
+    vad.add_argument("video", help="Vidéo de test (idéalement avec des silences ou de la musique)")
+    vad.add_argument("--reference", help="SRT de référence pour le calcul du WER")
+    vad.add_argument("--config", default="small", help="Configuration d'inférence (voir la commande inference)")
+    vad.add_argument("--thresholds", type=float, nargs="+", default=[VadConfig.threshold_db],
+                     help="Seuils de détection à comparer (dB au-dessus du bruit de fond)")
+    vad.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    batch = subparsers.add_parser("batch", help="Débit du décodage par lots face au décodage séquentiel")
+    batch.add_argument("video", help="Vidéo de test")
+    batch.add_argument("--reference", help="SRT de référence pour le calcul du WER")
+    batch.add_argument("--config", default="small", help="Configuration d'inférence (voir la commande inference)")
+    batch.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16], help="Tailles de lot à comparer")
+    batch.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    memory = subparsers.add_parser("memory", help="Pic mémoire du mode fenêtré selon la durée de l'audio")
+    memory.add_argument("--durations", type=float, nargs="+", default=[600.0, 3600.0],
+                        help="Durées des enregistrements synthétiques (s)")
+    memory.add_argument("--window", type=float, default=120.0, help="Taille des fenêtres de transcription (s)")
+    memory.add_argument("--media-dir", help="Dossier où conserver les médias générés (réutilisés)")
+    memory.add_argument("--stream-only", action="store_true", help="Ne pas mesurer le mode complet en mémoire")
+    memory.add_argument("--max-growth", type=float, default=64.0,
+                        help="Hausse du pic mémoire tolérée entre la plus courte et la plus longue durée (Mo)")
+    memory.add_argument("--max-rss", type=float, help="Pic mémoire maximal du mode fenêtré (Mo)")
+    memory.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    startup = subparsers.add_parser("startup", help="Temps de démarrage sans chargement du modèle")
+    startup.add_argument("--repeat", type=int, default=5, help="Répétitions (meilleure mesure conservée)")
+    startup.add_argument("--max-import", type=float, default=1.0,
+                         help="Durée maximale de l'import et du chemin de rendu (s)")
+    startup.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    search = subparsers.add_parser("search", help="Index des transcripts : construction et latence des recherches")
+    search.add_argument("--hours", type=float, default=200.0, help="Durée totale de la bibliothèque synthétique (h)")
+    search.add_argument("--videos", type=int, default=400, help="Nombre de vidéos")
+    search.add_argument("--vocabulary", type=int, default=30000, help="Nombre de mots distincts")
+    search.add_argument("--limit", type=int, default=100, help="Occurrences demandées par recherche")
+    search.add_argument("--json", help="Fichier JSON de sortie des résultats")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "inference":
+        results = bench_inference(args.video, args.reference, args.configs or ["large-v2"])
+    elif args.command == "ass-modes":
+        results = bench_ass_modes(args.duration, args.burn)
+    elif args.command == "editor":
+        results = bench_editor(args.cues, args.operations)
+    elif args.command == "pipeline":
+        results = bench_pipeline(args.durations, args.resolutions, args.media_dir, args.repeat,
+                                 render=not args.no_render, use_model=not args.stub_only)
+    elif args.command == "vad":
+        results = bench_vad(args.video, args.reference, args.config, args.thresholds)
+    elif args.command == "batch":
+        results = bench_batch(args.video, args.reference, args.config, args.batch_sizes)
+    elif args.command == "memory":
+        results = bench_memory(args.durations, args.window, args.media_dir, not args.stream_only)
+    elif args.command == "startup":
+        results = bench_startup(args.repeat)
+    elif args.command == "search":
+        results = bench_search(args.hours, args.videos, args.vocabulary, limit=args.limit)
+
+    if args.json:
+        with open(args.json, "w", encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.command == "pipeline" and args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare_with_baseline(results, baseline, args.tolerance):
+            sys.exit(1)
+
+    if args.command == "memory" and check_memory_bounds(results, args.max_growth, args.max_rss):
+        sys.exit(1)
+
+    if args.command == "startup" and check_startup(results, args.max_import):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
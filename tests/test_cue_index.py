@@ -0,0 +1,73 @@
+import numpy as np
+import pysrt
+
+from PikiSubCreator import CueIndex
+
+
+def subtitles(spans):
+    return pysrt.SubRipFile([
+        pysrt.SubRipItem(i + 1, pysrt.SubRipTime.from_ordinal(start), pysrt.SubRipTime.from_ordinal(end), f"cue {i}")
+        for i, (start, end) in enumerate(spans)
+    ])
+
+
+def brute_between(spans, start, end):
+    return sorted((i for i, (s, e) in spans.items() if s < end and e > start), key=lambda i: (spans[i][0], i))
+
+
+def test_queries_match_brute_force():
+    rng = np.random.default_rng(0)
+    starts = np.sort(rng.integers(0, 600_000, 400))
+    spans = {i: (int(s), int(s + rng.integers(1, 8000))) for i, s in enumerate(starts)}
+    index = CueIndex.from_subtitles(subtitles([spans[i] for i in range(len(spans))]))
+    for start in rng.integers(0, 610_000, 200).tolist():
+        end = start + int(rng.integers(1, 20_000))
+        assert index.between(start / 1000, end / 1000) == brute_between(spans, start, end)
+        assert index.at(start / 1000) == brute_between(spans, start, start + 1)
+
+
+def test_add_remove_update_keep_index_consistent():
+    index = CueIndex.from_subtitles(subtitles([(0, 1000), (2000, 3000)]))
+    index.add(2, 500, 2500)
+    assert index.at(0.7) == [0, 2]
+    index.update(2, 4000, 5000)
+    assert index.at(0.7) == [0]
+    assert index.between(3.5, 6.0) == [2]
+    index.remove(0)
+    assert index.seek(0.1) == 1
+    assert len(index) == 2
+
+
+def test_add_many_matches_successive_adds():
+    rng = np.random.default_rng(1)
+    one, bulk = CueIndex(), CueIndex()
+    next_id = 0
+    for _ in range(20):
+        count = int(rng.integers(0, 30))
+        ids = list(range(next_id, next_id + count))
+        next_id += count
+        starts = rng.integers(0, 100, count).tolist()
+        ends = [start + int(rng.integers(-5, 40)) for start in starts]
+        for cue_id, start, end in zip(ids, starts, ends):
+            one.add(cue_id, start, end)
+        bulk.add_many(ids, starts, ends)
+    for name in ("starts", "ends", "ids", "reach"):
+        assert np.array_equal(getattr(one, name), getattr(bulk, name)), name
+    assert one.spans == bulk.spans
+
+
+def test_display_ends_truncate_at_next_start():
+    index = CueIndex.from_subtitles(subtitles([(0, 3000), (2000, 4000), (5000, 6000)]))
+    ids, ends = index.display_ends()
+    assert ids.tolist() == [0, 1, 2]
+    assert ends.tolist() == [2000, 4000, 6000]
+
+
+def test_validate_reports_each_problem():
+    index = CueIndex.from_subtitles(subtitles([(0, 3000), (2000, 4000), (20_000, 20_000), (10_000, 11_000)]))
+    report = index.validate(max_gap=5.0)
+    assert report.overlaps == [(0, 1)]
+    assert report.invalid == [2]
+    assert report.out_of_order == [3]
+    assert [(a, b) for a, b, _ in report.gaps] == [(1, 3), (3, 2)]
+    assert not report.ok
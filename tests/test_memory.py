@@ -0,0 +1,49 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks import StubTranscriber
+from PikiSubCreator import (SAMPLE_RATE, TRANSCRIPT_FILE, RawAudioFile, SubtitleGenerator, VideoMetadata,
+                            WordTimeline, _peak_rss_mb)
+
+# Même tolérance que benchmarks.py memory --max-growth
+MAX_GROWTH_MB = 64.0
+
+
+def write_raw_audio(path, seconds):
+    """PCM brut synthétique : bruit coupé d'une seconde de silence par minute, écrit par blocs"""
+    rng = np.random.default_rng(0)
+    with open(path, "wb") as f:
+        for start in range(0, int(seconds), 60):
+            block = rng.normal(0.0, 0.1, SAMPLE_RATE * min(60, int(seconds) - start)).astype(np.float32)
+            block[-SAMPLE_RATE:] = 0.0
+            block.tofile(f)
+    return path
+
+
+def stream_peak_rss(audio_path, work_dir, window):
+    """Transcription fenêtrée (modèle factice) dans un processus neuf ; renvoie le pic RSS (Mo)"""
+    generator = SubtitleGenerator(audio_path, model=StubTranscriber())
+    generator.transcribe_to_files(
+        RawAudioFile(audio_path), os.path.join(work_dir, "subtitles.srt"), os.path.join(work_dir, "subtitles.ass"),
+        VideoMetadata(1920, 1080, 30.0), window_seconds=window, words_path=os.path.join(work_dir, TRANSCRIPT_FILE))
+    return _peak_rss_mb()
+
+
+@pytest.mark.skipif(_peak_rss_mb() is None, reason="pic de mémoire indisponible sur cette plateforme")
+def test_stream_peak_rss_does_not_grow_with_duration(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    peaks, words = {}, {}
+    for seconds in (600, 3600):
+        work_dir = tmp_path / f"{seconds}s"
+        work_dir.mkdir()
+        audio_path = write_raw_audio(str(work_dir / "audio.f32"), seconds)
+        with context.Pool(1) as pool:
+            peaks[seconds] = pool.apply(stream_peak_rss, (audio_path, str(work_dir), 120.0))
+        os.remove(audio_path)
+        words[seconds] = len(WordTimeline.load(str(work_dir / TRANSCRIPT_FILE)))
+
+    assert words[3600] > 5 * words[600]
+    assert peaks[3600] - peaks[600] <= MAX_GROWTH_MB, peaks
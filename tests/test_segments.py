@@ -0,0 +1,77 @@
+import subprocess
+import types
+
+from PikiSubCreator import MediaProbe, SubtitleGenerator, choose_segment_bounds, shift_ass_file
+
+HEADER = "[Script Info]\nPlayResX: 1920\n\n[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+
+
+def write_ass(path, events):
+    with open(path, "w", encoding='utf-8') as f:
+        f.write(HEADER)
+        f.writelines(f"Dialogue: 0,{start},{end},Karaoke,,0,0,0,,{text}\n" for start, end, text in events)
+
+
+def dialogues(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip("\n").split(":", 1)[1].split(",", 9) for line in f if line.startswith("Dialogue:")]
+
+
+def test_shift_keeps_visible_events_and_rebases_times(tmp_path):
+    source, shifted = tmp_path / "full.ass", tmp_path / "window.ass"
+    write_ass(source, [
+        ("0:00:01.00", "0:00:02.00", "avant"),
+        ("0:00:09.00", "0:00:11.00", "à cheval"),
+        ("0:00:12.50", "0:00:13.00", "dedans"),
+        ("0:00:20.00", "0:00:21.00", "après"),
+    ])
+    assert shift_ass_file(str(source), str(shifted), 10.0, 20.0) == 2
+    events = dialogues(shifted)
+    assert [(e[1], e[2], e[9]) for e in events] == [
+        ("0:00:00.00", "0:00:01.00", "à cheval"),
+        ("0:00:02.50", "0:00:03.00", "dedans"),
+    ]
+    assert shifted.read_text(encoding='utf-8').startswith(HEADER)
+
+
+def test_shift_trims_karaoke_and_transform_times(tmp_path):
+    source, shifted = tmp_path / "full.ass", tmp_path / "window.ass"
+    write_ass(source, [(
+        "0:00:09.00", "0:00:12.00",
+        "{\\k50}un {\\k150}deux "
+        "{\\3c&H000000&\\bord2\\t(500,501,\\3c&H0000FF&\\bord15)\\t(2000,2001,\\3c&H000000&\\bord2)}trois"
+    )])
+    shift_ass_file(str(source), str(shifted), 10.0, 20.0)
+    text = dialogues(shifted)[0][9]
+    # Une seconde déjà écoulée : 50 + 50 centisecondes retirées des balises \k, 1000 ms des \t
+    assert text.startswith("{\\k0}un {\\k100}deux ")
+    assert "\\t(0,1,\\3c&H0000FF&\\bord15)\\t(1000,1001," in text
+
+
+def test_segment_bounds_follow_keyframes():
+    keyframes = [0.0, 2.0, 4.1, 6.0, 7.9, 10.0]
+    assert choose_segment_bounds(keyframes, 12.0, 3) == [0.0, 4.1, 7.9, 12.0]
+
+
+def test_segment_bounds_without_keyframes_cover_whole_video():
+    assert choose_segment_bounds([0.0], 30.0, 4) == [0.0, 30.0]
+    # Images clés épuisées avant la fin : le dernier segment va jusqu'au bout
+    assert choose_segment_bounds([0.0, 1.0, 1.5], 30.0, 4) == [0.0, 1.5, 30.0]
+
+
+def test_keyframes_are_relative_to_container_start(monkeypatch):
+    # Sortie ffprobe d'un MPEG-TS : paquets (pts_time,flags) puis start_time du format
+    output = "1.400000,K__\n1.440000,___\n3.400000,K__\n5.400000,K__\n1.400000\n"
+    monkeypatch.setattr(subprocess, "check_output", lambda *args, **kwargs: output)
+    assert MediaProbe(cache_dir=None)._read_keyframes("video.ts") == [0.0, 2.0, 4.0]
+
+
+def test_karaoke_events_are_yielded_per_group():
+    generator = SubtitleGenerator("video.mp4", model=object())
+    words = ["un", "deux", "trois", "quatre", "cinq"]
+    events = generator.karaoke_events(words, [(i * 0.5, i * 0.5 + 0.5) for i in range(len(words))])
+    assert isinstance(events, types.GeneratorType)
+    first = next(events)
+    assert first.startswith("Dialogue: 0,0:00:00.00,0:00:02.00,Karaoke,")
+    assert "\\t(0,1,\\3c&H0000FF&\\bord15)\\t(500,501,\\3c&H000000&\\bord2)}un" in first
+    assert [event.rsplit("}", 1)[1] for event in events] == ["cinq\n"]
@@ -0,0 +1,43 @@
+from PikiSubCreator import SegmentStitcher, stitch_chunk_segments
+
+
+def word(text, start, end):
+    return {"word": text, "start": start, "end": end, "probability": 0.9}
+
+
+def segment(*words):
+    return {"start": words[0]["start"], "end": words[-1]["end"],
+            "text": "".join(w["word"] for w in words), "words": list(words)}
+
+
+def test_duplicate_word_at_boundary_is_dropped():
+    first = [segment(word(" Bonjour", 0.0, 0.5), word(" à", 0.5, 0.7), word(" tous", 0.7, 1.2))]
+    # Le chunk suivant redémarre un peu avant la frontière et répète « tous »
+    second = [segment(word(" tous.", 1.0, 1.2), word(" Merci", 1.3, 1.6))]
+    stitched = stitch_chunk_segments([first, second])
+    words = [w["word"] for s in stitched for w in s["words"]]
+    assert words == [" Bonjour", " à", " tous", " Merci"]
+    assert stitched[1]["text"] == " Merci"
+    assert stitched[1]["start"] == 1.3
+
+
+def test_timestamps_become_monotonic_and_ids_continue():
+    stitcher = SegmentStitcher()
+    stitcher.add([segment(word(" un", 0.0, 1.0), word(" deux", 1.0, 2.0))])
+    later = stitcher.add([segment(word(" trois", 1.5, 1.8), word(" quatre", 2.5, 3.0))])
+    words = later[0]["words"]
+    assert words[0]["start"] == 2.0 and words[0]["end"] == 2.0
+    assert all(w["end"] >= w["start"] for w in words)
+    assert later[0]["id"] == 1
+
+
+def test_segment_reduced_to_duplicates_is_removed():
+    stitcher = SegmentStitcher()
+    stitcher.add([segment(word(" fin", 0.0, 1.0))])
+    assert stitcher.add([segment(word(" Fin", 0.8, 1.0))]) == []
+    assert stitcher.count == 1
+
+
+def test_segments_without_words_are_kept():
+    stitched = SegmentStitcher().add([{"start": 0.0, "end": 1.0, "text": " musique"}])
+    assert stitched == [{"start": 0.0, "end": 1.0, "text": " musique", "id": 0}]
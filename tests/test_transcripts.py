@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+import pytest
+
+from PikiSubCreator import TranscriptIndex, TranscriptWriter, WordTimeline, _normalize_word
+
+VOCABULARY = ["le", "chat", "dort", "sur", "la", "table", "Chat,", "mange", "souris"]
+
+
+def random_segments(rng, count, offset=0.0):
+    segments, time = [], offset
+    for _ in range(count):
+        words = []
+        for _ in range(int(rng.integers(1, 8))):
+            start = time + float(rng.random()) * 0.1
+            end = start + 0.05 + float(rng.random()) * 0.4
+            words.append({"word": " " + VOCABULARY[int(rng.integers(len(VOCABULARY)))],
+                          "start": round(start, 3), "end": round(end, 3),
+                          "probability": float(rng.random())})
+            time = end
+        segments.append({"start": words[0]["start"], "end": words[-1]["end"], "words": words})
+        time += float(rng.random())
+    return segments
+
+
+def test_from_segments_keeps_columns_ordered():
+    timeline = WordTimeline.from_segments([{"start": 0.0, "end": 2.0, "words": [
+        {"word": " a", "start": 1.0, "end": 1.2},
+        {"word": " b", "start": 0.5, "end": 0.9},
+    ]}])
+    assert timeline.starts.tolist() == [1.0, 1.0]
+    assert np.all(timeline.ends >= timeline.starts)
+
+
+def test_save_load_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    timeline = WordTimeline.from_segments(random_segments(rng, 50))
+    path = timeline.save(str(tmp_path / "words.npz"), source="video.mp4")
+    loaded = WordTimeline.load(path)
+    assert loaded.source == os.path.abspath("video.mp4")
+    assert loaded.vocabulary == timeline.vocabulary
+    assert np.array_equal(loaded.word_ids, timeline.word_ids)
+    assert np.array_equal(loaded.segment_offsets, timeline.segment_offsets)
+    # Horodatages stockés en millisecondes entières, probabilités en float16
+    assert np.abs(loaded.starts - timeline.starts).max() <= 0.0005
+    assert np.abs(loaded.ends - timeline.ends).max() <= 0.0005
+    assert np.abs(loaded.probabilities - timeline.probabilities).max() < 1e-3
+    assert not [name for name in os.listdir(tmp_path) if name != "words.npz"]
+
+
+def test_transcript_writer_matches_save(tmp_path):
+    rng = np.random.default_rng(1)
+    windows = [random_segments(rng, 20, offset=60.0 * k) for k in range(6)] + [[]]
+    writer = TranscriptWriter(str(tmp_path / "streamed.npz"), source="video.mp4")
+    for segments in windows:
+        writer.append(WordTimeline.from_segments(segments))
+    writer.close()
+    whole = WordTimeline.concatenate([WordTimeline.from_segments(segments) for segments in windows])
+    whole.save(str(tmp_path / "whole.npz"), source="video.mp4")
+    with np.load(tmp_path / "streamed.npz") as streamed, np.load(tmp_path / "whole.npz") as expected:
+        assert sorted(streamed.files) == sorted(expected.files)
+        for name in expected.files:
+            assert streamed[name].dtype == expected[name].dtype, name
+            assert np.array_equal(streamed[name], expected[name]), name
+    assert sorted(os.listdir(tmp_path)) == ["streamed.npz", "whole.npz"]
+
+
+def brute_force(timelines, query):
+    terms = [term for term in (_normalize_word(word) for word in query.split()) if term]
+    hits = []
+    for path, timeline in sorted(timelines.items()):
+        words = [_normalize_word(timeline.word(i)) for i in range(len(timeline))]
+        for i in range(len(words) - len(terms) + 1):
+            if words[i:i + len(terms)] == terms:
+                hits.append((path, int(round(timeline.starts[i] * 1000)),
+                             int(round(timeline.ends[i + len(terms) - 1] * 1000))))
+    return hits
+
+
+@pytest.fixture
+def library(tmp_path):
+    rng = np.random.default_rng(2)
+    timelines = {}
+    for k in range(5):
+        path = str(tmp_path / f"video_{k}" / "words.npz")
+        os.makedirs(os.path.dirname(path))
+        timeline = WordTimeline.from_segments(random_segments(rng, 80))
+        timeline.save(path, source=str(tmp_path / f"video_{k}.mp4"))
+        timelines[path] = WordTimeline.load(path)
+    return tmp_path, timelines
+
+
+@pytest.mark.parametrize("query", ["chat", "le chat", "Le chat dort", "la table", "souris mange chat", "absent"])
+def test_phrase_search_matches_brute_force(library, query):
+    root, timelines = library
+    with TranscriptIndex(str(root / "index.sqlite")) as index:
+        assert index.sync(str(root)) == (5, 0)
+        hits = index.search(query, limit=None)
+    assert [(hit["transcript"], hit["start_ms"], hit["end_ms"]) for hit in hits] == brute_force(timelines, query)
+
+
+def test_index_updates_incrementally(library):
+    root, timelines = library
+    with TranscriptIndex(str(root / "index.sqlite")) as index:
+        index.sync(str(root))
+        assert index.sync(str(root)) == (0, 0)
+
+        removed = sorted(timelines)[0]
+        os.remove(removed)
+        assert index.sync(str(root)) == (0, 1)
+        assert all(hit["transcript"] != removed for hit in index.search("chat", limit=None))
+
+        replaced = sorted(timelines)[1]
+        WordTimeline.from_segments([{"start": 0.0, "end": 1.0, "words": [
+            {"word": " souris", "start": 0.0, "end": 0.5},
+            {"word": " verte", "start": 0.5, "end": 1.0},
+        ]}]).save(replaced, source="autre.mp4")
+        os.utime(replaced, (1e9, 1e9))
+        assert index.add(replaced)
+        assert index.search("souris verte") == [
+            {"video": os.path.abspath("autre.mp4"), "transcript": replaced, "start_ms": 0, "end_ms": 1000}]
+        assert index.stats()["videos"] == 4
+
+
+def test_search_reads_only_matching_videos(library):
+    root, _ = library
+    with TranscriptIndex(str(root / "index.sqlite")) as index:
+        index.sync(str(root))
+        statements = []
+        index.connection.set_trace_callback(statements.append)
+        index.search("souris verte")
+        index.search("chat")
+    assert not any(statement.startswith("SELECT id, video, transcript FROM videos")
+                   and "WHERE" not in statement for statement in statements)